@@ -1,43 +1,337 @@
+import ast
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
 import sympy as sp
 from sympy import diff, integrate, solve, limit
 from sympy.calculus.util import continuous_domain
 
+from src.expression_module import compile_expression
+from src.numeric_module import (
+    INTEGRAL_TOLERANCE, ROOT_TOLERANCE, adaptive_integral, find_extremums, find_roots,
+    parity_candidates,
+)
+from src.singularity_module import BOUNDARY, POLE, build_index, family_text
+
+# Число результатов символьных операций, запоминаемых в процессе
+MEMO_SIZE = 1024
+# Отрезок для численных методов анализа по умолчанию
+DEFAULT_INTERVAL = (-10.0, 10.0)
+
+
+class SymbolicMemo:
+    """Запоминание результатов символьных операций в пределах процесса.
+
+    Ключ - каноническая запись srepr выражения, имя операции и её
+    аргументы, поэтому производная, корни или пределы одного выражения
+    вычисляются один раз для всех разделов анализа.
+    """
+
+    def __init__(self, maxsize=MEMO_SIZE):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, operation, expr, args, compute):
+        key = (operation, sp.srepr(expr), args)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+            self.misses += 1
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+
+# Общий для всех экземпляров: задания анализа в одном процессе его разделяют
+memo = SymbolicMemo()
+
+
+@dataclass
+class Extremum:
+    x: float
+    y: float
+    kind: str  # 'min' или 'max'
+    boundary: bool  # На конце отрезка
+
+
+@dataclass
+class AnalysisResult:
+    """Результат анализа в виде данных, а не текста (для пакетной обработки).
+
+    Символьные величины записаны строками sympy; поле, которое вычислить
+    не удалось, равно None, а причина записана в errors.
+    """
+    expression: str
+    interval: tuple
+    domain: str | None = None
+    discontinuities: list = field(default_factory=list)
+    y_intercept: str | None = None
+    roots: list = field(default_factory=list)  # Точные действительные корни
+    numeric_roots: list = field(default_factory=list)  # Корни на отрезке
+    parity: str | None = None  # 'even', 'odd' или 'neither'
+    limit_plus_inf: str | None = None
+    limit_minus_inf: str | None = None
+    derivative: str | None = None
+    second_derivative: str | None = None
+    antiderivative: str | None = None
+    definite_integral: float | None = None
+    integral_error: float | None = None
+    integral_converged: bool | None = None  # False - интеграл, вероятно, расходится
+    extremums: list = field(default_factory=list)  # Список Extremum
+    errors: dict = field(default_factory=dict)  # Поле -> причина неудачи
+
+    def to_dict(self):
+        return asdict(self)
+
+
 class AnalysisModule:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.x = sp.Symbol('x')
+        # Постоянное хранилище готовых разделов (DatabaseModule) или None
+        self.cache = cache
+        self.root_tolerance = ROOT_TOLERANCE
+        self.integral_tolerance = INTEGRAL_TOLERANCE
         
-    def analyze_function(self, func_text):
+    # Разделы анализа в порядке вывода: ключ, заголовок, метод
+    SECTIONS = (
+        ('function', "АНАЛИЗ ФУНКЦИИ", '_function_section'),
+        ('domain', "ОБЛАСТЬ ОПРЕДЕЛЕНИЯ", '_domain_section'),
+        ('intercepts', "ТОЧКИ ПЕРЕСЕЧЕНИЯ", '_intercepts_section'),
+        ('symmetry', "СВОЙСТВА СИММЕТРИИ", '_symmetry_section'),
+        ('limits', "ПРЕДЕЛЫ НА БЕСКОНЕЧНОСТИ", '_limits_section'),
+        ('discontinuity_limits', "ПРЕДЕЛЫ В ТОЧКАХ РАЗРЫВА", '_discontinuity_limits_section'),
+        ('derivative', "ПРОИЗВОДНАЯ", '_derivative_section'),
+        ('second_derivative', "ВТОРАЯ ПРОИЗВОДНАЯ", '_second_derivative_section'),
+        ('integral', "ИНТЕГРАЛ", '_integral_section'),
+        ('definite_integral', "ОПРЕДЕЛЕННЫЙ ИНТЕГРАЛ", '_definite_integral_section'),
+        ('extremums', "ЭКСТРЕМУМЫ НА ОТРЕЗКЕ", '_extremums_section'),
+    )
+
+    # Разделы, зависящие от выбранного отрезка [a, b]
+    INTERVAL_SECTIONS = {'intercepts', 'definite_integral', 'extremums'}
+    # Чисто численные разделы: вычисляются за миллисекунды по ядру numpy,
+    # без sympy и постоянного хранилища
+    NUMERIC_SECTIONS = {'definite_integral', 'extremums'}
+    # Самые долгие символьные разделы: вычисляются только по запросу
+    LAZY_SECTIONS = {'limits', 'discontinuity_limits', 'integral'}
+    # Символьные разделы с численной предпроверкой по ядру numpy
+    KERNEL_SECTIONS = {'symmetry'}
+
+    def parse(self, func_text):
+        """Скомпилированное выражение (ядро numpy и sympy_expr); ValueError, если строка некорректна"""
         try:
-            expr = sp.sympify(func_text)
+            compiled = compile_expression(func_text)
+            compiled.sympy_expr
         except Exception as e:
             raise ValueError(f"Некорректное выражение функции: {str(e)}")
-            
-        result = "АНАЛИЗ ФУНКЦИИ:\n\n"
-        result += f"Функция: f(x) = {expr}\n\n"
+        return compiled
+
+    def analyze_function(self, func_text, interval=DEFAULT_INTERVAL, keys=None):
+        """Отчёт из разделов keys по очереди (по умолчанию из всех)"""
+        compiled = self.parse(func_text)
+        if keys is None:
+            keys = [key for key, _, _ in self.SECTIONS]
+        return "\n".join(self.section(compiled, key, interval) for key in keys)
+
+    def eager_sections(self):
+        """Ключи разделов, которые вычисляются сразу, без запроса"""
+        return [key for key, _, _ in self.SECTIONS if key not in self.LAZY_SECTIONS]
+
+    def analyze(self, func_text, interval=DEFAULT_INTERVAL):
+        """Структурный результат анализа (AnalysisResult) без форматирования текста"""
+        compiled = self.parse(func_text)
+        expr = compiled.sympy_expr
+        result = AnalysisResult(expression=str(expr),
+                                interval=(float(interval[0]), float(interval[1])))
+
+        def attempt(name, compute, default=None):
+            try:
+                return compute()
+            except Exception as e:
+                result.errors[name] = f"{type(e).__name__}: {e}"
+                return default
+
+        def y_intercept():
+            value = expr.subs(self.x, 0)
+            return str(value) if value.is_finite else None
+
+        result.domain = attempt('domain', lambda: str(self.domain(expr)))
+        result.discontinuities = attempt(
+            'discontinuities', lambda: self.find_discontinuities(expr), [])
+        result.y_intercept = attempt('y_intercept', y_intercept)
+        result.roots = attempt(
+            'roots', lambda: [str(root) for root in self.solve(expr) if root.is_real], [])
+        result.numeric_roots = attempt(
+            'numeric_roots', lambda: self.numeric_roots(compiled, interval), [])
+        result.parity = attempt('parity', lambda: self.parity(expr, compiled))
+        result.limit_plus_inf = attempt('limit_plus_inf', lambda: str(self.limit(expr, sp.oo, '-')))
+        result.limit_minus_inf = attempt('limit_minus_inf', lambda: str(self.limit(expr, -sp.oo, '+')))
+        result.derivative = attempt('derivative', lambda: str(self.derivative(expr)))
+        result.second_derivative = attempt('second_derivative', lambda: str(self.derivative(expr, 2)))
+        result.antiderivative = attempt('antiderivative', lambda: str(self.integrate(expr)))
+        points = attempt('singularities', lambda: self.singular_points(expr, interval), ())
+        result.definite_integral, result.integral_error = attempt(
+            'definite_integral', lambda: self.numeric_integral(compiled, interval, points),
+            (None, None))
+        if result.integral_error is not None:
+            result.integral_converged = self.integral_converged(
+                result.definite_integral, result.integral_error)
+        result.extremums = [
+            Extremum(x, y, 'max' if is_max else 'min', on_boundary)
+            for x, y, is_max, on_boundary in attempt(
+                'extremums', lambda: self.numeric_extremums(compiled, interval), [])
+        ]
+        return result
+
+    def analyze_section(self, func_text, key, interval=DEFAULT_INTERVAL):
+        """Текст одного раздела анализа (разделы можно вычислять параллельно)"""
+        return self.section(self.parse(func_text), key, interval)
+
+    def section(self, compiled, key, interval=DEFAULT_INTERVAL):
+        """Текст раздела; готовые символьные разделы берутся из постоянного хранилища.
+
+        Численные и зависящие от отрезка разделы не сохраняются: первые
+        считаются быстрее чтения из базы, а вторые создавали бы запись на
+        каждый отрезок и вытесняли символьные. Сохраняются только успешно
+        вычисленные разделы, чтобы случайный сбой не запоминался навсегда.
+        """
+        title, method = self._section_method(key)
+        if key in self.NUMERIC_SECTIONS:
+            return f"{title}:\n" + method(compiled, interval)
+        
+        expr = compiled.sympy_expr
+        if key in self.INTERVAL_SECTIONS:
+            return f"{title}:\n" + method(expr, compiled, interval)
+        
+        stored_expression = self._stored_expression(compiled, key)
+        if self.cache is not None:
+            text = self.cache.load_analysis(stored_expression, key)
+            if text is not None:
+                return text
         
-        # Область определения
-        result += "ОБЛАСТЬ ОПРЕДЕЛЕНИЯ:\n"
+        if key in self.KERNEL_SECTIONS:
+            body = method(expr, compiled)
+        else:
+            body = method(expr)
+        text = f"{title}:\n" + body
+        
+        if self.cache is not None and "не удалось" not in body.lower():
+            self.cache.save_analysis(stored_expression, key, text)
+        return text
+
+    def _stored_expression(self, compiled, key):
+        """Ключ выражения в постоянном хранилище.
+
+        Символьные разделы хранятся по канонической записи sympy (srepr), а
+        разделы, вычисляющие ядро numpy, - по нормализованному тексту:
+        sympy переписывает выражения (sqrt(x)**2 -> x), ядро - нет.
+        """
+        if key in self.KERNEL_SECTIONS:
+            return "text:" + ast.unparse(compiled.tree)
+        return sp.srepr(compiled.sympy_expr)
+
+    def _section_method(self, key):
+        for section_key, title, method in self.SECTIONS:
+            if section_key == key:
+                return title, getattr(self, method)
+        raise KeyError(key)
+
+    def numeric_roots(self, compiled, interval, samples=None):
+        """Численные корни на отрезке (смена знака и метод Брента)"""
+        return find_roots(compiled, interval[0], interval[1], samples=samples,
+                          xtol=self.root_tolerance)
+
+    def numeric_roots_text(self, roots, interval):
+        label = f"С осью X (численно на [{interval[0]:g}, {interval[1]:g}])"
+        if not roots:
+            return f"{label}: корней нет\n"
+        return f"{label}: {[f'({root:.10g}, 0)' for root in roots]}\n"
+
+    # Символьные операции с запоминанием результатов
+
+    def domain(self, expr):
+        return memo.get('domain', expr, (),
+                        lambda: continuous_domain(expr, self.x, sp.S.Reals))
+
+    def parity(self, expr, kernel=None):
+        """'even', 'odd' или 'neither'.
+
+        sp.simplify бывает долгим, а ответ почти всегда 'neither', поэтому
+        сначала проверка по ядру numpy в случайных точках; упрощение
+        запускается только для видов симметрии, которые она не исключила.
+        """
+        def compute():
+            candidates = {'even', 'odd'} if kernel is None else parity_candidates(kernel)
+            if not candidates:
+                return 'neither'
+            f_neg_x = expr.subs(self.x, -self.x)
+            if 'even' in candidates and sp.simplify(expr - f_neg_x) == 0:
+                return 'even'
+            if 'odd' in candidates and sp.simplify(expr + f_neg_x) == 0:
+                return 'odd'
+            return 'neither'
+        # Предпроверка зависит от ядра, а не только от sympy-записи:
+        # sqrt(x)**2 и x в sympy совпадают, а в numpy - нет
+        return memo.get('parity', expr, (None if kernel is None else kernel.text,), compute)
+
+    def derivative(self, expr, order=1):
+        return memo.get('diff', expr, (order,), lambda: diff(expr, self.x, order))
+
+    def solve(self, expr):
+        return memo.get('solve', expr, (), lambda: solve(expr, self.x))
+
+    def limit(self, expr, point, direction='+'):
+        return memo.get('limit', expr, (sp.srepr(point), direction),
+                        lambda: limit(expr, self.x, point, dir=direction))
+
+    def integrate(self, expr, bounds=None):
+        if bounds is None:
+            return memo.get('integrate', expr, (), lambda: integrate(expr, self.x))
+        return memo.get('integrate', expr, bounds,
+                        lambda: integrate(expr, (self.x, *bounds)))
+
+    def _function_section(self, expr):
+        return f"\nФункция: f(x) = {expr}\n"
+
+    def _domain_section(self, expr):
+        result = ""
         try:
             # Используем встроенную функцию continuous_domain для определения области определения
-            domain = continuous_domain(expr, self.x, sp.S.Reals)
+            domain = self.domain(expr)
             
             if domain == sp.S.Reals:
                 result += "Функция определена для всех действительных x\n"
             else:
-                # Находим точки разрыва
-                discontinuities = self.find_discontinuities(expr)
-                if discontinuities:
-                    result += f"Функция не определена в точках: {', '.join(discontinuities)}\n"
-                    result += f"Область определения: {domain}\n"
-                else:
-                    result += f"Область определения: {domain}\n"
+                # Особые точки берутся из индекса, построенного за один обход выражения
+                index = self.singularities(expr)
+                poles = [str(point) for point in index.poles()] + \
+                    [family_text(offset, period) for offset, period, kind, *_ in index.families
+                     if kind == POLE]
+                boundaries = [str(point) for point in index.boundaries()] + \
+                    [family_text(offset, period) for offset, period, kind, *_ in index.families
+                     if kind == BOUNDARY]
+                if poles:
+                    result += f"Функция не определена в точках: {', '.join(poles)}\n"
+                if boundaries:
+                    result += f"Границы области определения: {', '.join(boundaries)}\n"
+                result += f"Область определения: {domain}\n"
                     
         except Exception as e:
             result += f"Не удалось определить область определения: {str(e)}\n"
-            
-        # Точки пересечения с осями
-        result += "\nТОЧКИ ПЕРЕСЕЧЕНИЯ:\n"
-        
+        return result
+
+    def _intercepts_section(self, expr, compiled, interval):
+        result = ""
         # С осью Y (x=0)
         try:
             y_intercept = expr.subs(self.x, 0)
@@ -50,171 +344,166 @@ class AnalysisModule:
             
         # С осью X (y=0)
         try:
-            x_intercepts = solve(expr, self.x)
+            x_intercepts = self.solve(expr)
             real_roots = [root for root in x_intercepts if root.is_real]
-            if real_roots:
-                result += f"С осью X: {[f'({root}, 0)' for root in real_roots]}\n"
-            else:
-                result += "С осью X: нет действительных корней\n"
         except:
+            real_roots = None
+        if real_roots:
+            result += f"С осью X: {[f'({root}, 0)' for root in real_roots]}\n"
+            return result
+        
+        # Трансцендентные уравнения (cos(x) = x) sympy не решает:
+        # ищем корни численно на выбранном отрезке
+        try:
+            roots = self.numeric_roots(compiled, interval)
+        except:
+            roots = []
+        if roots:
+            result += self.numeric_roots_text(roots, interval)
+        elif real_roots is None:
             result += "С осью X: не удалось найти корни\n"
-            
-        # Проверка на четность/нечетность
-        result += "\nСВОЙСТВА СИММЕТРИИ:\n"
+        else:
+            result += "С осью X: нет действительных корней\n"
+        return result
+
+    def _symmetry_section(self, expr, compiled):
         try:
-            f_neg_x = expr.subs(self.x, -self.x)
-            
-            if sp.simplify(expr - f_neg_x) == 0:
-                result += "Функция четная (симметрична относительно оси Y)\n"
-            elif sp.simplify(expr + f_neg_x) == 0:
-                result += "Функция нечетная (симметрична относительно начала координат)\n"
-            else:
-                result += "Функция общего вида (ни четная, ни нечетная)\n"
+            parity = self.parity(expr, compiled)
         except:
-            result += "Не удалось определить симметрию\n"
-            
-        # Пределы на бесконечности
-        result += "\nПРЕДЕЛЫ НА БЕСКОНЕЧНОСТИ:\n"
+            return "Не удалось определить симметрию\n"
+        if parity == 'even':
+            return "Функция четная (симметрична относительно оси Y)\n"
+        if parity == 'odd':
+            return "Функция нечетная (симметрична относительно начала координат)\n"
+        return "Функция общего вида (ни четная, ни нечетная)\n"
+
+    def _limits_section(self, expr):
         try:
-            limit_plus_inf = limit(expr, self.x, sp.oo)
-            limit_minus_inf = limit(expr, self.x, -sp.oo)
-            result += f"lim(x→+∞) = {limit_plus_inf}\n"
-            result += f"lim(x→-∞) = {limit_minus_inf}\n"
+            limit_plus_inf = self.limit(expr, sp.oo, '-')
+            limit_minus_inf = self.limit(expr, -sp.oo, '+')
+            return f"lim(x→+∞) = {limit_plus_inf}\nlim(x→-∞) = {limit_minus_inf}\n"
         except:
-            result += "Не удалось вычислить пределы на бесконечности\n"
-            
-        # Пределы в точках разрыва
-        result += "\nПРЕДЕЛЫ В ТОЧКАХ РАЗРЫВА:\n"
+            return "Не удалось вычислить пределы на бесконечности\n"
+
+    def _discontinuity_limits_section(self, expr):
+        result = ""
         try:
-            discontinuities = self.find_discontinuities(expr)
-            for point in discontinuities:
+            index = self.singularities(expr)
+            # Из периодической серии достаточно одной точки: пределы повторяются
+            points = [(point, "") for point in index.values()] + \
+                [(offset, f" (так же в точках {family_text(offset, period)})")
+                 for offset, period, *_ in index.families]
+            for point, note in points:
                 try:
-                    point_val = sp.sympify(point)
-                    limit_left = limit(expr, self.x, point_val, dir='-')
-                    limit_right = limit(expr, self.x, point_val, dir='+')
-                    result += f"lim(x→{point}-) = {limit_left}, lim(x→{point}+) = {limit_right}\n"
+                    limits = []
+                    for direction in ('-', '+'):
+                        # На границе области определения предел берётся только изнутри
+                        if not self._inside_domain(expr, point, direction):
+                            continue
+                        limits.append(f"lim(x→{point}{direction}) = {self.limit(expr, point, direction)}")
+                    result += ", ".join(limits) + note + "\n"
                 except:
                     result += f"Не удалось вычислить пределы в точке {point}\n"
         except:
             result += "Не удалось вычислить пределы в точках разрыва\n"
-            
-        # Производная
-        result += "\nПРОИЗВОДНАЯ:\n"
-        try:
-            derivative = diff(expr, self.x)
-            result += f"f'(x) = {derivative}\n"
-        except:
-            result += "Не удалось вычислить производную\n"
-            
-        # Вторая производная
-        result += "\nВТОРАЯ ПРОИЗВОДНАЯ:\n"
+        return result
+
+    def _inside_domain(self, expr, point, direction):
+        """Лежат ли точки сразу слева ('-') или справа ('+') от point в области определения.
+
+        Если sympy не может это решить, считается, что лежат.
+        """
+        step = sp.Rational(1, 10 ** 9)
+        near = point - step if direction == '-' else point + step
+        return self.domain(expr).contains(near) != sp.false
+
+    def _derivative_section(self, expr):
         try:
-            second_derivative = diff(expr, self.x, 2)
-            result += f"f''(x) = {second_derivative}\n"
+            derivative = self.derivative(expr)
+            return f"f'(x) = {derivative}\n"
         except:
-            result += "Не удалось вычислить вторую производную\n"
-            
-        # Интеграл
-        result += "\nИНТЕГРАЛ:\n"
+            return "Не удалось вычислить производную\n"
+
+    def _second_derivative_section(self, expr):
         try:
-            integral = integrate(expr, self.x)
-            result += f"∫f(x)dx = {integral} + C\n"
+            second_derivative = self.derivative(expr, 2)
+            return f"f''(x) = {second_derivative}\n"
         except:
-            result += "Не удалось вычислить интеграл\n"
-            
-        # Определенный интеграл на интервале [-5, 5]
-        result += "\nОПРЕДЕЛЕННЫЙ ИНТЕГРАЛ:\n"
+            return "Не удалось вычислить вторую производную\n"
+
+    def _integral_section(self, expr):
         try:
-            definite_integral = integrate(expr, (self.x, -5, 5))
-            result += f"∫f(x)dx от -5 до 5 = {definite_integral}\n"
+            integral = self.integrate(expr)
+            return f"∫f(x)dx = {integral} + C\n"
         except:
-            result += "Не удалось вычислить определенный интеграл\n"
-            
-        # Экстремумы на интервале [-10, 10]
-        result += "\nЭКСТРЕМУМЫ НА ИНТЕРВАЛЕ [-10, 10]:\n"
+            return "Не удалось вычислить интеграл\n"
+
+    def numeric_integral(self, compiled, interval, points=()):
+        """Определённый интеграл на отрезке и оценка погрешности (Гаусс-Кронрод).
+
+        points - известные особые точки функции: отрезок разбивается в них.
+        """
+        return adaptive_integral(compiled, interval[0], interval[1], tol=self.integral_tolerance,
+                                 points=points)
+
+    def singular_points(self, expr, interval):
+        """Особые точки выражения на отрезке (для разбиения интеграла); пусто, если их слишком много"""
+        points = self.singularities(expr).points_in(min(interval), max(interval))
+        return () if points is None else points
+
+    def integral_converged(self, value, error):
+        """Достигнута ли требуемая точность интеграла"""
+        return error <= self.integral_tolerance * max(1.0, abs(value))
+
+    def numeric_integral_text(self, value, error, interval):
+        label = f"∫f(x)dx от {interval[0]:g} до {interval[1]:g}"
+        if not self.integral_converged(value, error):
+            return f"{label}: точность не достигнута, интеграл, вероятно, расходится " \
+                   f"(≈ {value:.10g}, погрешность {error:.2g})\n"
+        return f"{label} ≈ {value:.12g} (погрешность ≤ {error:.2g})\n"
+
+    def _definite_integral_section(self, compiled, interval):
+        # Символьный integrate бывает долгим или возвращает невычисленный
+        # Integral: определённый интеграл считается численно
         try:
-            derivative = diff(expr, self.x)
-            critical_points = solve(derivative, self.x)
-            extremums = []
-            for point in critical_points:
-                if point.is_real and -10 <= float(point) <= 10:
-                    y_value = expr.subs(self.x, point)
-                    # Определяем тип экстремума по второй производной
-                    try:
-                        second_deriv = sp.diff(expr, self.x, 2).subs(self.x, point)
-                        if second_deriv > 0:
-                            extremum_type = "минимум"
-                        elif second_deriv < 0:
-                            extremum_type = "максимум"
-                        else:
-                            extremum_type = "точка перегиба"
-                    except:
-                        extremum_type = "экстремум (тип не определен)"
-                    extremums.append((float(point), float(y_value), extremum_type))
-            
-            if extremums:
-                for ext in extremums:
-                    result += f"{ext[2]}: ({ext[0]:.2f}, {ext[1]:.2f})\n"
-            else:
-                result += "Экстремумы не найдены на заданном интервале\n"
+            value, error = self.numeric_integral(compiled, interval)
+        except ValueError as e:
+            return f"Не удалось вычислить определенный интеграл: {e}\n"
         except:
-            result += "Не удалось найти экстремумы\n"
-            
+            return "Не удалось вычислить определенный интеграл\n"
+        return self.numeric_integral_text(value, error, interval)
+
+    def numeric_extremums(self, compiled, interval, samples=None):
+        """Численные экстремумы на отрезке (смена знака производной и метод Брента)"""
+        return find_extremums(compiled, interval[0], interval[1], samples=samples,
+                              xtol=self.root_tolerance)
+
+    def numeric_extremums_text(self, extremums, interval):
+        result = f"Отрезок [{interval[0]:g}, {interval[1]:g}]\n"
+        if not extremums:
+            return result + "Экстремумы не найдены на заданном отрезке\n"
+        for x, y, is_max, on_boundary in extremums:
+            extremum_type = "максимум" if is_max else "минимум"
+            if on_boundary:
+                extremum_type += " на границе"
+            result += f"{extremum_type}: ({x:.6g}, {y:.6g})\n"
         return result
 
-    def find_discontinuities(self, expr):
-        """Находит точки разрыва функции"""
-        discontinuities = []
-        
-        # Находим точки, где знаменатель равен нулю
+    def _extremums_section(self, compiled, interval):
+        # Критические точки не ищутся через solve(f'(x) = 0): численный
+        # поиск работает и для функций без решения в радикалах
         try:
-            # Получаем знаменатель выражения
-            if expr.is_rational_function(self.x):
-                denominator = expr.as_numer_denom()[1]
-                denominator_roots = solve(denominator, self.x)
-                for root in denominator_roots:
-                    if root.is_real:
-                        discontinuities.append(str(root))
-        except:
-            pass
-        
-        # Находим точки, где логарифмы не определены
-        try:
-            # Ищем все логарифмы в выражении
-            logs = expr.atoms(sp.log)
-            for log_func in logs:
-                # Аргумент логарифма должен быть > 0
-                arg = log_func.args[0]
-                # Решаем неравенство arg <= 0
-                try:
-                    critical_points = solve(arg <= 0, self.x)
-                    if critical_points:
-                        for point in critical_points:
-                            if hasattr(point, 'is_real') and point.is_real:
-                                discontinuities.append(str(point))
-                except:
-                    pass
+            extremums = self.numeric_extremums(compiled, interval)
         except:
-            pass
-        
-        # Находим точки, где корни четной степени не определены
-        try:
-            # Ищем корни четной степени
-            for power in expr.atoms(sp.Pow):
-                base, exp = power.as_base_exp()
-                if exp.is_rational and not exp.is_integer:
-                    # Для дробных степеней с четным знаменателем
-                    p, q = exp.as_numer_denom()
-                    if q % 2 == 0 and p % 2 != 0:  # Знаменатель четный
-                        # Основание должно быть >= 0
-                        try:
-                            critical_points = solve(base < 0, self.x)
-                            if critical_points:
-                                for point in critical_points:
-                                    if hasattr(point, 'is_real') and point.is_real:
-                                        discontinuities.append(str(point))
-                        except:
-                            pass
-        except:
-            pass
-        return list(set(discontinuities))
\ No newline at end of file
+            return "Не удалось найти экстремумы\n"
+        return self.numeric_extremums_text(extremums, interval)
+
+    def singularities(self, expr):
+        """Индекс особых точек: полюса, границы области определения, периодические серии"""
+        return memo.get('singularities', expr, (), lambda: build_index(expr, self.x))
+
+    def find_discontinuities(self, expr):
+        """Точки, где функция не определена: полюса, границы и серии точек"""
+        index = self.singularities(expr)
+        return [str(point) for point in index.values()] + \
+            [family_text(offset, period) for offset, period, *_ in index.families]
@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.sandbox_module import SandboxError, SandboxPool
+from src.singularity_module import index_for_text
+
+# Ограничение времени на один раздел анализа, секунд
+SECTION_TIMEOUT = 10.0
+# Число готовых разделов, запоминаемых в окне программы
+RESULT_CACHE_SIZE = 512
+# Ограничение времени поиска особых точек функции, секунд
+INDEX_TIMEOUT = 2.0
+
+
+class AnalysisWorker(QObject):
+    """Параллельное вычисление разделов анализа функции.
+
+    Каждый раздел (область определения, пределы, интеграл...) - отдельное
+    задание в пуле изолированных процессов со своим ограничением времени.
+    Готовые разделы передаются сигналом section_ready по мере завершения;
+    раздел, превысивший время, сообщает об этом (текст причины и
+    ok = False), не задерживая остальные. Разделы можно перезапускать по
+    отдельности (например, зависящие от отрезка при его изменении):
+    актуален только последний запуск каждого раздела. Готовые разделы
+    запоминаются по тексту выражения и отрезку и при повторном запросе
+    выдаются сразу, без обращения к пулу.
+
+    В том же пуле строятся индексы особых точек функций графика
+    (submit_singularities): символьное решение уравнений не задерживает GUI.
+    """
+
+    section_ready = pyqtSignal(int, str, str, bool)  # поколение, ключ, текст, успех
+    singularities_ready = pyqtSignal(str, object)  # выражение, SingularityIndex или None
+
+    def __init__(self, analysis_module, timeout=SECTION_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.analysis_module = analysis_module
+        self.timeout = timeout
+        self.generation = 0
+        self.pool = SandboxPool(timeout=timeout)
+        self._futures = {}  # ключ раздела -> Future последнего запуска
+        self._latest = {}  # ключ раздела -> поколение последнего запуска
+        self._results = OrderedDict()  # (выражение, ключ, отрезок) -> текст
+        self._indexes = OrderedDict()  # выражение -> SingularityIndex или None
+        self._lock = threading.Lock()
+
+    def submit(self, func_text, interval, keys=None):
+        """Запускает разделы анализа на отрезке interval и возвращает номер поколения.
+
+        По умолчанию запускаются разделы, вычисляемые сразу, кроме численных
+        (их быстрее вычислить на месте); дорогие разделы запрашиваются
+        отдельно. Не начатые прежние запуски тех же разделов отменяются.
+        """
+        if keys is None:
+            keys = [key for key in self.analysis_module.eager_sections()
+                    if key not in self.analysis_module.NUMERIC_SECTIONS]
+        self.generation += 1
+        for key in keys:
+            previous = self._futures.pop(key, None)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = self.generation
+            
+            cache_key = self._cache_key(func_text, key, interval)
+            with self._lock:
+                text = self._results.get(cache_key)
+                if text is not None:
+                    self._results.move_to_end(cache_key)
+            if text is not None:
+                self.section_ready.emit(self.generation, key, text, True)
+                continue
+            
+            future = self.pool.submit(self.analysis_module.analyze_section,
+                                      func_text, key, interval)
+            future.add_done_callback(partial(self._on_done, self.generation, cache_key))
+            self._futures[key] = future
+        return self.generation
+
+    def submit_singularities(self, func_text):
+        """Строит индекс особых точек функции; результат - сигнал singularities_ready.
+
+        Индексы запоминаются по тексту выражения: повторно построенная
+        функция получает индекс сразу. Если индекс не построен за
+        INDEX_TIMEOUT, передаётся None.
+        """
+        with self._lock:
+            known = func_text in self._indexes
+            if known:
+                self._indexes.move_to_end(func_text)
+                index = self._indexes[func_text]
+        if known:
+            self.singularities_ready.emit(func_text, index)
+            return
+        future = self.pool.submit(index_for_text, func_text, timeout=INDEX_TIMEOUT)
+        future.add_done_callback(partial(self._on_index_done, func_text))
+
+    def _on_index_done(self, func_text, future):
+        if future.cancelled():
+            return
+        try:
+            index = future.result()
+        except Exception:
+            index = None  # Без индекса график строится с обрезкой по y
+        with self._lock:
+            self._indexes[func_text] = index
+            while len(self._indexes) > RESULT_CACHE_SIZE:
+                self._indexes.popitem(last=False)
+        self.singularities_ready.emit(func_text, index)
+
+    def _cache_key(self, func_text, key, interval):
+        # Разделы, не зависящие от отрезка, общие для всех отрезков
+        if key not in self.analysis_module.INTERVAL_SECTIONS:
+            interval = None
+        return func_text, key, interval
+
+    def is_current(self, generation, key):
+        """Результат последнего ли запуска раздела key"""
+        return self._latest.get(key) == generation
+
+    def cancel(self):
+        """Отменяет ещё не начатые разделы предыдущего анализа"""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._latest = {}
+
+    def _on_done(self, generation, cache_key, future):
+        # Вызывается в потоке пула; сигнал доставляется в поток GUI через очередь Qt
+        if future.cancelled():
+            return
+        key = cache_key[1]
+        try:
+            text, ok = future.result(), True
+            with self._lock:
+                self._results[cache_key] = text
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        except SandboxError as e:
+            text, ok = f"Раздел не вычислен: {e}\n", False
+        except Exception as e:
+            text, ok = f"Ошибка: {e}\n", False
+        self.section_ready.emit(generation, key, text, ok)
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.shutdown()
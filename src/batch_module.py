@@ -0,0 +1,180 @@
+"""Пакетный анализ функций из файла без графического интерфейса.
+
+Запуск из корня проекта:
+
+    python -m src.batch_module functions.txt -o results.jsonl
+    python -m src.batch_module functions.txt -o results.csv --interval -5 5 --timeout 60
+
+Файл содержит по одной функции в строке (пустые строки и комментарии
+с # пропускаются) - тот же формат, что и при сохранении функций из
+программы. Выражения анализируются параллельно в пуле изолированных
+процессов, каждое со своим ограничением времени и памяти; результаты
+записываются по мере готовности.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+
+from src.analysis_module import DEFAULT_INTERVAL, AnalysisModule
+from src.sandbox_module import (DEFAULT_MEMORY_MB, SandboxMemoryError, SandboxPool,
+                                SandboxTimeout)
+
+# Ограничение времени на анализ одного выражения, секунд
+EXPRESSION_TIMEOUT = 30.0
+# Столбцы CSV: поля AnalysisResult и служебные поля записи
+CSV_FIELDS = (
+    'line', 'input', 'status', 'error', 'seconds',
+    'expression', 'interval', 'domain', 'discontinuities', 'y_intercept',
+    'roots', 'numeric_roots', 'parity', 'limit_plus_inf', 'limit_minus_inf',
+    'derivative', 'second_derivative', 'antiderivative',
+    'definite_integral', 'integral_error', 'integral_converged', 'extremums', 'errors',
+)
+
+
+def read_expressions(lines):
+    """Пары (номер строки, выражение) без пустых строк и комментариев"""
+    for line_num, line in enumerate(lines, 1):
+        func = line.strip()
+        if func and not func.startswith('#'):
+            yield line_num, func
+
+
+def analyze_expression(func_text, interval):
+    """Задание для процесса пула: результат анализа и время вычисления"""
+    start = time.perf_counter()
+    result = AnalysisModule().analyze(func_text, interval)
+    return result.to_dict(), time.perf_counter() - start
+
+
+def run_batch(expressions, interval=DEFAULT_INTERVAL, jobs=None,
+              timeout=EXPRESSION_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+    """Анализирует выражения параллельно и выдаёт записи по мере готовности.
+
+    expressions - пары (номер строки, выражение). Каждая запись - словарь
+    с полями AnalysisResult и служебными line, input, status ('ok',
+    'timeout', 'memory' или 'error'), error и seconds.
+    """
+    pool = SandboxPool(size=jobs, timeout=timeout, memory_mb=memory_mb)
+    try:
+        futures = {pool.submit(analyze_expression, func, interval): (line_num, func)
+                   for line_num, func in expressions}
+        for future in as_completed(futures):
+            line_num, func = futures[future]
+            record = {'line': line_num, 'input': func, 'status': 'ok', 'error': None}
+            try:
+                result, seconds = future.result()
+                record['seconds'] = round(seconds, 3)
+                record.update(result)
+            except SandboxTimeout as e:
+                record.update(status='timeout', error=str(e))
+            except SandboxMemoryError as e:
+                record.update(status='memory', error=str(e))
+            except Exception as e:
+                record.update(status='error', error=str(e))
+            yield record
+    finally:
+        pool.shutdown()
+
+
+def _csv_value(value):
+    # Списки и словари записываются в одну ячейку
+    if isinstance(value, (list, tuple)):
+        return "; ".join(_csv_item(item) for item in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {item}" for key, item in value.items())
+    return value
+
+
+def _csv_item(item):
+    if isinstance(item, dict):  # Экстремум
+        return f"{item['kind']}({item['x']:.10g}, {item['y']:.10g})" + \
+            (" на границе" if item['boundary'] else "")
+    return str(item)
+
+
+class JsonLinesWriter:
+    """Одна запись JSON на строку; строка сбрасывается на диск сразу"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class CsvWriter:
+    """Записи в формате CSV с заголовком; строка сбрасывается на диск сразу"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow({key: _csv_value(record.get(key)) for key in CSV_FIELDS})
+        self.stream.flush()
+
+
+WRITERS = {'jsonl': JsonLinesWriter, 'csv': CsvWriter}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch_module",
+        description="Пакетный анализ функций из файла",
+    )
+    parser.add_argument('input', help="файл с функциями, по одной в строке ('-' - стандартный ввод)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="файл результатов ('-' - стандартный вывод)")
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        help="формат вывода (по умолчанию по расширению файла, иначе jsonl)")
+    parser.add_argument('--interval', nargs=2, type=float, metavar=('A', 'B'),
+                        default=DEFAULT_INTERVAL,
+                        help="отрезок для корней, интеграла и экстремумов (по умолчанию -10 10)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="число процессов (по умолчанию по числу ядер, от 2 до 4)")
+    parser.add_argument('--timeout', type=float, default=EXPRESSION_TIMEOUT,
+                        help=f"ограничение времени на выражение, с (по умолчанию {EXPRESSION_TIMEOUT:g})")
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_MB,
+                        help=f"ограничение памяти процесса, МБ (по умолчанию {DEFAULT_MEMORY_MB})")
+    args = parser.parse_args(argv)
+
+    if args.interval[0] >= args.interval[1]:
+        parser.error("начало отрезка должно быть меньше конца")
+    if args.format is None:
+        extension = os.path.splitext(args.output)[1].lower()
+        args.format = 'csv' if extension == '.csv' else 'jsonl'
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    with source:
+        expressions = list(read_expressions(source))
+
+    output = sys.stdout if args.output == '-' else \
+        open(args.output, 'w', encoding='utf-8', newline='')
+    counts = {}
+    try:
+        writer = WRITERS[args.format](output)
+        for record in run_batch(expressions, tuple(args.interval), args.jobs,
+                                args.timeout, args.memory_mb):
+            writer.write(record)
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"Обработано выражений: {len(expressions)} ({summary})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
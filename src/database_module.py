@@ -1,47 +1,120 @@
 import sqlite3
+import threading
+import time
+
+# Наибольшее число разделов анализа в постоянном кэше
+ANALYSIS_CACHE_SIZE = 2000
+# Время ожидания блокировки базы другим процессом, секунд
+BUSY_TIMEOUT = 5.0
+
+# Запросы записаны константами: sqlite3 кэширует подготовленные выражения
+# по тексту запроса, поэтому повторные вызовы не разбирают SQL заново
+_INSERT_HISTORY = "INSERT INTO history (function_text) VALUES (?)"
+_SELECT_HISTORY = "SELECT * FROM history ORDER BY timestamp DESC, id DESC LIMIT ?"
+_SELECT_ANALYSIS = "SELECT result FROM analysis_cache WHERE expression = ? AND section = ?"
+_TOUCH_ANALYSIS = "UPDATE analysis_cache SET last_used = ? WHERE expression = ? AND section = ?"
+_INSERT_ANALYSIS = "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?)"
+_EVICT_ANALYSIS = """DELETE FROM analysis_cache WHERE rowid IN (
+                         SELECT rowid FROM analysis_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                     )"""
+
+# Соединения процесса: имя базы -> (соединение, блокировка)
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def _shared_connection(db_name):
+    """Соединение с базой, общее для всех объектов DatabaseModule процесса"""
+    with _connections_lock:
+        if db_name not in _connections:
+            conn = sqlite3.connect(db_name, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[db_name] = (conn, threading.Lock())
+        return _connections[db_name]
+
 
 class DatabaseModule:
-    def __init__(self, db_name="graph_calculator.db"):
+    """История запросов и постоянный кэш разделов анализа в SQLite.
+
+    Соединение с каждой базой открывается один раз на процесс (при первом
+    обращении) в режиме WAL с synchronous=NORMAL: запись не ждёт fsync, а
+    читатели в других процессах (Sandbox) не блокируют пишущего. Объект
+    хранит только имя базы, поэтому передаётся в другой процесс вместе с
+    AnalysisModule; там все задания пользуются одним соединением процесса.
+    """
+
+    def __init__(self, db_name="graph_calculator.db", analysis_cache_size=ANALYSIS_CACHE_SIZE):
         self.db_name = db_name
+        self.analysis_cache_size = analysis_cache_size
         self.init_database()
-        
+
+    def _connection(self):
+        """Пара (соединение, блокировка); запросы выполняются под блокировкой"""
+        return _shared_connection(self.db_name)
+
+    def close(self):
+        """Закрывает соединение процесса с этой базой"""
+        with _connections_lock:
+            conn, lock = _connections.pop(self.db_name, (None, None))
+        if conn is not None:
+            with lock:
+                conn.close()
+
     def init_database(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                function_text TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        
+        conn, lock = self._connection()
+        with lock:
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        function_text TEXT NOT NULL,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
+                # Готовые разделы анализа по канонической записи (srepr) выражения
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS analysis_cache (
+                        expression TEXT NOT NULL,
+                        section TEXT NOT NULL,
+                        result TEXT NOT NULL,
+                        last_used REAL NOT NULL,
+                        PRIMARY KEY (expression, section)
+                    )
+                ''')
+
     def save_query(self, function_text):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO history (function_text) VALUES (?)",
-            (function_text,)
-        )
-        
-        conn.commit()
-        conn.close()
-        
+        self.save_queries([function_text])
+
+    def save_queries(self, function_texts):
+        """Сохраняет несколько запросов одной транзакцией (загрузка файла функций)"""
+        conn, lock = self._connection()
+        with lock:
+            with conn:
+                conn.executemany(_INSERT_HISTORY, ((text,) for text in function_texts))
+
     def get_history(self, limit=50):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM history ORDER BY timestamp DESC LIMIT ?",
-            (limit,)
-        )
-        
-        history = cursor.fetchall()
-        conn.close()
-        
-        return history
\ No newline at end of file
+        conn, lock = self._connection()
+        with lock:
+            return conn.execute(_SELECT_HISTORY, (limit,)).fetchall()
+
+    def load_analysis(self, expression, section):
+        """Возвращает сохранённый раздел анализа или None"""
+        conn, lock = self._connection()
+        with lock:
+            row = conn.execute(_SELECT_ANALYSIS, (expression, section)).fetchone()
+            if row is not None:
+                # Отмечаем использование для вытеснения давно не нужных записей
+                with conn:
+                    conn.execute(_TOUCH_ANALYSIS, (time.time(), expression, section))
+
+        return row[0] if row is not None else None
+
+    def save_analysis(self, expression, section, result):
+        """Сохраняет раздел анализа; лишние записи вытесняются (LRU)"""
+        conn, lock = self._connection()
+        with lock:
+            with conn:
+                conn.execute(_INSERT_ANALYSIS, (expression, section, result, time.time()))
+                conn.execute(_EVICT_ANALYSIS, (self.analysis_cache_size,))
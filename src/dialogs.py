@@ -1,9 +1,58 @@
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QTextEdit, QDialogButtonBox, 
+    QDialog, QVBoxLayout, QDialogButtonBox, QLabel, QScrollArea, QToolButton, QWidget,
     QListWidget, QPushButton, QHBoxLayout, QMessageBox
 )
 
+class SectionWidget(QWidget):
+    """Сворачиваемый раздел анализа: кнопка-заголовок и текст раздела"""
+
+    expanded = pyqtSignal(str)  # ключ раздела, раскрытого пользователем
+
+    def __init__(self, key, title, expanded=True, parent=None):
+        super().__init__(parent)
+        self.key = key
+        
+        self.button = QToolButton()
+        self.button.setText(title)
+        self.button.setCheckable(True)
+        self.button.setChecked(expanded)
+        self.button.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.button.setStyleSheet("QToolButton { border: none; font-weight: bold; }")
+        self.button.toggled.connect(self.set_expanded)
+        
+        self.body = QLabel()
+        self.body.setWordWrap(True)
+        self.body.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.body.setContentsMargins(18, 0, 0, 6)
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.button)
+        layout.addWidget(self.body)
+        self.setLayout(layout)
+        self.set_expanded(expanded)
+    
+    def set_expanded(self, expanded):
+        self.button.setArrowType(Qt.ArrowType.DownArrow if expanded else Qt.ArrowType.RightArrow)
+        self.body.setVisible(expanded)
+        if expanded:
+            self.expanded.emit(self.key)
+    
+    def set_text(self, text):
+        self.body.setText(text.strip("\n"))
+
+
 class AnalysisDialog(QDialog):
+    """Окно анализа функции: разделы появляются по мере вычисления.
+
+    Дорогие разделы (lazy) показываются свёрнутыми и вычисляются только
+    при первом раскрытии: окно сообщает об этом сигналом section_requested.
+    """
+
+    section_requested = pyqtSignal(str)  # ключ раздела, который нужно вычислить
+
     def __init__(self, parent=None, analysis_text=""):
         super().__init__(parent)
         self.setWindowTitle("Анализ функции")
@@ -12,16 +61,90 @@ class AnalysisDialog(QDialog):
         
         layout = QVBoxLayout()
         
-        self.text_edit = QTextEdit()
-        self.text_edit.setPlainText(analysis_text)
-        self.text_edit.setReadOnly(True)
-        layout.addWidget(self.text_edit)
+        self.sections_widget = QWidget()
+        self.sections_layout = QVBoxLayout()
+        self.sections_layout.addStretch()
+        self.sections_widget.setLayout(self.sections_layout)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.sections_widget)
+        layout.addWidget(scroll)
         
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         button_box.accepted.connect(self.accept)
         layout.addWidget(button_box)
         
         self.setLayout(layout)
+        self._titles = {}
+        self._previews = {}
+        self._sections = {}  # ключ -> текст раздела без заголовка
+        self._widgets = {}
+        self._requested = set()
+        if analysis_text:
+            self.set_sections([('report', "АНАЛИЗ")])
+            self.update_section('report', analysis_text)
+    
+    def set_sections(self, sections, lazy=()):
+        """Показывает заготовки разделов (ключ, заголовок), пока они вычисляются.
+
+        Разделы из lazy свёрнуты, пока пользователь их не раскроет.
+        """
+        for widget in self._widgets.values():
+            widget.deleteLater()
+        self._titles = dict(sections)
+        self._previews = {}
+        self._sections = {}
+        self._widgets = {}
+        self._requested = set()
+        for key, title in sections:
+            expanded = key not in lazy
+            widget = SectionWidget(key, title, expanded)
+            widget.expanded.connect(self._on_expanded)
+            self.sections_layout.insertWidget(self.sections_layout.count() - 1, widget)
+            self._widgets[key] = widget
+            if expanded:
+                self._requested.add(key)
+                self._set_text(key, "Вычисляется...\n")
+            else:
+                self._set_text(key, "Раскройте раздел, чтобы вычислить его\n")
+    
+    def set_preview(self, key, text):
+        """Предварительный результат раздела (например, численные корни)"""
+        self._previews[key] = text
+        self._set_text(key, f"{text}Точное решение вычисляется...\n")
+    
+    def update_section(self, key, text, ok=True):
+        """Заменяет заготовку раздела готовым текстом или причиной неудачи"""
+        # Раздел может прийти уже готовым (из кэша), не дожидаясь раскрытия
+        self._requested.add(key)
+        prefix = f"{self._titles[key]}:\n"
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+        if not ok:
+            # Предварительный результат остаётся, если точный не получен
+            text = self._previews.get(key, '') + text
+        self._set_text(key, text)
+    
+    def is_requested(self, key):
+        """Запрошено ли вычисление раздела (раскрыт ли он хотя бы раз)"""
+        return key in self._requested
+    
+    def section_text(self, key):
+        return self._sections[key]
+    
+    def report_text(self):
+        """Весь отчёт одним текстом: разделы в исходном порядке"""
+        return "\n".join(f"{self._titles[key]}:\n{text}" for key, text in self._sections.items())
+    
+    def _set_text(self, key, text):
+        self._sections[key] = text
+        self._widgets[key].set_text(text)
+    
+    def _on_expanded(self, key):
+        if key not in self._requested:
+            self._requested.add(key)
+            self._set_text(key, "Вычисляется...\n")
+            self.section_requested.emit(key)
 
 class HistoryDialog(QDialog):
     def __init__(self, history_data=None):
@@ -0,0 +1,331 @@
+import ast
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+
+X = sp.Symbol('x')
+
+# Безопасное пространство имён для вычисления выражений
+SAFE_DICT = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'cot': lambda x: 1/np.tan(x),
+    'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'exp': np.exp, 'log': np.log, 'log10': np.log10, 'log2': np.log2,
+    'sqrt': np.sqrt, 'cbrt': np.cbrt, # Кубический корень
+    'abs': np.abs, 'pi': np.pi, 'e': np.e,
+    'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
+    'sign': np.sign,
+    'np': np, # Доступ к модулю numpy
+}
+
+# Имена SAFE_DICT, которые sympy понимает иначе или не знает
+SYMPY_NAMES = {
+    'e': sp.E, 'abs': sp.Abs, 'ceil': sp.ceiling,
+    'arcsin': sp.asin, 'arccos': sp.acos, 'arctan': sp.atan,
+    'log10': lambda a: sp.log(a, 10), 'log2': lambda a: sp.log(a, 2),
+    'np': sp,  # np.sin(x) -> sympy.sin(x)
+}
+
+# Переменные выражений: x для функций, x и y для неравенств и уравнений
+VARIABLES = ('x', 'y')
+
+# Функции numpy, кроме универсальных (ufunc), доступные через np.
+_NUMPY_EXTRA = {'pi', 'e', 'where', 'clip'}
+
+# Допустимые узлы дерева разбора
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+    ast.Name, ast.Attribute, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq,
+)
+
+
+class _Validator(ast.NodeVisitor):
+    """Проверка дерева разбора по белому списку узлов и имён SAFE_DICT"""
+
+    def __init__(self):
+        self.variables = set()
+
+    def generic_visit(self, node):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Недопустимая конструкция: {type(node).__name__}")
+        super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id in VARIABLES:
+            self.variables.add(node.id)
+        elif node.id not in SAFE_DICT or node.id == 'np':
+            raise ValueError(f"Неизвестное имя: {node.id}")
+
+    def visit_Attribute(self, node):
+        # Разрешены только математические функции numpy: np.sin, np.pi...
+        if not (isinstance(node.value, ast.Name) and node.value.id == 'np'
+                and (isinstance(getattr(np, node.attr, None), np.ufunc)
+                     or node.attr in _NUMPY_EXTRA)):
+            raise ValueError(f"Недопустимое обращение: {ast.unparse(node)}")
+
+    def visit_Call(self, node):
+        if node.keywords:
+            raise ValueError("Именованные аргументы не поддерживаются")
+        if isinstance(node.func, ast.Name):
+            if node.func.id in VARIABLES or not callable(SAFE_DICT.get(node.func.id)) \
+                    or node.func.id == 'np':
+                raise ValueError(f"Неизвестная функция: {node.func.id}")
+        elif not isinstance(node.func, ast.Attribute):
+            raise ValueError(f"Недопустимый вызов: {ast.unparse(node)}")
+        self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"Недопустимая константа: {node.value!r}")
+
+
+def validate_tree(tree):
+    """Проверяет дерево разбора выражения; возвращает множество переменных.
+
+    Допускаются арифметика, сравнения, числа, переменные x и y и имена
+    из SAFE_DICT. При нарушении выбрасывается ValueError.
+    """
+    validator = _Validator()
+    validator.visit(tree)
+    return frozenset(validator.variables)
+
+
+class CompiledExpression:
+    """Выражение, разобранное и скомпилированное один раз.
+
+    Вызов объекта вычисляет значения сразу для всего массива x одним
+    векторизованным проходом numpy, без повторного разбора строки.
+    Дерево разбора проверяется validate_tree и компилируется то же самое,
+    без повторного разбора; оно и символьное выражение sympy хранятся
+    вместе с ядром. Недопустимое выражение вызывает ValueError.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tree = ast.parse(text, mode='eval')
+        self.variables = validate_tree(self.tree)  # Использованные переменные
+        self.code = compile(self.tree, '<function>', 'eval')
+        self.namespace = {'__builtins__': {}, **SAFE_DICT}
+        self._sympy_expr = None
+
+    @property
+    def sympy_expr(self):
+        """Символьное выражение, строится при первом обращении"""
+        if self._sympy_expr is None:
+            self._sympy_expr = sp.sympify(self.text, locals=SYMPY_NAMES)
+        return self._sympy_expr
+
+    def __call__(self, x, y=None):
+        x = np.asarray(x, dtype=float)
+        variables = {'x': x}
+        shape = x.shape
+        # Для неравенств и неявных кривых доступна вторая переменная y
+        if y is not None:
+            variables['y'] = np.asarray(y, dtype=float)
+            shape = np.broadcast(x, variables['y']).shape
+        # Деление на ноль, корни из отрицательных чисел и переполнения
+        # дают inf/nan в соответствующих точках, а не исключение
+        with np.errstate(all='ignore'):
+            values = eval(self.code, self.namespace, variables)
+            values = np.asarray(values)
+            if np.iscomplexobj(values):
+                values = np.where(np.imag(values) == 0, np.real(values), np.nan)
+            values = values.astype(float)
+
+        # Константы (например, "5") растягиваем на всю сетку
+        if values.shape != shape:
+            values = np.broadcast_to(values, shape).copy()
+        return values
+
+
+class ExpressionCache:
+    """Ограниченный LRU-кэш скомпилированных выражений.
+
+    Ключ - текст выражения с нормализованными пробелами, поэтому
+    построение, проверка и анализ одной и той же функции разбирают
+    её строку только один раз.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # Кэш используется из потоков вычисления
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(text.split())
+
+    def get(self, text):
+        key = self.normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = CompiledExpression(key)
+        with self._lock:
+            # Другой поток мог успеть скомпилировать то же выражение
+            entry = self._entries.setdefault(key, entry)
+            self._entries.move_to_end(key)
+            self.misses += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Возвращает счётчики попаданий, промахов и вытеснений"""
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# Общий кэш для построения графиков, проверки и анализа
+expression_cache = ExpressionCache()
+
+
+def compile_expression(text):
+    """Возвращает скомпилированное ядро выражения от x (из общего кэша)"""
+    return expression_cache.get(text)
+
+
+class FusedKernel:
+    """Общее ядро для набора функций от x с исключением общих подвыражений.
+
+    Символьные выражения функций разбираются sympy.cse: подвыражение,
+    встречающееся в нескольких функциях (например, sin(x) в sin(x)**2 и
+    exp(sin(x))), вычисляется на сетке один раз и используется всеми.
+    Функции, которые sympy понимает иначе, чем numpy (проверяется
+    сравнением на пробной сетке), вычисляются своими ядрами.
+    Вызов возвращает список массивов значений в порядке texts.
+    Вместо строк можно передать уже скомпилированные выражения: тогда
+    они не разбираются повторно.
+    """
+
+    # Пробная сетка для сверки объединённого ядра с отдельными
+    PROBE = np.concatenate((np.linspace(-50.0, 50.0, 1001), np.linspace(-1.0, 1.0, 257)))
+
+    def __init__(self, expressions):
+        self.kernels = [expression if isinstance(expression, CompiledExpression)
+                        else compile_expression(expression) for expression in expressions]
+        self.texts = tuple(kernel.text for kernel in self.kernels)
+        self.members = []  # Индексы функций, вычисляемых объединённым ядром
+        self._fused = None
+        self.shared = 0
+        self.ops_before = 0
+        self.ops_after = 0
+
+        exprs = {}
+        for i, kernel in enumerate(self.kernels):
+            try:
+                expr = kernel.sympy_expr
+            except Exception:
+                continue
+            if isinstance(expr, sp.Expr) and expr.free_symbols <= {X}:
+                exprs[i] = expr
+        if len(exprs) < 2:
+            return
+
+        replacements, reduced = sp.cse(list(exprs.values()))
+        fused = self._lambdify(replacements, reduced)
+        if fused is None:
+            return
+
+        # Оставляем только функции, совпадающие с отдельным вычислением
+        expected = [self.kernels[i](self.PROBE) for i in exprs]
+        try:
+            actual = self._evaluate(fused, self.PROBE)
+        except Exception:
+            return
+        agree = [np.allclose(a, b, rtol=1e-9, atol=1e-12, equal_nan=True)
+                 for a, b in zip(actual, expected)]
+        if not all(agree):
+            kept = [item for item, ok in zip(exprs.items(), agree) if ok]
+            if len(kept) < 2:
+                return
+            exprs = dict(kept)
+            replacements, reduced = sp.cse(list(exprs.values()))
+            fused = self._lambdify(replacements, reduced)
+            if fused is None:
+                return
+
+        self.members = list(exprs)
+        self._fused = fused
+        self.shared = len(replacements)
+        self.ops_before = sum(sp.count_ops(expr) for expr in exprs.values())
+        self.ops_after = (sum(sp.count_ops(value) for _, value in replacements)
+                          + sum(sp.count_ops(expr) for expr in reduced))
+
+    @staticmethod
+    def _lambdify(replacements, reduced):
+        # Функции, неизвестные sympy (arcsin, log10, cot...), берутся из SAFE_DICT
+        try:
+            return sp.lambdify(X, reduced, modules=[SAFE_DICT, 'numpy'],
+                               cse=lambda exprs: (replacements, reduced))
+        except Exception:
+            return None
+
+    @staticmethod
+    def _evaluate(fused, x):
+        with np.errstate(all='ignore'):
+            results = []
+            for values in fused(x):
+                values = np.asarray(values)
+                if np.iscomplexobj(values):
+                    values = np.where(np.imag(values) == 0, np.real(values), np.nan)
+                results.append(np.broadcast_to(values.astype(float), x.shape).copy())
+        return results
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=float)
+        results = [None] * len(self.texts)
+        if self._fused is not None:
+            for i, values in zip(self.members, self._evaluate(self._fused, x)):
+                results[i] = values
+        for i, kernel in enumerate(self.kernels):
+            if results[i] is None:
+                results[i] = kernel(x)
+        return results
+
+    def stats(self):
+        """Возвращает число общих подвыражений и операций на точку до и после"""
+        return {
+            'functions': len(self.texts),
+            'fused': len(self.members),
+            'shared': self.shared,
+            'ops_before': self.ops_before,
+            'ops_after': self.ops_after,
+        }
+
+
+@lru_cache(maxsize=32)
+def _fuse(expressions):
+    return FusedKernel(expressions)
+
+
+def fuse_expressions(expressions):
+    """Возвращает объединённое ядро для набора выражений (с кэшированием).
+
+    expressions - строки или CompiledExpression (построенные функции
+    передают ядра, разобранные при добавлении на график).
+    """
+    return _fuse(tuple(ExpressionCache.normalize(expression) if isinstance(expression, str)
+                       else expression for expression in expressions))
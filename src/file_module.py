@@ -1,10 +1,15 @@
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 import os
 
+from src.region_module import validate_plot_input
+
 class FileModule:
     @staticmethod
     def load_functions(parent):
-        """Загружает функции из файла с улучшенной обработкой ошибок"""
+        """Загружает функции из файла с улучшенной обработкой ошибок.
+
+        Возвращает пары (строка, результат validate_plot_input).
+        """
         try:
             file_path, _ = QFileDialog.getOpenFileName(
                 parent, "Загрузить функции", "", 
@@ -28,14 +33,13 @@ class FileModule:
                     if not func or func.startswith('#'):
                         continue
                     
-                    # Проверяем корректность функции перед добавлением
+                    # Проверяем корректность функции перед добавлением; результат
+                    # разбора передаётся построению, и строка не разбирается повторно
                     try:
-                        # Простая проверка - пытаемся разобрать функцию
-                        if FileModule.is_valid_function(func):
-                            functions.append(func)
-                        else:
-                            QMessageBox.warning(parent, "Предупреждение", 
-                                              f"Строка {line_num} содержит некорректную функцию: {func}")
+                        functions.append((func, validate_plot_input(func)))
+                    except ValueError:
+                        QMessageBox.warning(parent, "Предупреждение", 
+                                          f"Строка {line_num} содержит некорректную функцию: {func}")
                     except Exception as e:
                         QMessageBox.warning(parent, "Ошибка", 
                                           f"Ошибка в строке {line_num}: {func}\n{str(e)}")
@@ -62,16 +66,12 @@ class FileModule:
         if len(func_text.strip()) == 0:
             return False
         
-        # Проверяем наличие переменной x
-        if 'x' not in func_text:
+        # Разбор по белому списку узлов и имён
+        try:
+            validate_plot_input(func_text.strip())
+        except ValueError:
             return False
         
-        # Проверяем на наличие опасных конструкций (базовая безопасность)
-        dangerous_keywords = ['import', 'exec', 'eval', '__', 'open', 'file']
-        for keyword in dangerous_keywords:
-            if keyword in func_text:
-                return False
-        
         return True
     
     @staticmethod
@@ -18,6 +18,11 @@ class MainWindow(QMainWindow):
         
         self.create_menu()
         
+    def closeEvent(self, event):
+        # Потоки и процессы вычислений не должны переживать окно
+        self.mpl_widget.shutdown()
+        super().closeEvent(event)
+        
     def create_menu(self):
         menubar = self.menuBar()
         
@@ -63,19 +68,30 @@ class MainWindow(QMainWindow):
                 # Очищаем текущие графики
                 self.mpl_widget.clear_all_functions()
                 
+                # Строки уже разобраны; пробное вычисление - порциями в
+                # изолированном процессе, а не отдельным заданием на строку
+                errors = self.mpl_widget.probe_expressions([func for func, _ in functions])
+                
                 # Добавляем каждую функцию
-                success_count = 0
-                for func in functions:
+                plotted = []
+                for (func, parsed), error in zip(functions, errors):
+                    if error is not None:
+                        print(f"Ошибка при построении функции {func}: {error}")
+                        continue
                     try:
                         # Устанавливаем функцию в поле ввода
                         self.mpl_widget.input.setText(func)
                         # Пытаемся построить график
-                        if self.mpl_widget.on_plot_silent():
-                            success_count += 1
+                        if self.mpl_widget.on_plot_silent(save_history=False, parsed=parsed):
+                            plotted.append(func)
                     except Exception as e:
                         print(f"Ошибка при построении функции {func}: {e}")
                         continue
                 
+                # История пополняется одной транзакцией на весь файл
+                self.mpl_widget.database_module.save_queries(plotted)
+                success_count = len(plotted)
+                
                 # Показываем результат
                 if success_count > 0:
                     QMessageBox.information(self, "Успех", 
@@ -103,6 +119,8 @@ class MainWindow(QMainWindow):
     def export_image(self):
         """Экспортирует текущий график в файл изображения"""
         try:
+            # В файл попадает кадр с последними изменениями диапазона
+            self.mpl_widget.flush_redraw()
             FileModule.export_plot(self, self.mpl_widget.canvas)
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать изображение: {str(e)}")
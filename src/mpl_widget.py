@@ -1,10 +1,12 @@
+import os
+from concurrent.futures import CancelledError
+
 import numpy as np
-import sympy as sp
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLineEdit, QPushButton, QLabel, QComboBox, QSlider, QDoubleSpinBox,
-    QGroupBox, QListWidget, QColorDialog, QMessageBox
+    QGroupBox, QListWidget, QColorDialog, QMessageBox, QSpinBox, QCheckBox
 )
 from PyQt6.QtCore import Qt
 from matplotlib.figure import Figure
@@ -13,28 +15,60 @@ from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as Navigatio
 
 from src.database_module import DatabaseModule
 from src.analysis_module import AnalysisModule
+from src.analysis_worker import AnalysisWorker
+from src.numeric_module import ROOT_SCAN_POINTS
 from src.dialogs import AnalysisDialog
+from src.expression_module import CompiledExpression, compile_expression, fuse_expressions
+from src.plot_layer import PlotLayer
+from src.region_module import (ContourCache, ImplicitCurve, Inequality, area_polygons,
+                               implicit_segments, inequality_cells, rects_to_polygons,
+                               probe_plot_input, probe_plot_inputs, validate_plot_input)
+from src.redraw_scheduler import RedrawScheduler
+from src.plot_worker import PlotWorker
+from src.sandbox_module import Sandbox, SandboxError
+from src.sampling_module import (
+    STREAMING_THRESHOLD, TileCache, ParallelEvaluator,
+    adaptive_sample, initial_points, insert_singularities, stream_sample, stream_sample_many
+)
+from src.singularity_module import BOUNDARY, POLE
+
+# Ограничение времени пробного вычисления в изолированном процессе, секунд
+PROBE_TIMEOUT = 2.0
+# Число строк файла в одном пробном задании изолированного процесса
+PROBE_BATCH_SIZE = 64
 
-# Безопасное пространство имён для eval
-_SAFE_DICT = {
-    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'cot': lambda x: 1/np.tan(x),
-    'arcsin': np.arcsin, 'arccos': np.arccos, 'arctan': np.arctan,
-    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
-    'exp': np.exp, 'log': np.log, 'log10': np.log10, 'log2': np.log2,
-    'sqrt': np.sqrt, 'cbrt': np.cbrt, # Кубический корень
-    'abs': np.abs, 'pi': np.pi, 'e': np.e,
-    'floor': np.floor, 'ceil': np.ceil, 'round': np.round,
-    'sign': np.sign,
-    'np': np, # Доступ к модулю numpy
-}
 
 class MplWidget(QWidget):
     def __init__(self, parent=None): 
         super().__init__(parent)
         
         # Инициализация модулей
-        self.analysis_module = AnalysisModule()
         self.database_module = DatabaseModule()
+        # Готовые разделы анализа сохраняются в базе и не пересчитываются
+        self.analysis_module = AnalysisModule(cache=self.database_module)
+        self.tile_cache = TileCache()  # Кэш вычисленных значений по тайлам оси x
+        self.evaluator = ParallelEvaluator()  # Пул потоков для вычисления функций
+        self.contour_cache = ContourCache()  # Отрезки неявных кривых по клеткам
+        self.sandbox = Sandbox()  # Процесс для недоверенных вычислений с лимитами
+        self.sandbox.start()
+        # Процессы пула анализа запускаются при первом задании
+        self.analysis_worker = AnalysisWorker(self.analysis_module, parent=self)
+        self.analysis_worker.section_ready.connect(self.on_section_ready)
+        self.analysis_worker.singularities_ready.connect(self.on_singularities_ready)
+        self.analysis_dialog = None  # Открытое окно анализа (немодальное)
+        self.analysis_text = ""
+        self.analysis_kernel = None
+        self.analysis_interval = None
+        self.area_key = None  # Параметры текущей заливки интеграла
+        self.area_text = ""  # Значение интеграла для строки состояния
+        self.redraw_scheduler = RedrawScheduler(self.redraw_all, parent=self)
+        self.applied_generation = 0  # Поколение выборок, выведенных на график
+        # Пересчёт зависящих от отрезка разделов при его перетаскивании
+        self.analysis_scheduler = RedrawScheduler(self.refresh_analysis_interval, parent=self)
+        self.plot_worker = PlotWorker(self)  # Фоновые вычисления для графиков
+        self.plot_worker.finished.connect(self.on_samples_ready)
+        self.plot_worker.failed.connect(self.on_samples_failed)
+        self.plot_worker.progress.connect(self.on_samples_progress)
         self.current_functions = []  # Список словарей с информацией о функциях
         self.current_color = "blue"
         self.current_style = "Сплошная"
@@ -44,6 +78,7 @@ class MplWidget(QWidget):
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
         self.ax = self.figure.add_subplot(111)
+        self.plot_layer = PlotLayer(self.ax, self.canvas)  # Линии функций между перерисовками
         
         self.status = QLabel("")  # для сообщений об ошибке
 
@@ -60,7 +95,7 @@ class MplWidget(QWidget):
         input_layout = QHBoxLayout()
         
         self.input = QLineEdit()
-        self.input.setPlaceholderText("Введите функцию от x, например: 1/(x-2) или tan(x)")
+        self.input.setPlaceholderText("Введите функцию от x, уравнение или неравенство, например: 1/(x-2), x**2 + y**2 = 25, y > x**2")
         self.btn = QPushButton("Построить")
         self.analyze_btn = QPushButton("Анализ функции")
         
@@ -126,7 +161,8 @@ class MplWidget(QWidget):
         
         range_layout.addWidget(QLabel("Точек:"), 0, 4)
         self.x_points_spin = QDoubleSpinBox()
-        self.x_points_spin.setRange(100, 10000)
+        self.x_points_spin.setDecimals(0)
+        self.x_points_spin.setRange(100, 100_000_000)
         self.x_points_spin.setValue(1000)
         self.x_points_spin.setSingleStep(500)
         range_layout.addWidget(self.x_points_spin, 0, 5)
@@ -146,6 +182,34 @@ class MplWidget(QWidget):
         self.y_max_spin.setSingleStep(1.0)
         range_layout.addWidget(self.y_max_spin, 1, 3)
         
+        range_layout.addWidget(QLabel("Потоков:"), 1, 4)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(os.cpu_count() or 1, 1) * 2)
+        self.workers_spin.setValue(self.evaluator.max_workers)
+        range_layout.addWidget(self.workers_spin, 1, 5)
+        
+        # Строка 3: Отрезок для численного анализа
+        range_layout.addWidget(QLabel("Анализ от:"), 2, 0)
+        self.analysis_a_spin = QDoubleSpinBox()
+        self.analysis_a_spin.setRange(-1000.0, 1000.0)
+        self.analysis_a_spin.setValue(-10.0)
+        self.analysis_a_spin.setSingleStep(1.0)
+        range_layout.addWidget(self.analysis_a_spin, 2, 1)
+        
+        range_layout.addWidget(QLabel("до:"), 2, 2)
+        self.analysis_b_spin = QDoubleSpinBox()
+        self.analysis_b_spin.setRange(-1000.0, 1000.0)
+        self.analysis_b_spin.setValue(10.0)
+        self.analysis_b_spin.setSingleStep(1.0)
+        range_layout.addWidget(self.analysis_b_spin, 2, 3)
+        
+        # Заливка площади под графиком на отрезке анализа
+        self.integral_check = QCheckBox("Закрасить ∫ на отрезке")
+        range_layout.addWidget(self.integral_check, 2, 4, 1, 2)
+        self.analysis_a_spin.valueChanged.connect(self.analysis_scheduler.request)
+        self.analysis_b_spin.valueChanged.connect(self.analysis_scheduler.request)
+        self.integral_check.toggled.connect(self.analysis_scheduler.request)
+        
         range_group.setLayout(range_layout)
         control_layout.addWidget(range_group)
         
@@ -192,12 +256,15 @@ class MplWidget(QWidget):
         self.changecolor.currentTextChanged.connect(self.on_color_changed)
         self.changestyle.currentTextChanged.connect(self.on_style_changed)
         self.changeColorBtn.clicked.connect(self.on_color_dialog)
-        self.x_min_spin.valueChanged.connect(self.redraw_all)
-        self.x_max_spin.valueChanged.connect(self.redraw_all)
-        self.y_min_spin.valueChanged.connect(self.redraw_all)
-        self.y_max_spin.valueChanged.connect(self.redraw_all)
-        self.x_points_spin.valueChanged.connect(self.redraw_all)
+        # Изменения диапазонов объединяются в одну перерисовку за кадр
+        self.x_min_spin.valueChanged.connect(self.redraw_scheduler.request)
+        self.x_max_spin.valueChanged.connect(self.redraw_scheduler.request)
+        self.y_min_spin.valueChanged.connect(self.redraw_scheduler.request)
+        self.y_max_spin.valueChanged.connect(self.redraw_scheduler.request)
+        self.x_points_spin.valueChanged.connect(self.redraw_scheduler.request)
+        self.workers_spin.valueChanged.connect(self.on_workers_changed)
         self.function_list.itemClicked.connect(self.on_function_selected)
+        self.function_list.itemSelectionChanged.connect(self.analysis_scheduler.request)
         self.update_style_btn.clicked.connect(self.update_selected_function_style)
         self.remove_function_btn.clicked.connect(self.remove_selected_function)
         self.clear_all_btn.clicked.connect(self.clear_all_functions)
@@ -249,28 +316,188 @@ class MplWidget(QWidget):
             QMessageBox.warning(self, "Ошибка", "Введите функцию для анализа")
             return
             
+        interval = (self.analysis_a_spin.value(), self.analysis_b_spin.value())
+        if interval[0] >= interval[1]:
+            QMessageBox.warning(self, "Ошибка", "Начало отрезка анализа должно быть меньше конца")
+            return
+        
         try:
-            analysis_result = self.analysis_module.analyze_function(func_text)
-            dialog = AnalysisDialog(self, analysis_result)
-            dialog.exec()
+            kernel = compile_expression(func_text)
+            if 'y' in kernel.variables:
+                raise ValueError("анализ доступен только для функций от x")
+            # Пробное вычисление в изолированном процессе: дальше ядро
+            # можно безопасно вычислять в этом процессе
+            self.check_expression(func_text)
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка анализа: {str(e)}")
+            return
+        
+        # Разделы анализа считаются параллельно в изолированных процессах,
+        # каждый со своим ограничением времени, и появляются по мере готовности.
+        # Окно немодальное: при изменении отрезка разделы, зависящие от
+        # него, пересчитываются без повторного открытия
+        if self.analysis_dialog is not None:
+            self.analysis_dialog.close()
+        # Заливка интеграла строится по текущему диапазону, а не по отложенному
+        self.redraw_scheduler.flush()
+        dialog = AnalysisDialog(self)
+        dialog.setModal(False)
+        # Дорогие разделы (пределы, интеграл) вычисляются при раскрытии
+        dialog.set_sections([(key, title) for key, title, _ in self.analysis_module.SECTIONS],
+                            lazy=self.analysis_module.LAZY_SECTIONS)
+        dialog.section_requested.connect(self.on_section_requested)
+        dialog.finished.connect(self.on_analysis_closed)
+        self.analysis_dialog = dialog
+        self.analysis_text = func_text
+        self.analysis_kernel = kernel
+        self.analysis_interval = interval
+        self.analysis_worker.submit(func_text, interval)
+        self.update_numeric_sections(interval)
+        dialog.show()
+
+    def refresh_analysis_interval(self):
+        """Пересчитывает заливку интеграла и разделы, зависящие от отрезка"""
+        if self.update_integral_area():
+            self.plot_layer.draw()
+        if self.analysis_dialog is None:
+            return
+        interval = (self.analysis_a_spin.value(), self.analysis_b_spin.value())
+        if interval[0] >= interval[1] or interval == self.analysis_interval:
+            return
+        self.analysis_interval = interval
+        keys = [key for key in self.analysis_module.INTERVAL_SECTIONS
+                if key not in self.analysis_module.NUMERIC_SECTIONS
+                and self.analysis_dialog.is_requested(key)]
+        self.analysis_worker.submit(self.analysis_text, interval, keys)
+        self.update_numeric_sections(interval)
+
+    def update_numeric_sections(self, interval):
+        """Численные результаты на отрезке: считаются за миллисекунды на месте"""
+        dialog = self.analysis_dialog
+        kernel = self.analysis_kernel
+        try:
+            samples = self.tile_cache.sample(self.analysis_text, kernel, *interval,
+                                             ROOT_SCAN_POINTS)
+        except Exception:
+            samples = None
+        
+        # Численные корни показываются сразу, до результата символьного solve
+        try:
+            roots = self.analysis_module.numeric_roots(kernel, interval, samples)
+            dialog.set_preview('intercepts', self.analysis_module.numeric_roots_text(roots, interval))
+        except Exception:
+            pass
+        for key in self.analysis_module.NUMERIC_SECTIONS:
+            try:
+                dialog.update_section(key, self.analysis_module.section(kernel, key, interval))
+            except Exception as e:
+                dialog.update_section(key, f"Ошибка: {e}\n", ok=False)
+
+    def area_function(self):
+        """Функция для заливки интеграла: выбранная в списке, иначе последняя построенная"""
+        selected = [self.function_list.row(item) for item in self.function_list.selectedItems()]
+        candidates = [self.current_functions[i] for i in selected
+                      if 0 <= i < len(self.current_functions)]
+        for function_info in candidates or reversed(self.current_functions):
+            # Неравенства и неявные кривые не являются функциями от x
+            if isinstance(function_info['parsed'], CompiledExpression):
+                return function_info, function_info['parsed']
+        return None, None
+
+    def update_integral_area(self):
+        """Обновляет заливку площади под графиком; True, если она изменилась.
+
+        Функции на графике уже прошли проверку в изолированном процессе,
+        поэтому интеграл считается на месте за миллисекунды.
+        """
+        a, b = self.analysis_a_spin.value(), self.analysis_b_spin.value()
+        function_info, kernel = self.area_function() \
+            if self.integral_check.isChecked() and a < b else (None, None)
+        if function_info is None:
+            changed = self.area_key is not None
+            self.plot_layer.set_area([])
+            self.area_key = None
+            self.area_text = ""
+            return changed
+        
+        y_min, y_max = self.y_min_spin.value(), self.y_max_spin.value()
+        key = (function_info['expression'], a, b, y_min, y_max,
+               function_info['color'], function_info['alpha'])
+        if key == self.area_key:
+            return False
+        self.area_key = key
+        
+        expression = function_info['expression']
+        # Интеграл разбивается в известных полюсах и границах области определения
+        points = self.singular_points(function_info, a, b)
+        try:
+            value, error = self.analysis_module.numeric_integral(
+                kernel, (a, b), np.concatenate(points) if points is not None else ())
+            self.area_text = f"{expression}: " + \
+                self.analysis_module.numeric_integral_text(value, error, (a, b)).strip()
+        except ValueError as e:
+            self.area_text = f"{expression}: {e}"
+        self.status.setText(self.area_text)
+        x, y = self.tile_cache.sample(expression, kernel, a, b, ROOT_SCAN_POINTS)
+        if points is not None:
+            x, y = insert_singularities(kernel, x, y, *points)
+        # Полюса обрезаются чуть за пределами вида: огромные координаты
+        # многоугольника не нужны для отрисовки
+        span = y_max - y_min
+        y = np.clip(y, y_min - span, y_max + span)
+        self.plot_layer.set_area(area_polygons(x, y), function_info['color'],
+                                 function_info['alpha'])
+        return True
+
+    def on_section_requested(self, key):
+        """Пользователь раскрыл раздел, который ещё не вычислялся"""
+        if self.analysis_dialog is not None:
+            self.analysis_worker.submit(self.analysis_text, self.analysis_interval, [key])
+
+    def on_section_ready(self, generation, key, text, ok):
+        if self.analysis_dialog is not None and self.analysis_worker.is_current(generation, key):
+            self.analysis_dialog.update_section(key, text, ok)
+
+    def shutdown(self):
+        """Останавливает фоновые потоки и процессы вычислений (при закрытии окна)"""
+        if self.analysis_dialog is not None:
+            self.analysis_dialog.close()
+        self.plot_worker.shutdown()
+        self.evaluator.shutdown()
+        self.analysis_worker.shutdown()
+        self.sandbox.shutdown()
+        self.database_module.close()
+
+    def on_analysis_closed(self):
+        self.analysis_worker.cancel()
+        self.analysis_dialog = None
+        self.analysis_kernel = None
 
     def on_plot(self):
         expression = self.input.text().strip()
         if not expression:
             return
+        
+        # Недопустимые и зависающие выражения отклоняются до построения
+        try:
+            parsed = self.check_expression(expression)
+        except Exception as e:
+            # ValueError, SandboxError; прочие ошибки не должны завершать программу
+            self.status.setText(f"Ошибка в выражении {expression}: {e}")
+            return
             
         # Создаем словарь с информацией о функции
         function_info = {
             'expression': expression,
             'color': self.current_color,
             'style': self.current_style,
-            'alpha': self.current_alpha
+            'alpha': self.current_alpha,
+            'parsed': parsed  # Функция от x, неравенство или уравнение
         }
         
         # Добавляем функцию в список
         self.current_functions.append(function_info)
+        self.request_singularities(function_info, parsed)
         
         # Добавляем в список отображения
         display_text = f"{expression} (цвет: {self.get_color_name(self.current_color)}, стиль: {self.current_style})"
@@ -281,6 +508,89 @@ class MplWidget(QWidget):
         self.redraw_all()
         self.input.clear()
 
+    def check_expression(self, expression):
+        """Проверяет выражение перед добавлением на график.
+
+        Разбор по белому списку выполняется здесь, а пробное вычисление -
+        в изолированном процессе: выражение, которое вычисляется дольше
+        PROBE_TIMEOUT или превышает лимит памяти, не попадает в построение.
+        Выбрасывает ValueError или SandboxError; возвращает результат разбора
+        (CompiledExpression, Inequality или ImplicitCurve).
+        """
+        parsed = validate_plot_input(expression)
+        self.sandbox.run(
+            probe_plot_input, expression,
+            self.x_min_spin.value(), self.x_max_spin.value(),
+            self.y_min_spin.value(), self.y_max_spin.value(),
+            timeout=PROBE_TIMEOUT
+        )
+        return parsed
+
+    def probe_expressions(self, expressions):
+        """Пробное вычисление строк файла в изолированном процессе порциями.
+
+        Одно задание проверяет PROBE_BATCH_SIZE строк за PROBE_TIMEOUT;
+        если порция не уложилась (зависающее выражение), её строки
+        проверяются по одной. Возвращает для каждой строки текст ошибки
+        или None.
+        """
+        view = (self.x_min_spin.value(), self.x_max_spin.value(),
+                self.y_min_spin.value(), self.y_max_spin.value())
+        errors = []
+        for start in range(0, len(expressions), PROBE_BATCH_SIZE):
+            batch = expressions[start:start + PROBE_BATCH_SIZE]
+            try:
+                errors.extend(self.sandbox.run(probe_plot_inputs, batch, *view,
+                                               timeout=PROBE_TIMEOUT))
+                continue
+            except SandboxError:
+                pass
+            for expression in batch:
+                try:
+                    self.sandbox.run(probe_plot_input, expression, *view, timeout=PROBE_TIMEOUT)
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(str(e))
+        return errors
+
+    def request_singularities(self, function_info, parsed):
+        """Запрашивает индекс особых точек функции от x.
+
+        Индекс строится в пуле процессов анализа; пока его нет, график
+        строится с обрезкой по y, а по готовности перестраивается с
+        разрывами точно в полюсах (on_singularities_ready).
+        """
+        function_info['singularities'] = None
+        if isinstance(parsed, CompiledExpression):
+            self.analysis_worker.submit_singularities(function_info['expression'])
+
+    def on_singularities_ready(self, expression, index):
+        updated = False
+        for function_info in self.current_functions:
+            if function_info['expression'] == expression and \
+                    function_info.get('singularities') is not index:
+                function_info['singularities'] = index
+                self.plot_layer.invalidate(function_info)
+                updated = True
+        if updated:
+            self.area_key = None
+            self.redraw_scheduler.request()
+
+    def singular_points(self, function_info, x_min, x_max):
+        """Полюса и границы области определения функции на [x_min, x_max].
+
+        None, если индекс неполон или полюсов на отрезке больше, чем имеет
+        смысл вставлять в выборку.
+        """
+        index = function_info.get('singularities')
+        if index is None or not index.complete:
+            return None
+        poles = index.points_in(x_min, x_max, POLE)
+        boundaries = index.points_in(x_min, x_max, BOUNDARY)
+        if poles is None or boundaries is None:
+            return None
+        return poles, boundaries
+
     def get_color_name(self, color_value):
         """Преобразует значение цвета в читаемое имя"""
         color_map = {
@@ -295,9 +605,6 @@ class MplWidget(QWidget):
 
     def redraw_all(self):
         """Перерисовывает все графики функций"""
-        # Очищаем предыдущий график
-        self.ax.clear()
-        
         x_min = self.x_min_spin.value()
         x_max = self.x_max_spin.value()
         num_points = int(self.x_points_spin.value())
@@ -308,103 +615,256 @@ class MplWidget(QWidget):
         if x_min >= x_max:
             self.status.setText("Ошибка: X_min должен быть меньше X_max.")
             return
+        if y_min >= y_max:
+            self.status.setText("Ошибка: Y_min должен быть меньше Y_max.")
+            return
 
-        x = np.linspace(x_min, x_max, num_points)
+        # Размер области графика в пикселях для оценки погрешности выборки
+        width_px = max(self.ax.bbox.width, 1.0)
+        height_px = max(self.ax.bbox.height, 1.0)
+        view = (x_min, x_max, y_min, y_max, num_points, width_px, height_px)
+        
+        # Линии удалённых функций убираем, остальные сохраняются между перерисовками
+        self.plot_layer.keep_only(self.current_functions)
+        self.update_integral_area()
+        
+        # Пересчитываем только функции, чья выборка не соответствует текущему виду.
+        # Вычисления идут в фоновом потоке, GUI-поток только обновляет линии
+        stale = [function_info for function_info in self.current_functions
+                 if self.plot_layer.needs_data(function_info, view)]
+        self.plot_worker.submit(
+            lambda report, cancelled: self.compute_samples(stale, view, report, cancelled)
+        )
+
+    def compute_samples(self, functions, view, report, cancelled):
+        """Вычисляет выборки функций для вида view; выполняется в фоновом потоке"""
+        x_min, x_max, y_min, y_max, num_points, width_px, height_px = view
+        done = []
         
-        # Строим все функции
-        for i, function_info in enumerate(self.current_functions):
-            try:
-                expression = function_info['expression']
-                
-                # Вычисляем значения функции
-                y = self.evaluate_function(expression, x)
-                
-                # Получаем настройки стиля из информации о функции
-                color = function_info['color']
-                style = function_info['style']
-                alpha = function_info['alpha']
-                
-                # Отрисовываем функцию
-                self.plot_single_function(x, y, expression, color, style, alpha, y_min, y_max)
-                
-            except Exception as e:
-                self.status.setText(f"Ошибка при построении {expression}: {e}")
+        # Общая сетка обычных функций считается одним объединённым ядром
+        bases, fusion = self.compute_shared_bases(functions, view, cancelled)
+        
+        def sample(function_info):
+            if cancelled():
+                raise CancelledError()
+            
+            # Неравенство: область решений строится по квадродереву клеток
+            parsed = function_info['parsed']
+            if isinstance(parsed, Inequality):
+                rects = inequality_cells(parsed, x_min, x_max, y_min, y_max,
+                                         width_px, height_px)
+                done.append(function_info)
+                report(f"Построение: {len(done)} из {len(functions)}")
+                return rects_to_polygons(rects)
+            
+            # Уравнение от x и y: неявная кривая строится по клеткам marching squares
+            if isinstance(parsed, ImplicitCurve):
+                segments = implicit_segments(parsed, x_min, x_max, y_min, y_max,
+                                             width_px, height_px, cache=self.contour_cache)
+                done.append(function_info)
+                report(f"Построение: {len(done)} из {len(functions)}")
+                return segments
+            
+            points = self.singular_points(function_info, x_min, x_max)
+            x, y = self.sample_function(
+                function_info['expression'], parsed, x_min, x_max, y_min, y_max,
+                num_points, width_px, height_px, cancelled, bases.get(id(function_info)),
+                points
+            )
+            done.append(function_info)
+            report(f"Построение: {len(done)} из {len(functions)}")
+            if points is None:
+                # Особые точки неизвестны: значения за пределами y_min/y_max
+                # заменяются на NaN, чтобы ветви не соединялись через асимптоты
+                return x, np.where((y < y_min) | (y > y_max), np.nan, y)
+            # Линия уже разорвана в полюсах; выбросы прижимаются к полосе вокруг
+            # вида, чтобы кривая доходила до края графика
+            span = y_max - y_min
+            return x, np.clip(y, y_min - span, y_max + span)
+        
+        # Выборки вычисляются параллельно, порядок сохраняется
+        samples = self.evaluator.map(sample, functions)
+        if cancelled():
+            raise CancelledError()
+        return view, list(zip(functions, samples)), fusion
+
+    def compute_shared_bases(self, functions, view, cancelled):
+        """Равномерные сетки обычных функций, вычисленные объединённым ядром.
+
+        Общие подвыражения набора функций (sympy.cse) вычисляются на сетке
+        один раз. Возвращает словарь id(function_info) -> (x, y) и
+        статистику объединения; если общих подвыражений нет, словарь пуст
+        и функции считаются по отдельности параллельно.
+        """
+        x_min, x_max, y_min, y_max, num_points, width_px, height_px = view
+        curves = [function_info for function_info in functions
+                  if isinstance(function_info['parsed'], CompiledExpression)]
+        if len(curves) < 2:
+            return {}, None
+        
+        expressions = [function_info['expression'] for function_info in curves]
+        kernel = fuse_expressions([function_info['parsed'] for function_info in curves])
+        if not kernel.shared:
+            return {}, None
+        
+        try:
+            if num_points > STREAMING_THRESHOLD:
+                bases = stream_sample_many(kernel, len(curves), x_min, x_max, num_points,
+                                           columns=width_px, cancelled=cancelled)
+            else:
+                bases = self.tile_cache.sample_many(expressions, kernel, x_min, x_max,
+                                                    initial_points(num_points))
+        except CancelledError:
+            raise
+        except Exception:
+            # Ошибку конкретной функции покажет её отдельное вычисление
+            return {}, None
+        return {id(function_info): base for function_info, base in zip(curves, bases)}, \
+            kernel.stats()
+
+    def on_samples_ready(self, generation, result):
+        """Применяет вычисленные выборки к линиям графика (в GUI-потоке)"""
+        # Результаты устаревших запросов отбрасываются; уже применённые
+        # (flush_redraw) повторно не отрисовываются
+        if generation == self.applied_generation or not self.plot_worker.is_current(generation):
+            return
+        self.applied_generation = generation
+        
+        view, samples, fusion = result
+        x_min, x_max, y_min, y_max = view[:4]
+        
+        # Пока шли вычисления, функции могли удалить
+        self.plot_layer.keep_only(self.current_functions)
+        
+        # Строим функции
+        for function_info, (sample, error) in samples:
+            i = self.function_index(function_info)
+            if i < 0:
+                continue
+            expression = function_info['expression']
+            if error is not None:
+                self.status.setText(f"Ошибка при построении {expression}: {error}")
                 # Удаляем проблемную функцию из списка
                 self.current_functions.pop(i)
                 self.function_list.takeItem(i)
                 return
-        
-        self.ax.set_title("Графики функций")
-        self.ax.set_xlabel('x')
-        self.ax.set_ylabel('y')
-        self.ax.grid(True)
-        self.ax.legend()
-        
-        self.ax.set_xlim(x_min, x_max)
-        self.ax.set_ylim(y_min, y_max)
-        self.figure.tight_layout()
-        self.canvas.draw()
-        self.status.setText("")
-
-    def evaluate_function(self, expression, x):
-        """Вычисляет значения функции для массива x"""
-        # Отдельная функция в классе для удобства использования
-        def safe_eval(expr, val, safe_dict):
-            try:
-                return eval(expr, {"x": val, **safe_dict})
-            except (ZeroDivisionError, ValueError, OverflowError):
-                self.status.setText('Ошибка при построении')
-                raise Exception('Знаменатель равен 0')
-        
-        # Векторизуем safe_eval для применения ко всему массиву x
-        vectorized_func = np.vectorize(lambda val: safe_eval(expression, val, _SAFE_DICT))
-        return vectorized_func(x)
+            
+            # Отрисовываем функцию, неявную кривую или область неравенства
+            parsed = function_info['parsed']
+            if isinstance(parsed, Inequality):
+                self.plot_layer.set_region(function_info, sample, view,
+                                           function_info['color'], function_info['alpha'])
+            elif isinstance(parsed, ImplicitCurve):
+                self.plot_layer.set_curve(function_info, sample, view, function_info['color'],
+                                          self.get_linestyle(function_info['style']),
+                                          function_info['alpha'])
+            else:
+                x, y = sample
+                self.plot_single_function(function_info, x, y, view)
+        
+        self.plot_layer.update_legend(self.current_functions)
+        
+        # При смене пределов меняются деления осей: нужна полная отрисовка,
+        # иначе достаточно вывести изменённые линии поверх сохранённого фона
+        limits_changed = self.plot_layer.set_limits(x_min, x_max, y_min, y_max)
+        if limits_changed:
+            self.figure.tight_layout()
+        self.plot_layer.draw(full=limits_changed)
+        
+        # Сообщаем, сколько вычислений сэкономило объединённое ядро;
+        # значение закрашенного интеграла остаётся в строке состояния
+        messages = [self.area_text] if self.area_text else []
+        if fusion is not None:
+            messages.append(
+                f"Общих подвыражений: {fusion['shared']}, операций на точку: "
+                f"{fusion['ops_before']} → {fusion['ops_after']}"
+            )
+        # Сколько запросов перерисовки текущей серии объединено в одну
+        burst = self.redraw_scheduler.take_burst()
+        if burst['dropped']:
+            messages.append(f"Запросов перерисовки: {burst['requested']}, "
+                            f"пропущено кадров: {burst['dropped']}")
+        self.status.setText("; ".join(messages))
+
+    def flush_redraw(self):
+        """Выполняет отложенную перерисовку и дожидается её результата.
+
+        Нужна перед экспортом изображения: иначе в файл попадёт кадр до
+        последнего изменения диапазона.
+        """
+        self.redraw_scheduler.flush()
+        generation, result = self.plot_worker.wait()
+        if result is not None:
+            self.on_samples_ready(generation, result)
+
+    def on_workers_changed(self, count):
+        """Новое число потоков применяется со следующего построения"""
+        self.evaluator.set_workers(count)
+        self.redraw_scheduler.request()
+
+    def function_index(self, function_info):
+        """Индекс функции в списке (по объекту, а не по содержимому) или -1"""
+        for i, current in enumerate(self.current_functions):
+            if current is function_info:
+                return i
+        return -1
 
-    def plot_single_function(self, x, y, expression, color, style, alpha, y_min, y_max):
+    def on_samples_failed(self, generation, error):
+        if self.plot_worker.is_current(generation) and not isinstance(error, CancelledError):
+            self.status.setText(f"Ошибка при построении: {error}")
+
+    def on_samples_progress(self, generation, text):
+        if generation == self.plot_worker.generation:
+            self.status.setText(text)
+
+    def sample_function(self, expression, kernel, x_min, x_max, y_min, y_max, num_points,
+                        width_px, height_px, cancelled=None, base=None, points=None):
+        """Вычисляет выборку (x, y) одной функции; вызывается из потоков пула.
+
+        kernel - скомпилированное выражение (разобрано при построении),
+        base - уже вычисленная общая сетка функции (см. compute_shared_bases),
+        points - полюса и границы области определения (см. singular_points).
+        """
+        
+        # Очень большие сетки считаются порциями и сразу прореживаются по пикселям
+        if num_points > STREAMING_THRESHOLD:
+            if base is None:
+                base = stream_sample(kernel, x_min, x_max, num_points, columns=width_px,
+                                     cancelled=cancelled)
+            return base if points is None else insert_singularities(kernel, *base, *points)
+        
+        # Равномерная основа берётся из кэша тайлов, затем адаптивно уточняется;
+        # num_points - общий бюджет точек. Особые точки вставляются до уточнения
+        if base is None:
+            base = self.tile_cache.sample(
+                expression, kernel, x_min, x_max, initial_points(num_points)
+            )
+        if points is not None:
+            base = insert_singularities(kernel, *base, *points)
+        return adaptive_sample(
+            kernel, x_min, x_max, y_min, y_max, max_points=num_points,
+            width_px=width_px, height_px=height_px, initial=base
+        )
+
+    def plot_single_function(self, function_info, x, y, view):
         """Отрисовывает одну функцию на графике"""
+        # Одна линия на функцию: matplotlib сам разрывает её в точках NaN,
+        # поэтому асимптоты не соединяются, а в легенде одна запись
+        self.plot_layer.set_data(
+            function_info, x, y, view,
+            function_info['color'], self.get_linestyle(function_info['style']),
+            function_info['alpha']
+        )
+
+    def get_linestyle(self, style):
+        """Преобразует название стиля в обозначение matplotlib"""
         style_map = {
             "Сплошная": '-',
             "Пунктирная": '--',
             "Точка-штрих": '-.',
             "Точечная": ':'
         }
-
-        linestyle = style_map.get(style, '-')
-
-        # Заменяем значения, которые выходят за пределы y_min/y_max, на NaN
-        y_clipped = np.copy(y)
-        y_clipped[y_clipped < y_min] = np.nan
-        y_clipped[y_clipped > y_max] = np.nan
-        
-        # Разбиваем график на непрерывные сегменты для избежания соединения асимптот
-        segments = self._split_into_segments(x, y_clipped)
-        
-        # Строим каждый сегмент отдельно
-        for seg_x, seg_y in segments:
-            if len(seg_x) > 1:
-                self.ax.plot(seg_x, seg_y, color=color, linestyle=linestyle,
-                           linewidth=1.5, alpha=alpha, label=expression)
-
-    def _split_into_segments(self, x_vals, y_vals):
-        """Разбивает данные на непрерывные сегменты, разделяя в точках разрыва"""
-        segments = []
-        current_segment_x = []
-        current_segment_y = []
-        
-        for i in range(len(x_vals)):
-            if not np.isnan(y_vals[i]):
-                current_segment_x.append(x_vals[i])
-                current_segment_y.append(y_vals[i])
-            else:
-                if current_segment_x:
-                    segments.append((current_segment_x, current_segment_y))
-                    current_segment_x = []
-                    current_segment_y = []
-        
-        if current_segment_x:
-            segments.append((current_segment_x, current_segment_y))
-            
-        return segments
+        return style_map.get(style, '-')
 
     def on_function_selected(self, item):
         """При выборе функции из списка обновляем панель управления её параметрами"""
@@ -455,7 +915,14 @@ class MplWidget(QWidget):
                 expression = self.current_functions[index]['expression']
                 display_text = f"{expression} (цвет: {self.get_color_name(self.current_color)}, стиль: {self.current_style})"
                 item.setText(display_text)
-        self.redraw_all()
+                
+                # Меняем только стиль существующей линии, без пересчёта данных
+                self.plot_layer.restyle(
+                    self.current_functions[index], self.current_color,
+                    self.get_linestyle(self.current_style), self.current_alpha
+                )
+        self.plot_layer.update_legend(self.current_functions)
+        self.plot_layer.draw()
 
     def remove_selected_function(self):
         """Удаляет выбранную функцию из списка и перерисовывает графики"""
@@ -478,47 +945,51 @@ class MplWidget(QWidget):
         self.function_list.clear()
         self.redraw_all()
 
-    def on_plot_silent(self):
-        """Построение графика без сообщений об ошибках (для пакетной обработки)"""
+    def on_plot_silent(self, save_history=True, parsed=None):
+        """Построение графика без сообщений об ошибках (для пакетной обработки).
+
+        save_history=False - выражение не записывается в историю: при загрузке
+        файла вызывающий сохраняет все построенные функции одной транзакцией.
+        parsed - уже проверенный результат разбора (загрузка файла разбирает
+        строки и пробует их в изолированном процессе заранее): проверка не
+        повторяется.
+        """
         expression = self.input.text().strip()
         if not expression:
             return False
             
         try:
             # Создаем словарь с информацией о функции
+            # Выражение проверяется разбором по белому списку, а пробное
+            # вычисление идёт в изолированном процессе
+            if parsed is None:
+                try:
+                    parsed = self.check_expression(expression)
+                except Exception:
+                    return False
+            
             function_info = {
                 'expression': expression,
                 'color': self.current_color,
                 'style': self.current_style,
-                'alpha': self.current_alpha
+                'alpha': self.current_alpha,
+                'parsed': parsed
             }
             
-            # Проверяем, можно ли вычислить функцию
-            x_min = self.x_min_spin.value()
-            x_max = self.x_max_spin.value()
-            num_points = 10  # Минимальное количество точек для проверки
-            x_test = np.linspace(x_min, x_max, num_points)
+            # Добавляем функцию в список
+            self.current_functions.append(function_info)
+            self.request_singularities(function_info, parsed)
             
-            try:
-                y_test = self.evaluate_function(expression, x_test)
-                # Если есть хотя бы одно не-NaN значение, функция считается валидной
-                if not np.all(np.isnan(y_test)):
-                    # Добавляем функцию в список
-                    self.current_functions.append(function_info)
-                    
-                    # Добавляем в список отображения
-                    display_text = f"{expression} (цвет: {self.get_color_name(self.current_color)}, стиль: {self.current_style})"
-                    self.function_list.addItem(display_text)
-                    
-                    # Сохраняем в историю
-                    self.database_module.save_query(expression)
-                    self.redraw_all()
-                    
-                    return True
-            except:
-                pass
-                
-            return False
+            # Добавляем в список отображения
+            display_text = f"{expression} (цвет: {self.get_color_name(self.current_color)}, стиль: {self.current_style})"
+            self.function_list.addItem(display_text)
+            
+            # Сохраняем в историю
+            if save_history:
+                self.database_module.save_query(expression)
+            self.redraw_all()
+            
+            return True
             
         except Exception:
             return False
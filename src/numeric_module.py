@@ -0,0 +1,416 @@
+import numpy as np
+
+# Точность уточнения корня по x
+ROOT_TOLERANCE = 1e-10
+# Число точек сетки для поиска смены знака
+ROOT_SCAN_POINTS = 2001
+# Допустимая погрешность интеграла (абсолютная и относительная)
+INTEGRAL_TOLERANCE = 1e-10
+# Предельное число вычисленных подотрезков при интегрировании
+INTEGRAL_MAX_INTERVALS = 4000
+# Начальное разбиение отрезка интегрирования: узкий пик не проскакивает между узлами
+INTEGRAL_MIN_INTERVALS = 16
+# Относительный сдвиг узла, попавшего в устранимую особенность
+INTEGRAL_NODE_SHIFT = 1e-7
+# Число случайных точек численной проверки чётности и её точность
+PARITY_POINTS = 64
+PARITY_TOLERANCE = 1e-8
+
+_EPS = np.finfo(float).eps
+
+# Узлы и веса квадратуры Гаусса-Кронрода G7-K15 на [-1, 1]: неотрицательная
+# половина, узел 0 последний; узлы Гаусса - с нечётными номерами
+_KRONROD_HALF = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0,
+])
+_KRONROD_HALF_WEIGHTS = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+])
+_GAUSS_HALF_WEIGHTS = np.array([
+    0.0, 0.129484966168869693270611432679082, 0.0, 0.279705391489276667901467771423780,
+    0.0, 0.381830050505118944950369775488975, 0.0, 0.417959183673469387755102040816327,
+])
+KRONROD_NODES = np.concatenate([-_KRONROD_HALF[:-1], _KRONROD_HALF[::-1]])
+KRONROD_WEIGHTS = np.concatenate([_KRONROD_HALF_WEIGHTS[:-1], _KRONROD_HALF_WEIGHTS[::-1]])
+GAUSS_WEIGHTS = np.concatenate([_GAUSS_HALF_WEIGHTS[:-1], _GAUSS_HALF_WEIGHTS[::-1]])
+
+
+def scalar(kernel):
+    """Обёртка векторизованного ядра для вычисления в одной точке"""
+    def func(t):
+        return float(kernel(np.array([t], dtype=float))[0])
+    return func
+
+
+def brent(func, a, b, fa=None, fb=None, xtol=ROOT_TOLERANCE, rtol=4 * _EPS, maxiter=100):
+    """Корень func на отрезке [a, b] со сменой знака методом Брента.
+
+    Сочетает обратную квадратичную интерполяцию и секущие с гарантированным
+    делением пополам, поэтому сходится не медленнее бисекции.
+    """
+    fa = func(a) if fa is None else fa
+    fb = func(b) if fb is None else fb
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if fa * fb > 0:
+        raise ValueError("На концах отрезка функция одного знака")
+
+    x_prev, x_cur, x_block = a, b, a
+    f_prev, f_cur, f_block = fa, fb, fa
+    step_prev = step_cur = b - a
+    for _ in range(maxiter):
+        if f_prev * f_cur < 0:
+            x_block, f_block = x_prev, f_prev
+            step_prev = step_cur = x_cur - x_prev
+        if abs(f_block) < abs(f_cur):
+            x_prev, x_cur, x_block = x_cur, x_block, x_cur
+            f_prev, f_cur, f_block = f_cur, f_block, f_cur
+
+        delta = (xtol + rtol * abs(x_cur)) / 2
+        bisect = (x_block - x_cur) / 2
+        if f_cur == 0 or abs(bisect) < delta:
+            return x_cur
+
+        if abs(step_prev) > delta and abs(f_cur) < abs(f_prev):
+            if x_prev == x_block:
+                # Секущая
+                trial = -f_cur * (x_cur - x_prev) / (f_cur - f_prev)
+            else:
+                # Обратная квадратичная интерполяция
+                d_prev = (f_prev - f_cur) / (x_prev - x_cur)
+                d_block = (f_block - f_cur) / (x_block - x_cur)
+                trial = -f_cur * (f_block * d_block - f_prev * d_prev) / \
+                    (d_block * d_prev * (f_block - f_prev))
+            if 2 * abs(trial) < min(abs(step_prev), 3 * abs(bisect) - delta):
+                step_prev, step_cur = step_cur, trial
+            else:
+                step_prev = step_cur = bisect
+        else:
+            step_prev = step_cur = bisect
+
+        x_prev, f_prev = x_cur, f_cur
+        x_cur += step_cur if abs(step_cur) > delta else (delta if bisect > 0 else -delta)
+        f_cur = func(x_cur)
+    return x_cur
+
+
+def find_roots(kernel, a, b, samples=None, num_points=ROOT_SCAN_POINTS, xtol=ROOT_TOLERANCE):
+    """Численные корни функции на отрезке [a, b].
+
+    По сетке значений (samples = (x, y), например из TileCache, иначе
+    равномерная сетка из num_points точек) находятся точные нули и отрезки
+    со сменой знака, затем каждый отрезок уточняется методом Брента.
+    Смена знака через полюс (например, 1/x) корнем не считается: в
+    найденной точке |f| больше, чем на концах отрезка.
+    """
+    if samples is None:
+        x = np.linspace(a, b, num_points)
+        y = kernel(x)
+    else:
+        x, y = samples
+
+    roots = list(x[y == 0])
+    left = np.flatnonzero(np.isfinite(y[:-1]) & np.isfinite(y[1:]) & (y[:-1] * y[1:] < 0))
+    func = scalar(kernel)
+    for i in left:
+        root = brent(func, x[i], x[i + 1], y[i], y[i + 1], xtol=xtol)
+        if abs(func(root)) <= min(abs(y[i]), abs(y[i + 1])):
+            roots.append(root)
+    return sorted(float(root) for root in roots)
+
+
+def minimize_bounded(func, a, b, xtol=ROOT_TOLERANCE, maxiter=100):
+    """Минимум func на отрезке [a, b] методом Брента без производных.
+
+    Сочетает золотое сечение с параболической интерполяцией. Возвращает
+    пару (x, func(x)).
+    """
+    golden = (3 - np.sqrt(5)) / 2
+    sqrt_eps = np.sqrt(_EPS)
+    x_far = x_near = x_best = a + golden * (b - a)
+    f_far = f_near = f_best = func(x_best)
+    step = step_prev = 0.0
+    middle = (a + b) / 2
+    tol1 = sqrt_eps * abs(x_best) + xtol / 3
+    tol2 = 2 * tol1
+
+    for _ in range(maxiter):
+        if abs(x_best - middle) <= tol2 - (b - a) / 2:
+            break
+        golden_step = True
+        if abs(step_prev) > tol1:
+            # Парабола через три лучшие точки
+            golden_step = False
+            r = (x_best - x_near) * (f_best - f_far)
+            q = (x_best - x_far) * (f_best - f_near)
+            p = (x_best - x_far) * q - (x_best - x_near) * r
+            q = 2 * (q - r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            r, step_prev = step_prev, step
+            if abs(p) < abs(q * r / 2) and q * (a - x_best) < p < q * (b - x_best):
+                step = p / q
+                x = x_best + step
+                if x - a < tol2 or b - x < tol2:
+                    step = tol1 if middle >= x_best else -tol1
+            else:
+                golden_step = True
+        if golden_step:
+            step_prev = (a - x_best) if x_best >= middle else (b - x_best)
+            step = golden * step_prev
+
+        x = x_best + (step if abs(step) >= tol1 else (tol1 if step >= 0 else -tol1))
+        fx = func(x)
+        if fx <= f_best:
+            if x >= x_best:
+                a = x_best
+            else:
+                b = x_best
+            x_far, f_far = x_near, f_near
+            x_near, f_near = x_best, f_best
+            x_best, f_best = x, fx
+        else:
+            if x < x_best:
+                a = x
+            else:
+                b = x
+            if fx <= f_near or x_near == x_best:
+                x_far, f_far = x_near, f_near
+                x_near, f_near = x, fx
+            elif fx <= f_far or x_far == x_best or x_far == x_near:
+                x_far, f_far = x, fx
+        middle = (a + b) / 2
+        tol1 = sqrt_eps * abs(x_best) + xtol / 3
+        tol2 = 2 * tol1
+    return x_best, f_best
+
+
+def find_extremums(kernel, a, b, samples=None, num_points=ROOT_SCAN_POINTS, xtol=ROOT_TOLERANCE):
+    """Локальные минимумы и максимумы функции на отрезке [a, b].
+
+    Кандидаты - точки сетки, где меняется знак конечной разности (то есть
+    производной); каждый уточняется ограниченной минимизацией Брента на
+    соседних интервалах. Концы отрезка тоже считаются экстремумами.
+    Возвращает список (x, y, is_max, on_boundary), отсортированный по x.
+    Скачки через полюс (tan(x)) отбрасываются: уточнённое значение у них
+    уходит от значения в узле дальше, чем меняется функция между узлами.
+    """
+    if samples is None:
+        x = np.linspace(a, b, num_points)
+        y = kernel(x)
+    else:
+        x, y = samples
+    func = scalar(kernel)
+    extremums = []
+
+    finite = np.isfinite(y)
+    left, mid, right = y[:-2], y[1:-1], y[2:]
+    ok = finite[:-2] & finite[1:-1] & finite[2:]
+    for is_max, sign in ((True, -1.0), (False, 1.0)):
+        # Для максимума ищем минимум -f
+        peak = ok & (sign * mid < sign * left) & (sign * mid < sign * right)
+        for i in np.flatnonzero(peak) + 1:
+            x_ext, f_ext = minimize_bounded(lambda t: sign * func(t), x[i - 1], x[i + 1], xtol)
+            y_ext = sign * f_ext
+            if not np.isfinite(y_ext) or \
+                    abs(y_ext - y[i]) > abs(y[i] - y[i - 1]) + abs(y[i + 1] - y[i]):
+                continue
+            extremums.append((float(x_ext), float(y_ext), is_max, False))
+
+    # Концы отрезка: максимум, если от него функция убывает внутрь отрезка
+    if len(x) > 1:
+        for end, inner in ((0, 1), (-1, -2)):
+            if np.isfinite(y[end]) and np.isfinite(y[inner]) and y[end] != y[inner]:
+                extremums.append((float(x[end]), float(y[end]), bool(y[end] > y[inner]), True))
+    return sorted(extremums)
+
+
+def _gauss_kronrod(integrand, left, right):
+    """Интегралы K15 и оценки погрешности сразу по всем подотрезкам.
+
+    Погрешность - разность K15 и G7, масштабированная как в QUADPACK
+    (qk15): грубые оценки усиливаются, оценка не меньше ошибки округления.
+    """
+    center = (left + right) / 2
+    half = (right - left) / 2
+    values = integrand(center[:, None] + half[:, None] * KRONROD_NODES)
+    kronrod = half * (values @ KRONROD_WEIGHTS)
+    gauss = half * (values @ GAUSS_WEIGHTS)
+    error = np.abs(kronrod - gauss)
+
+    mean = (kronrod / (2 * half))[:, None]
+    spread = np.abs(half) * (np.abs(values - mean) @ KRONROD_WEIGHTS)
+    magnitude = np.abs(half) * (np.abs(values) @ KRONROD_WEIGHTS)
+    scaled = spread * np.minimum(1.0, (200 * error / np.where(spread > 0, spread, 1.0)) ** 1.5)
+    error = np.where(spread > 0, scaled, error)
+    error = np.maximum(error, 50 * _EPS * magnitude)
+    return kronrod, error
+
+
+def _finite_values(kernel, x, scale):
+    """Значения ядра в узлах; одиночные nan заменяются пределом.
+
+    Узел, попавший ровно в устранимую особенность (sin(x)/x при x = 0)
+    или на границу области определения, получает среднее конечных
+    значений в соседних точках x ± delta. Если функция не определена и
+    рядом с узлом, значение остаётся nan. Бесконечное значение - полюс
+    ровно в узле: интеграл в нём не разрешить, FloatingPointError.
+    """
+    y = kernel(x)
+    if np.isinf(y).any():
+        raise FloatingPointError("полюс в узле квадратуры")
+    bad = np.isnan(y)
+    if bad.any():
+        delta = INTEGRAL_NODE_SHIFT * np.where(x[bad] != 0, np.abs(x[bad]), scale)
+        sides = np.stack([kernel(x[bad] - delta), kernel(x[bad] + delta)])
+        finite = np.isfinite(sides)
+        with np.errstate(all='ignore'):
+            y[bad] = np.where(finite, sides, 0.0).sum(axis=0) / finite.sum(axis=0)
+    return y
+
+
+def _integrate_piece(kernel, a, b, allowed, max_intervals):
+    """Интеграл на [a, b] без особых точек внутри; (значение, погрешность, число подотрезков).
+
+    Глобальная адаптивная схема: делятся подотрезки с наибольшей
+    погрешностью, пока сумма погрешностей не войдёт в допуск allowed.
+    Погрешность половинок включает расхождение суммы половинок с
+    оценкой целого подотрезка, поэтому узкий пик, замеченный на одном
+    уровне и пропущенный на следующем, не теряется. Если подотрезок,
+    который нужно делить, уже не различим в числах с плавающей точкой,
+    точность недостижима: возвращается текущая оценка. Так же, если в узел
+    попал полюс (в том числе из-за переполнения у особенности на конце).
+    """
+    width = b - a
+    scale = max(abs(a), abs(b), width)
+
+    def position(t):
+        return a + width * t * t * (3 - 2 * t)
+
+    def integrand(t):
+        return _finite_values(kernel, position(t), scale) * (6 * width * t * (1 - t))
+
+    edges = np.linspace(0.0, 1.0, INTEGRAL_MIN_INTERVALS + 1)
+    left, right = edges[:-1], edges[1:]
+    try:
+        with np.errstate(all='ignore'):
+            parts, errors = _gauss_kronrod(integrand, left, right)
+    except FloatingPointError:
+        return 0.0, np.inf, len(left)
+    evaluated = len(left)
+    while True:
+        if not (np.all(np.isfinite(parts)) and np.all(np.isfinite(errors))):
+            raise ValueError("Функция не определена или не ограничена на отрезке интегрирования")
+        total, total_error = parts.sum(), errors.sum()
+        if total_error <= allowed(total) or evaluated >= max_intervals:
+            return total, total_error, evaluated
+
+        # Делим подотрезки с погрешностью выше средней доли допуска (и худший)
+        split = errors > allowed(total) / len(errors)
+        split[np.argmax(errors)] = True
+        x_left, x_right = position(left[split]), position(right[split])
+        resolution = 64 * np.spacing(np.maximum(np.abs(x_left), np.abs(x_right)))
+        if np.any(x_right - x_left <= resolution):
+            return total, total_error, evaluated
+
+        middle = (left[split] + right[split]) / 2
+        child_left = np.concatenate([left[split], middle])
+        child_right = np.concatenate([middle, right[split]])
+        try:
+            with np.errstate(all='ignore'):
+                child_parts, child_errors = _gauss_kronrod(integrand, child_left, child_right)
+        except FloatingPointError:
+            return total, total_error, evaluated
+        evaluated += len(child_left)
+        count = len(middle)
+        mismatch = np.abs(parts[split] - child_parts[:count] - child_parts[count:]) / 2
+        child_errors = child_errors + np.concatenate([mismatch, mismatch])
+
+        left = np.concatenate([left[~split], child_left])
+        right = np.concatenate([right[~split], child_right])
+        parts = np.concatenate([parts[~split], child_parts])
+        errors = np.concatenate([errors[~split], child_errors])
+
+
+def adaptive_integral(kernel, a, b, tol=INTEGRAL_TOLERANCE, max_intervals=INTEGRAL_MAX_INTERVALS,
+                      points=()):
+    """Определённый интеграл функции на [a, b] и оценка его погрешности.
+
+    Адаптивная квадратура Гаусса-Кронрода G7-K15: подотрезки с наибольшей
+    погрешностью делятся пополам и вычисляются одним вызовом ядра. Замена
+    x = a + (b - a)(3t^2 - 2t^3) сгущает узлы у концов и гасит
+    интегрируемые особенности на концах (1/sqrt(x), x**-0.9 на [0, 1]).
+    points - известные особые точки (полюса, границы области
+    определения): отрезок разбивается в них, и каждая особенность
+    оказывается на конце своего куска. Возвращает (значение,
+    погрешность); если точность не достигнута за max_intervals
+    подотрезков, погрешность больше требуемой - интеграл, вероятно,
+    расходится (полюс внутри отрезка). ValueError, если функция не
+    определена внутри отрезка.
+    """
+    if a == b:
+        return 0.0, 0.0
+    sign = 1.0
+    if a > b:
+        a, b, sign = b, a, -1.0
+    inner = np.unique([point for point in np.asarray(points, dtype=float) if a < point < b])
+    bounds = np.concatenate([[a], inner, [b]])
+
+    value = error = 0.0
+    evaluated = 0
+    for left, right in zip(bounds[:-1], bounds[1:]):
+        # Допуск каждого куска - его доля от общего, считая по всему интегралу
+        share = (right - left) / (b - a)
+
+        def allowed(total):
+            return share * max(tol, tol * abs(value + total))
+
+        part, part_error, count = _integrate_piece(kernel, left, right, allowed,
+                                                   max_intervals - evaluated)
+        # Кусок с недостижимой точностью: остальные считать незачем
+        unresolved = part_error > allowed(part)
+        value += part
+        error += part_error
+        evaluated += count
+        if unresolved or evaluated >= max_intervals:
+            break
+    return sign * float(value), float(error)
+
+
+def parity_candidates(kernel, points=PARITY_POINTS, rtol=PARITY_TOLERANCE, seed=0):
+    """Виды симметрии ('even', 'odd'), которые не исключает численная проверка.
+
+    f(x) сравнивается с f(-x) в случайных точках от 0.001 до 10 (генератор
+    с фиксированным зерном, результат воспроизводим) с относительной
+    точностью rtol. Если f определена в x, но не в -x, область определения
+    несимметрична и функция ни чётная, ни нечётная. Если сравнить не в
+    чем, исключить нельзя ничего: решает символьная проверка.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(1.0, 10.0, points) * 10.0 ** rng.integers(-3, 1, points)
+    f, g = kernel(x), kernel(-x)
+    finite_f, finite_g = np.isfinite(f), np.isfinite(g)
+    if np.any(finite_f != finite_g):
+        return set()
+    f, g = f[finite_f & finite_g], g[finite_f & finite_g]
+    if len(f) == 0:
+        return {'even', 'odd'}
+
+    # Абсолютный допуск для значений, близких к нулю: порядок ошибки
+    # округления наибольшего из вычисленных значений
+    tolerance = rtol * (np.abs(f) + np.abs(g)) + 1e3 * _EPS * max(1.0, np.abs(f).max())
+    candidates = set()
+    if np.all(np.abs(f - g) <= tolerance):
+        candidates.add('even')
+    if np.all(np.abs(f + g) <= tolerance):
+        candidates.add('odd')
+    return candidates
@@ -0,0 +1,184 @@
+from matplotlib.collections import LineCollection, PolyCollection
+
+# Доля непрозрачности заливки области неравенства относительно линии
+REGION_ALPHA = 0.4
+
+
+class PlotLayer:
+    """Слой графиков, сохраняющий линии функций между перерисовками.
+
+    Каждой функции соответствует один объект (линия, набор отрезков неявной
+    кривой или заливка области неравенства), который создаётся один раз, а дальше только обновляется:
+    set_data / set_segments / set_verts при новой выборке, set_color / set_linestyle /
+    set_alpha при смене стиля. Объекты и легенда помечены
+    как animated: фон (оси, сетка, подписи) рисуется полной отрисовкой
+    только при смене пределов, а изменения кривых выводятся блиттингом
+    поверх сохранённого фона.
+    """
+
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self._artists = {}  # id(function_info) -> (function_info, artist, view)
+        self._legend = None
+        self._legend_key = None
+        self._area = None  # Заливка площади под графиком (интеграл)
+        self._limits = None
+        self._background = None
+
+        self.ax.set_title("Графики функций")
+        self.ax.set_xlabel('x')
+        self.ax.set_ylabel('y')
+        self.ax.grid(True)
+
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _entry(self, function_info):
+        entry = self._artists.get(id(function_info))
+        # id может быть переиспользован после удаления словаря
+        if entry is not None and entry[0] is function_info:
+            return entry
+        return None
+
+    def needs_data(self, function_info, view):
+        """Нужно ли заново вычислять выборку функции для данного вида"""
+        entry = self._entry(function_info)
+        return entry is None or entry[2] != view
+
+    def invalidate(self, function_info):
+        """Помечает выборку функции устаревшей: она будет вычислена заново"""
+        entry = self._entry(function_info)
+        if entry is not None:
+            self._artists[id(function_info)] = (entry[0], entry[1], None)
+
+    def set_data(self, function_info, x, y, view, color, linestyle, alpha):
+        """Создаёт линию функции или обновляет её данные"""
+        entry = self._entry(function_info)
+        if entry is None:
+            line, = self.ax.plot(x, y, color=color, linestyle=linestyle, linewidth=1.5,
+                                 alpha=alpha, label=function_info['expression'],
+                                 animated=True)
+        else:
+            line = entry[1]
+            line.set_data(x, y)
+        self._artists[id(function_info)] = (function_info, line, view)
+
+    def set_region(self, function_info, polygons, view, color, alpha):
+        """Создаёт заливку области неравенства или обновляет её"""
+        entry = self._entry(function_info)
+        if entry is None:
+            region = PolyCollection(polygons, facecolors=color, edgecolors='none',
+                                    alpha=alpha * REGION_ALPHA,
+                                    label=function_info['expression'], animated=True)
+            self.ax.add_collection(region, autolim=False)
+        else:
+            region = entry[1]
+            region.set_verts(polygons)
+        self._artists[id(function_info)] = (function_info, region, view)
+
+    def set_curve(self, function_info, segments, view, color, linestyle, alpha):
+        """Создаёт неявную кривую из отрезков или обновляет её"""
+        entry = self._entry(function_info)
+        if entry is None:
+            curve = LineCollection(segments, colors=color, linestyles=linestyle, linewidths=1.5,
+                                   alpha=alpha, label=function_info['expression'],
+                                   animated=True)
+            self.ax.add_collection(curve, autolim=False)
+        else:
+            curve = entry[1]
+            curve.set_segments(segments)
+        self._artists[id(function_info)] = (function_info, curve, view)
+
+    def set_area(self, polygons, color=None, alpha=1.0):
+        """Закрашивает площадь между графиком и осью x; пустой список убирает заливку"""
+        if not polygons:
+            if self._area is not None:
+                self._area.remove()
+                self._area = None
+            return
+        if self._area is None:
+            self._area = PolyCollection(polygons, edgecolors='none', hatch='//',
+                                        animated=True)
+            self.ax.add_collection(self._area, autolim=False)
+        else:
+            self._area.set_verts(polygons)
+        self._area.set_facecolor(color)
+        self._area.set_alpha(alpha * REGION_ALPHA)
+
+    def restyle(self, function_info, color, linestyle, alpha):
+        """Меняет стиль существующего объекта без пересчёта данных"""
+        entry = self._entry(function_info)
+        if entry is None:
+            return
+        artist = entry[1]
+        if isinstance(artist, PolyCollection):
+            artist.set_facecolor(color)
+            artist.set_alpha(alpha * REGION_ALPHA)
+        else:
+            artist.set_color(color)
+            artist.set_linestyle(linestyle)
+            artist.set_alpha(alpha)
+        self._legend_key = None
+
+    def keep_only(self, functions):
+        """Удаляет объекты функций, которых больше нет в списке"""
+        alive = {id(function_info): function_info for function_info in functions}
+        for key in list(self._artists):
+            function_info, artist, _ = self._artists[key]
+            if alive.get(key) is not function_info:
+                artist.remove()
+                del self._artists[key]
+
+    def set_limits(self, x_min, x_max, y_min, y_max):
+        """Устанавливает пределы осей; возвращает True, если они изменились"""
+        limits = (x_min, x_max, y_min, y_max)
+        if limits == self._limits:
+            return False
+        self.ax.set_xlim(x_min, x_max)
+        self.ax.set_ylim(y_min, y_max)
+        self._limits = limits
+        return True
+
+    def update_legend(self, functions):
+        """Пересоздаёт легенду, только если изменился набор или стиль объектов"""
+        artists = [self._entry(function_info)[1] for function_info in functions
+                   if self._entry(function_info) is not None]
+        key = tuple(id(artist) for artist in artists)
+        if key == self._legend_key and self._legend is not None:
+            return
+
+        if self._legend is not None:
+            self._legend.remove()
+            self._legend = None
+        if artists:
+            # Фиксированное положение: 'best' перебирает все точки данных
+            self._legend = self.ax.legend(handles=artists, loc='upper right')
+            self._legend.set_animated(True)
+        self._legend_key = key
+
+    def draw(self, full=False):
+        """Выводит изменения: полной отрисовкой или блиттингом поверх фона"""
+        if full or self._background is None:
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def _on_draw(self, event):
+        # При сохранении в файл Axes.draw сам рисует анимированные объекты,
+        # а фон в разрешении файла для экрана не годится
+        if self.canvas.is_saving():
+            return
+        # После полной отрисовки сохраняем фон без кривых и дорисовываем их
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        if self._area is not None:
+            self.ax.draw_artist(self._area)
+        for _, artist, _ in self._artists.values():
+            self.ax.draw_artist(artist)
+        if self._legend is not None:
+            self.ax.draw_artist(self._legend)
@@ -0,0 +1,75 @@
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class PlotWorker(QObject):
+    """Фоновый исполнитель вычислений для графиков.
+
+    Каждое задание получает номер поколения. Новое задание делает все
+    предыдущие устаревшими: они прерываются при ближайшей проверке
+    cancelled(), а их результаты отбрасываются получателем сигнала.
+    Сигналы из фонового потока доставляются в поток GUI через очередь Qt.
+    """
+
+    finished = pyqtSignal(int, object)  # поколение, результат
+    failed = pyqtSignal(int, object)    # поколение, исключение
+    progress = pyqtSignal(int, str)     # поколение, текст для строки состояния
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.discarded = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None  # Future последнего задания
+
+    def submit(self, job):
+        """Запускает job(report, cancelled) в фоне и возвращает номер поколения"""
+        self.generation += 1
+        generation = self.generation
+
+        def cancelled():
+            return generation != self.generation
+
+        def report(text):
+            if not cancelled():
+                self.progress.emit(generation, text)
+
+        def run():
+            if cancelled():
+                return None
+            try:
+                result = job(report, cancelled)
+            except Exception as e:
+                self.failed.emit(generation, e)
+                return None
+            self.finished.emit(generation, result)
+            return result
+
+        self._future = self._executor.submit(run)
+        return generation
+
+    def wait(self, timeout=None):
+        """Ждёт последнее задание и возвращает (поколение, результат).
+
+        Результат None, если задание прервано или завершилось ошибкой.
+        Сигнал finished при этом всё равно придёт через очередь Qt.
+        """
+        generation, future = self.generation, self._future
+        if future is None:
+            return generation, None
+        try:
+            return generation, future.result(timeout)
+        except CancelledError:
+            return generation, None
+
+    def is_current(self, generation):
+        """Относится ли результат к последнему запрошенному заданию"""
+        if generation == self.generation:
+            return True
+        self.discarded += 1
+        return False
+
+    def shutdown(self):
+        self.generation += 1  # Все задания в очереди становятся устаревшими
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,71 @@
+from PyQt6.QtCore import QObject, QTimer
+
+
+class RedrawScheduler(QObject):
+    """Объединяет серии сигналов изменения в одну перерисовку за кадр.
+
+    Каждый сигнал лишь отмечает, что нужна перерисовка; сама она
+    выполняется не чаще одного раза за interval_ms. Запросы, пришедшие
+    до того как предыдущий успел отрисоваться, заменяют его (устаревший
+    запрос отменяется) и учитываются в счётчике dropped. Кроме общих
+    счётчиков сохраняются счётчики последней серии запросов, выведенной
+    одной перерисовкой (take_burst). Поколения самих вычислений ведёт
+    PlotWorker.
+    """
+
+    def __init__(self, callback, interval_ms=33, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.requested = 0
+        self.rendered = 0
+        self.dropped = 0
+        self._burst = {'requested': 0, 'dropped': 0}
+        self._last_burst = dict(self._burst)
+        self._pending = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._run)
+
+    def request(self, *args):
+        """Запрашивает перерисовку; аргументы сигнала игнорируются"""
+        self.requested += 1
+        self._burst['requested'] += 1
+        if self._pending:
+            self.dropped += 1
+            self._burst['dropped'] += 1
+        self._pending = True
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Выполняет отложенную перерисовку немедленно (перед экспортом, анализом)"""
+        if self._pending:
+            self.timer.stop()
+            self._run()
+
+    def _run(self):
+        self._pending = False
+        self.rendered += 1
+        self._last_burst = self._burst
+        self._burst = {'requested': 0, 'dropped': 0}
+        self.callback()
+
+    def take_burst(self):
+        """Возвращает счётчики серии, выведенной последней перерисовкой, и обнуляет их
+
+        Так отчёт о пропущенных кадрах относится только к текущей серии
+        и не повторяется при следующих перерисовках.
+        """
+        burst = self._last_burst
+        self._last_burst = {'requested': 0, 'dropped': 0}
+        return burst
+
+    def stats(self):
+        """Возвращает число запросов, перерисовок и отброшенных запросов"""
+        return {
+            'requested': self.requested,
+            'rendered': self.rendered,
+            'dropped': self.dropped,
+        }
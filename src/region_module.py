@@ -0,0 +1,420 @@
+import ast
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from src.expression_module import ExpressionCache, compile_expression
+
+# Размер начальной грубой сетки по каждой оси
+COARSE_CELLS = 32
+# Наибольший размер начальной клетки области неравенства, пикселей
+SEED_PIXELS = 16
+
+_SENSE = {ast.Gt: 1, ast.GtE: 1, ast.Lt: -1, ast.LtE: -1}
+
+
+class Inequality:
+    """Неравенство вида lhs > rhs, приведённое к g(x, y) = lhs - rhs.
+
+    Точка (x, y) принадлежит области решений, если sense * g(x, y) > 0
+    (для нестрогих неравенств допускается и равенство нулю).
+    """
+
+    def __init__(self, text, difference, sense, strict):
+        self.text = text
+        self.kernel = compile_expression(difference)
+        self.sense = sense
+        self.strict = strict
+
+    def values(self, x, y):
+        """sense * g(x, y): положительно внутри области решений"""
+        return self.sense * self.kernel(x, y)
+
+    def contains(self, x, y, values=None):
+        """Маска точек, удовлетворяющих неравенству (nan - не удовлетворяет)"""
+        if values is None:
+            values = self.values(x, y)
+        return values > 0 if self.strict else values >= 0
+
+
+@lru_cache(maxsize=256)
+def parse_inequality(text):
+    """Разбирает строку как неравенство; возвращает Inequality или None"""
+    text = ExpressionCache.normalize(text)
+    try:
+        tree = ast.parse(text, mode='eval')
+    except SyntaxError:
+        return None
+
+    node = tree.body
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1:
+        return None
+    op = type(node.ops[0])
+    if op not in _SENSE:
+        return None
+
+    difference = f"({ast.unparse(node.left)}) - ({ast.unparse(node.comparators[0])})"
+    return Inequality(text, difference, _SENSE[op], op in (ast.Gt, ast.Lt))
+
+
+class ImplicitCurve:
+    """Уравнение lhs = rhs, приведённое к неявной кривой F(x, y) = lhs - rhs = 0"""
+
+    def __init__(self, text, difference):
+        self.text = text
+        self.kernel = compile_expression(difference)
+
+
+# Одиночный знак "=", не входящий в "==", "<=", ">=", "!="
+_EQUALS = re.compile(r'(?<![<>=!])=(?!=)')
+
+
+@lru_cache(maxsize=256)
+def parse_implicit(text):
+    """Разбирает строку как уравнение от x и y; возвращает ImplicitCurve или None"""
+    text = ExpressionCache.normalize(text)
+    parts = _EQUALS.split(text)
+    if len(parts) == 2:
+        sides = parts
+    else:
+        # Допускаем и запись через "=="
+        try:
+            node = ast.parse(text, mode='eval').body
+        except SyntaxError:
+            return None
+        if not isinstance(node, ast.Compare) or len(node.ops) != 1 or \
+                not isinstance(node.ops[0], ast.Eq):
+            return None
+        sides = [ast.unparse(node.left), ast.unparse(node.comparators[0])]
+
+    lhs, rhs = (side.strip() for side in sides)
+    if not lhs or not rhs:
+        return None
+    try:
+        return ImplicitCurve(text, f"({lhs}) - ({rhs})")
+    except SyntaxError:
+        return None
+
+
+def validate_plot_input(text):
+    """Проверяет строку графика: функцию от x, неравенство или уравнение.
+
+    Выражение разбирается и проверяется по белому списку один раз;
+    скомпилированное ядро остаётся в кэше и используется при построении.
+    Возвращает Inequality, ImplicitCurve или CompiledExpression, при
+    ошибке выбрасывает ValueError.
+    """
+    try:
+        parsed = parse_inequality(text) or parse_implicit(text)
+        if parsed is None:
+            parsed = compile_expression(text)
+            if 'y' in parsed.variables:
+                raise ValueError("Функция может зависеть только от x")
+    except SyntaxError as e:
+        raise ValueError(f"Синтаксическая ошибка: {e.msg}")
+    return parsed
+
+
+def probe_plot_input(text, x_min, x_max, y_min, y_max, num_points=64):
+    """Пробное вычисление строки графика на небольшой сетке области просмотра.
+
+    Выполняется в изолированном процессе (Sandbox): выражение, вычисление
+    которого не зависит от размера сетки, но длится неограниченно долго
+    (например, 10**10**10), обнаруживается здесь, а не при построении.
+    Любая ошибка вычисления (abs() без аргумента, 10**400 вне диапазона
+    float) выбрасывается как ValueError; так же отклоняется выражение, не
+    определённое ни в одной точке сетки (sqrt(-1 - x**2)). Неравенства и
+    уравнения вычисляются на диагонали области просмотра.
+    """
+    parsed = validate_plot_input(text)
+    x = np.linspace(x_min, x_max, num_points)
+    try:
+        if isinstance(parsed, (Inequality, ImplicitCurve)):
+            values = parsed.kernel(x, np.linspace(y_min, y_max, num_points))
+        else:
+            values = parsed(x)
+    except Exception as e:
+        raise ValueError(f"Ошибка вычисления: {e}") from e
+    if np.all(np.isnan(values)):
+        raise ValueError("выражение не определено в области просмотра")
+
+
+def probe_plot_inputs(texts, x_min, x_max, y_min, y_max, num_points=64):
+    """Пробное вычисление нескольких строк одним заданием (загрузка файла).
+
+    Возвращает для каждой строки текст ошибки или None.
+    """
+    errors = []
+    for text in texts:
+        try:
+            probe_plot_input(text, x_min, x_max, y_min, y_max, num_points)
+            errors.append(None)
+        except ValueError as e:
+            errors.append(str(e))
+    return errors
+
+
+def inequality_cells(inequality, x_min, x_max, y_min, y_max, width_px=800, height_px=600,
+                     coarse=COARSE_CELLS):
+    """Прямоугольники (x0, y0, w, h), покрывающие область решений неравенства.
+
+    Неравенство проверяется в углах и центре каждой клетки начальной
+    сетки: не меньше coarse клеток по оси и клетки не больше SEED_PIXELS
+    пикселей. Делятся на четыре клетки, через которые проходит граница, и
+    клетки, где |g| не больше разброса g по клетке: узкая полоса
+    (sin(10*x) > 0.9) может пройти между точками проверки. Остальные
+    клетки целиком внутри или снаружи области. Деление идёт, пока размер
+    клетки не станет меньше пикселя.
+    """
+    columns = max(coarse, int(np.ceil(width_px / SEED_PIXELS)))
+    rows = max(coarse, int(np.ceil(height_px / SEED_PIXELS)))
+    w = (x_max - x_min) / columns
+    h = (y_max - y_min) / rows
+    min_w = (x_max - x_min) / width_px
+    min_h = (y_max - y_min) / height_px
+
+    x0, y0 = np.meshgrid(x_min + np.arange(columns) * w, y_min + np.arange(rows) * h)
+    x0, y0 = x0.ravel(), y0.ravel()
+
+    rects = []
+    while x0.size:
+        # Углы и центр клетки: 5 проверок на клетку одним векторизованным вызовом
+        px = np.stack((x0, x0 + w, x0, x0 + w, x0 + w / 2))
+        py = np.stack((y0, y0, y0 + h, y0 + h, y0 + h / 2))
+        values = inequality.values(px, py)
+        inside = inequality.contains(px, py, values)
+
+        # Граница близко: по значениям в клетке g может обратиться в ноль
+        high = np.fmax.reduce(values, axis=0)
+        low = np.fmin.reduce(values, axis=0)
+        with np.errstate(invalid='ignore'):
+            near = np.minimum(np.abs(high), np.abs(low)) <= high - low
+
+        full = inside.all(axis=0)
+        boundary = (inside.any(axis=0) & ~full) | near
+        rects.append(_cells_to_rects(x0[full & ~boundary], y0[full & ~boundary], w, h))
+
+        # Клетки пиксельного размера решаются по центру
+        if w <= min_w and h <= min_h:
+            center = boundary & inside[4]
+            rects.append(_cells_to_rects(x0[center], y0[center], w, h))
+            break
+
+        # Делим граничные клетки на четыре
+        x0, y0 = x0[boundary], y0[boundary]
+        w, h = w / 2, h / 2
+        x0 = np.concatenate((x0, x0 + w, x0, x0 + w))
+        y0 = np.concatenate((y0, y0, y0 + h, y0 + h))
+
+    return np.concatenate(rects)
+
+
+def _cells_to_rects(x0, y0, w, h):
+    return np.column_stack((x0, y0, np.full(x0.shape, w), np.full(x0.shape, h)))
+
+
+def rects_to_polygons(rects):
+    """Переводит прямоугольники (x0, y0, w, h) в вершины для PolyCollection"""
+    x0, y0, w, h = rects.T
+    return np.stack((
+        np.column_stack((x0, y0)),
+        np.column_stack((x0 + w, y0)),
+        np.column_stack((x0 + w, y0 + h)),
+        np.column_stack((x0, y0 + h)),
+    ), axis=1)
+
+
+def area_polygons(x, y):
+    """Многоугольники между графиком y(x) и осью x для PolyCollection.
+
+    Точки, где функция не определена, разрывают заливку на части.
+    """
+    polygons = []
+    finite = np.isfinite(y)
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], finite, [False])).astype(int)))
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if stop - start < 2:
+            continue
+        run_x, run_y = x[start:stop], y[start:stop]
+        polygons.append(np.concatenate((
+            [(run_x[0], 0.0)], np.column_stack((run_x, run_y)), [(run_x[-1], 0.0)],
+        )))
+    return polygons
+
+
+class ContourCache:
+    """Кэш отрезков неявных кривых по клеткам, выровненным в мировых координатах.
+
+    Корневые клетки имеют размер 2**k по каждой оси, поэтому при сдвиге
+    области просмотра уже обработанные клетки берутся из кэша, а
+    трассируются только новые. Объём ограничен числом клеток (LRU).
+    """
+
+    def __init__(self, max_cells=50_000):
+        self.max_cells = max_cells
+        self._cells = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, level_key, roots):
+        """Возвращает (найденные отрезки, список отсутствующих клеток)"""
+        found, missing = [], []
+        with self._lock:
+            for root in roots:
+                segments = self._cells.get((level_key, root))
+                if segments is None:
+                    missing.append(root)
+                else:
+                    self._cells.move_to_end((level_key, root))
+                    found.append(segments)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def store(self, level_key, root, segments):
+        with self._lock:
+            self._cells[(level_key, root)] = segments
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'cells': len(self._cells),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+def implicit_segments(curve, x_min, x_max, y_min, y_max, width_px=800, height_px=600,
+                      cache=None, coarse=COARSE_CELLS):
+    """Отрезки кривой F(x, y) = 0 в области просмотра (массив N x 2 x 2).
+
+    Область покрывается корневыми клетками размера 2**k, выровненными по
+    мировым координатам. Клетки, в которых F меняет знак, рекурсивно
+    делятся до размера пикселя, после чего кривая внутри листовых клеток
+    строится методом marching squares. Результат по каждой корневой
+    клетке сохраняется в cache.
+    """
+    size_x = 2.0 ** np.floor(np.log2((x_max - x_min) / coarse))
+    size_y = 2.0 ** np.floor(np.log2((y_max - y_min) / coarse))
+    pixel_x = (x_max - x_min) / width_px
+    pixel_y = (y_max - y_min) / height_px
+    depth = int(max(0, np.ceil(np.log2(size_x / pixel_x)), np.ceil(np.log2(size_y / pixel_y))))
+
+    roots = [(i, j)
+             for i in range(int(np.floor(x_min / size_x)), int(np.floor(x_max / size_x)) + 1)
+             for j in range(int(np.floor(y_min / size_y)), int(np.floor(y_max / size_y)) + 1)]
+
+    level_key = (curve.text, size_x, size_y, depth)
+    if cache is not None:
+        found, missing = cache.lookup(level_key, roots)
+    else:
+        found, missing = [], roots
+
+    if missing:
+        index = np.array(missing, dtype=float)
+        segments, owner = _trace_cells(curve.kernel, index[:, 0] * size_x, index[:, 1] * size_y,
+                                       size_x, size_y, depth)
+        order = np.argsort(owner, kind='stable')
+        bounds = np.searchsorted(owner[order], np.arange(len(missing) + 1))
+        for k, root in enumerate(missing):
+            root_segments = segments[order[bounds[k]:bounds[k + 1]]]
+            found.append(root_segments)
+            if cache is not None:
+                cache.store(level_key, root, root_segments)
+
+    if not found:
+        return np.empty((0, 2, 2))
+    return np.concatenate(found)
+
+
+def _trace_cells(kernel, x0, y0, w, h, depth):
+    """Делит клетки со сменой знака F и строит в листьях отрезки кривой"""
+    owner = np.arange(len(x0))
+    for _ in range(depth):
+        if not x0.size:
+            break
+        # Сетка 3 x 3 точек в клетке ловит и кривые, не задевающие углы
+        fx = np.array([0, 0.5, 1, 0, 0.5, 1, 0, 0.5, 1])[:, None]
+        fy = np.array([0, 0, 0, 0.5, 0.5, 0.5, 1, 1, 1])[:, None]
+        values = kernel(x0 + fx * w, y0 + fy * h)
+        high = np.fmax.reduce(values, axis=0)
+        low = np.fmin.reduce(values, axis=0)
+        # Нули на границе клетки (например, x*y = 0 на линиях сетки) тоже считаются
+        crossing = (high >= 0) & (low <= 0) & (high > low)
+        # Клетки у полюса или границы области определения тоже делятся:
+        # кривая может подходить к ним между точками сетки
+        finite = np.isfinite(values)
+        crossing |= finite.any(axis=0) & ~finite.all(axis=0)
+
+        x0, y0, owner = x0[crossing], y0[crossing], owner[crossing]
+        w, h = w / 2, h / 2
+        x0 = np.concatenate((x0, x0 + w, x0, x0 + w))
+        y0 = np.concatenate((y0, y0, y0 + h, y0 + h))
+        owner = np.tile(owner, 4)
+
+    return _marching_squares(kernel, x0, y0, w, h, owner)
+
+
+def _marching_squares(kernel, x0, y0, w, h, owner):
+    """Отрезки кривой F = 0 внутри листовых клеток (векторизованно)"""
+    if not x0.size:
+        return np.empty((0, 2, 2)), np.empty(0, dtype=int)
+
+    # Углы против часовой стрелки: v0 (лево-низ), v1, v2, v3 и центр
+    fx = np.array([0, 1, 1, 0, 0.5])[:, None]
+    fy = np.array([0, 0, 1, 1, 0.5])[:, None]
+    px, py = x0 + fx * w, y0 + fy * h
+    values = kernel(px, py)
+    corners = values[:4]
+    positive = corners > 0
+
+    # Точки пересечения на рёбрах: e0 = v0-v1, e1 = v1-v2, e2 = v3-v2, e3 = v0-v3
+    edges = [(0, 1), (1, 2), (3, 2), (0, 3)]
+    points = np.full((4, len(x0), 2), np.nan)
+    for k, (a, b) in enumerate(edges):
+        change = positive[a] != positive[b]
+        with np.errstate(all='ignore'):
+            t = corners[a] / (corners[a] - corners[b])
+            points[k, change, 0] = (px[a] + t * (px[b] - px[a]))[change]
+            points[k, change, 1] = (py[a] + t * (py[b] - py[a]))[change]
+
+    finite = np.isfinite(corners).all(axis=0)
+    crossed = np.isfinite(points[:, :, 0])
+    count = crossed.sum(axis=0)
+
+    # Обычный случай: ровно два пересечённых ребра
+    simple = finite & (count == 2)
+    first = np.argmax(crossed, axis=0)
+    second = 3 - np.argmax(crossed[::-1], axis=0)
+    cells = np.flatnonzero(simple)
+    segments = [np.stack((points[first[cells], cells], points[second[cells], cells]), axis=1)]
+    sources = [cells]
+
+    # Седловая клетка: пары рёбер выбираются по знаку в центре
+    saddle = np.flatnonzero(finite & (count == 4))
+    if saddle.size:
+        joined = (values[4, saddle] > 0) == positive[0, saddle]
+        pairs_a = np.where(joined[:, None], [[0, 1]], [[0, 3]])
+        pairs_b = np.where(joined[:, None], [[2, 3]], [[1, 2]])
+        for pairs in (pairs_a, pairs_b):
+            segments.append(np.stack((points[pairs[:, 0], saddle],
+                                      points[pairs[:, 1], saddle]), axis=1))
+            sources.append(saddle)
+
+    segments = np.concatenate(segments)
+    sources = np.concatenate(sources)
+
+    # Смена знака через полюс (например, 1/x) даёт ложный отрезок:
+    # в его середине |F| больше, чем в углах клетки
+    middle = segments.mean(axis=1)
+    mid_values = np.abs(kernel(middle[:, 0], middle[:, 1]))
+    scale = np.abs(corners[:, sources]).max(axis=0)
+    real = mid_values <= scale
+    return segments[real], owner[sources][real]
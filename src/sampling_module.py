@@ -0,0 +1,394 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import numpy as np
+
+# Минимальный размер начальной равномерной сетки
+MIN_INITIAL_POINTS = 64
+# Число точек в одном тайле кэша выборки
+TILE_SIZE = 256
+# Размер порции при потоковом вычислении больших сеток
+CHUNK_SIZE = 1 << 16
+# Начиная с этого числа точек сетка вычисляется потоково с прореживанием
+STREAMING_THRESHOLD = 100_000
+
+
+def initial_points(max_points):
+    """Размер начальной равномерной сетки для заданного бюджета точек"""
+    return int(min(max_points, max(MIN_INITIAL_POINTS, max_points // 4)))
+
+
+def adaptive_sample(func, x_min, x_max, y_min, y_max, max_points=1000,
+                    width_px=800, height_px=600, tolerance_px=0.5, max_depth=12,
+                    initial=None):
+    """Адаптивная выборка точек функции на отрезке [x_min, x_max].
+
+    Начинает с грубой равномерной сетки и рекурсивно уплотняет её там,
+    где кривая заметно отклоняется от хорды (ошибка в пикселях) или где
+    соседние точки расходятся (асимптоты, границы области определения).
+    Общее число точек не превышает max_points. Начальную сетку можно
+    передать готовой парой (x, y), например из TileCache.
+    """
+    if initial is None:
+        x = np.linspace(x_min, x_max, initial_points(max_points))
+        y = func(x)
+    else:
+        x, y = initial
+    budget = int(max_points) - len(x)
+
+    min_dx = (x_max - x_min) / (len(x) - 1) / 2 ** max_depth
+    scale_x = width_px / (x_max - x_min)
+    scale_y = height_px / (y_max - y_min)
+
+    while budget > 0:
+        score = _interval_errors(x * scale_x, y, y_min, scale_y, height_px)
+        score[np.diff(x) <= min_dx] = 0
+        candidates = np.flatnonzero(score > tolerance_px)
+        if candidates.size == 0:
+            break
+
+        # Если бюджета не хватает, уточняем интервалы с наибольшей ошибкой
+        if candidates.size > budget:
+            worst = np.argsort(score[candidates])[::-1][:budget]
+            candidates = np.sort(candidates[worst])
+
+        x_mid = (x[candidates] + x[candidates + 1]) / 2
+        y_mid = func(x_mid)
+        x = np.insert(x, candidates + 1, x_mid)
+        y = np.insert(y, candidates + 1, y_mid)
+        budget -= candidates.size
+
+    return _break_jumps(x, y, y_min, scale_y, height_px, min_dx)
+
+
+def _to_pixels(y, y_min, scale_y, height_px):
+    """Переводит значения y в пиксели, обрезая далёкие выбросы за экран"""
+    py = (y - y_min) * scale_y
+    py[~np.isfinite(py)] = np.nan
+    return np.clip(py, -height_px, 2 * height_px)
+
+
+def _interval_errors(px, y, y_min, scale_y, height_px):
+    """Оценка ошибки (в пикселях) для каждого интервала между соседними точками"""
+    py = _to_pixels(y, y_min, scale_y, height_px)
+
+    # Расстояние от средней точки до хорды между соседями на экране
+    chord_x = px[2:] - px[:-2]
+    chord_y = py[2:] - py[:-2]
+    cross = chord_x * (py[1:-1] - py[:-2]) - chord_y * (px[1:-1] - px[:-2])
+    deviation = np.zeros(len(px))
+    deviation[1:-1] = np.nan_to_num(np.abs(cross) / np.hypot(chord_x, chord_y))
+
+    score = np.maximum(deviation[:-1], deviation[1:])
+
+    # Скачок между соседями на полэкрана и больше - возможная асимптота
+    jump = np.nan_to_num(np.abs(np.diff(py)))
+    steep = jump > height_px / 2
+    score[steep] = np.maximum(score[steep], jump[steep])
+
+    # Граница области определения: одна точка конечна, другая нет
+    finite = np.isfinite(py)
+    score[finite[:-1] != finite[1:]] = np.inf
+    return score
+
+
+def _break_jumps(x, y, y_min, scale_y, height_px, min_dx):
+    """Разрывает линию (вставляет nan) на неразрешённых скачках через весь экран"""
+    py = _to_pixels(y, y_min, scale_y, height_px)
+    jumps = np.flatnonzero(
+        (np.diff(x) <= 2 * min_dx) & (np.abs(np.diff(py)) > height_px)
+    )
+    if jumps.size == 0:
+        return x, y
+
+    x_gap = (x[jumps] + x[jumps + 1]) / 2
+    x = np.insert(x, jumps + 1, x_gap)
+    y = np.insert(y, jumps + 1, np.nan)
+    return x, y
+
+
+def insert_singularities(func, x, y, poles=(), boundaries=()):
+    """Добавляет в упорядоченную выборку (x, y) известные особые точки.
+
+    В полюсах ставится nan, поэтому линия разрывается ровно в них, а не
+    там, где соседние точки случайно разошлись; на границах области
+    определения - значение функции, чтобы кривая доходила до границы.
+    Точки вне [x[0], x[-1]] пропускаются, совпадающие с узлами сетки
+    заменяют значения в этих узлах.
+    """
+    poles = np.asarray(poles, dtype=float)
+    boundaries = np.asarray(boundaries, dtype=float)
+    poles = poles[(poles >= x[0]) & (poles <= x[-1])]
+    boundaries = boundaries[(boundaries >= x[0]) & (boundaries <= x[-1])
+                            & ~np.isin(boundaries, poles)]
+    if poles.size == 0 and boundaries.size == 0:
+        return x, y
+
+    with np.errstate(all='ignore'):
+        values = np.broadcast_to(func(boundaries), boundaries.shape) if boundaries.size \
+            else np.empty(0)
+    points = np.concatenate([poles, boundaries])
+    values = np.concatenate([np.full(poles.size, np.nan), values])
+
+    position = np.searchsorted(x, points)
+    existing = x[np.minimum(position, len(x) - 1)] == points
+    y = np.array(y, dtype=float)
+    y[position[existing]] = values[existing]
+    new = ~existing
+    return np.insert(x, position[new], points[new]), np.insert(y, position[new], values[new])
+
+
+def stream_sample(func, x_min, x_max, num_points, columns=800, chunk_size=CHUNK_SIZE,
+                  cancelled=None):
+    """Потоковое вычисление равномерной сетки из num_points точек.
+
+    Сетка считается порциями по chunk_size точек, так что память не зависит
+    от num_points. Каждая порция сразу сводится к огибающей по столбцам
+    пикселей: для каждого столбца хранятся первая и последняя точки, минимум
+    и максимум. Результат содержит не более 5 точек на столбец и на экране
+    не отличается от полной сетки. Между порциями проверяется cancelled():
+    устаревшее вычисление прерывается исключением CancelledError.
+    """
+    return stream_sample_many(lambda x: [func(x)], 1, x_min, x_max, num_points,
+                              columns, chunk_size, cancelled)[0]
+
+
+def stream_sample_many(func, count, x_min, x_max, num_points, columns=800,
+                       chunk_size=CHUNK_SIZE, cancelled=None):
+    """То же, что stream_sample, для count функций на общей сетке.
+
+    func(x) возвращает список из count массивов (например, FusedKernel),
+    поэтому каждая порция сетки строится и вычисляется один раз для всех
+    функций. Возвращает список пар (x, y).
+    """
+    columns = max(int(columns), 1)
+    num_points = int(num_points)
+    step = (x_max - x_min) / (num_points - 1)
+
+    first_x = np.full(columns, np.nan)
+    last_x = np.full(columns, np.nan)
+    first_y = np.full((count, columns), np.nan)
+    last_y = np.full((count, columns), np.nan)
+    y_low = np.full((count, columns), np.nan)
+    y_high = np.full((count, columns), np.nan)
+    has_gap = np.zeros((count, columns), dtype=bool)
+    seen = np.zeros(columns, dtype=bool)
+
+    for start in range(0, num_points, chunk_size):
+        if cancelled is not None and cancelled():
+            raise CancelledError()
+        index = np.arange(start, min(start + chunk_size, num_points))
+        x = x_min + index * step
+        x[index == num_points - 1] = x_max
+        y = np.array([np.asarray(values, dtype=float) for values in func(x)])
+        y[~np.isfinite(y)] = np.nan
+
+        # Столбцы внутри порции идут по возрастанию: сводим их через reduceat
+        column = np.minimum(((x - x_min) / (x_max - x_min) * columns).astype(int), columns - 1)
+        cols, starts = np.unique(column, return_index=True)
+        ends = np.append(starts[1:], len(x)) - 1
+
+        new = ~seen[cols]
+        first_x[cols[new]] = x[starts[new]]
+        first_y[:, cols[new]] = y[:, starts[new]]
+        last_x[cols] = x[ends]
+        last_y[:, cols] = y[:, ends]
+        y_low[:, cols] = np.fmin(y_low[:, cols], np.fmin.reduceat(y, starts, axis=1))
+        y_high[:, cols] = np.fmax(y_high[:, cols], np.fmax.reduceat(y, starts, axis=1))
+        has_gap[:, cols] |= np.logical_or.reduceat(np.isnan(y), starts, axis=1)
+        seen[cols] = True
+
+    # Для каждого столбца: первая точка, экстремумы в порядке хода кривой, последняя.
+    # Если в столбце были неопределённые точки, линия разрывается между экстремумами
+    rising = ~(first_y > last_y)
+    ext1 = np.where(rising, y_low, y_high)
+    ext2 = np.where(rising, y_high, y_low)
+    gap = np.where(has_gap, np.nan, ext1)
+
+    xs = np.column_stack((first_x, first_x, first_x, last_x, last_x))[seen].ravel()
+    return [(xs, np.column_stack((first_y[k], ext1[k], gap[k], ext2[k], last_y[k]))[seen].ravel())
+            for k in range(count)]
+
+
+class TileCache:
+    """Кэш вычисленных значений функций, разбитый на тайлы по оси x.
+
+    Сетка выровнена по степеням двойки: уровень L соответствует шагу 2**L,
+    а тайл (L, i) содержит TILE_SIZE точек начиная с x = i * TILE_SIZE * 2**L.
+    При сдвиге диапазона вычисляются только новые тайлы, а при небольшом
+    отдалении переиспользуется соседний более мелкий уровень (точек вдвое
+    больше, но плотность не ниже требуемой). Более грубый уровень не
+    подходит: он дал бы вдвое меньше точек, чем запрошено.
+    Объём ограничен общим числом хранимых точек (LRU-вытеснение).
+    """
+
+    def __init__(self, max_samples=4_000_000):
+        self.max_samples = max_samples
+        self._tiles = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def level_for(x_min, x_max, num_points):
+        """Уровень с шагом 2**L, не превышающим требуемый шаг сетки"""
+        step = (x_max - x_min) / max(num_points - 1, 1)
+        return int(np.floor(np.log2(step)))
+
+    @staticmethod
+    def _tile_range(level, x_min, x_max):
+        width = TILE_SIZE * 2.0 ** level
+        return range(int(np.floor(x_min / width)), int(np.floor(x_max / width)) + 1)
+
+    @staticmethod
+    def _tile_x(level, index):
+        return (index * TILE_SIZE + np.arange(TILE_SIZE)) * 2.0 ** level
+
+    def _is_cached(self, key, level, x_min, x_max):
+        return all((key, level, index) in self._tiles
+                   for index in self._tile_range(level, x_min, x_max))
+
+    def sample(self, key, func, x_min, x_max, num_points):
+        """Возвращает равномерную сетку (x, y) на [x_min, x_max] не реже num_points точек"""
+        return self.sample_many([key], lambda x: [func(x)], x_min, x_max, num_points)[0]
+
+    def sample_many(self, keys, func, x_min, x_max, num_points):
+        """То же, что sample, для нескольких функций на общей сетке.
+
+        func(x) возвращает список значений всех функций (например,
+        FusedKernel), поэтому недостающие тайлы вычисляются для всех
+        функций одним вызовом. Возвращает список пар (x, y) в порядке keys.
+        """
+        with self._lock:
+            level = self.level_for(x_min, x_max, num_points)
+            finer = level - 1
+            if (not all(self._is_cached(key, level, x_min, x_max) for key in keys)
+                    and all(self._is_cached(key, finer, x_min, x_max) for key in keys)):
+                level = finer
+
+            indices = list(self._tile_range(level, x_min, x_max))
+            missing = [index for index in indices
+                       if any((key, level, index) not in self._tiles for key in keys)]
+            self.hits += len(indices) - len(missing)
+            self.misses += len(missing)
+
+            tiles = [{} for _ in keys]
+            for index in indices:
+                if index not in missing:
+                    for k, key in enumerate(keys):
+                        self._tiles.move_to_end((key, level, index))
+                        tiles[k][index] = self._tiles[(key, level, index)]
+
+        # Все недостающие тайлы вычисляются одним векторизованным вызовом
+        # (вне блокировки, чтобы разные функции считались параллельно)
+        if missing:
+            x_new = np.concatenate([self._tile_x(level, index) for index in missing])
+            values = func(x_new)
+            with self._lock:
+                for k, key in enumerate(keys):
+                    for index, y_tile in zip(missing, np.split(values[k], len(missing))):
+                        tiles[k][index] = y_tile
+                        self._store((key, level, index), y_tile)
+
+        x = np.concatenate([self._tile_x(level, index) for index in indices])
+
+        # Обрезаем по диапазону и добавляем точные концы отрезка
+        inside = (x > x_min) & (x < x_max)
+        x_ends = np.array([x_min, x_max], dtype=float)
+        y_ends = func(x_ends)
+        x = np.concatenate(([x_min], x[inside], [x_max]))
+        samples = []
+        for k in range(len(keys)):
+            y = np.concatenate([tiles[k][index] for index in indices])
+            samples.append((x, np.concatenate((y_ends[k][:1], y[inside], y_ends[k][1:]))))
+        return samples
+
+    def _store(self, tile_key, y_tile):
+        # Тайл мог быть уже сохранён параллельным вызовом
+        previous = self._tiles.pop(tile_key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._tiles[tile_key] = y_tile
+        self._size += len(y_tile)
+        while self._size > self.max_samples and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self._size = 0
+
+    def stats(self):
+        """Возвращает счётчики тайлов и долю попаданий"""
+        total = self.hits + self.misses
+        return {
+            'tiles': len(self._tiles),
+            'samples': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class ParallelEvaluator:
+    """Параллельное вычисление выборок для набора функций.
+
+    Векторизованные ядра numpy отпускают GIL на больших массивах, поэтому
+    функции считаются в пуле потоков на всех ядрах процессора. Результаты
+    возвращаются в исходном порядке функций.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._executor_workers = 0
+        # set_workers вызывается из GUI-потока, map - из потока построения
+        self._lock = threading.Lock()
+
+    def set_workers(self, max_workers):
+        """Меняет число потоков; новый пул создаётся при следующем вызове map"""
+        with self._lock:
+            self.max_workers = max(1, int(max_workers))
+
+    def map(self, func, items):
+        """Применяет func к каждому элементу items.
+
+        Возвращает список пар (результат, ошибка) в порядке items.
+        """
+        items = list(items)
+        with self._lock:
+            if self.max_workers == 1 or len(items) < 2:
+                futures = None
+            else:
+                # Пул с устаревшим числом потоков заменяется; уже поставленные
+                # в него задания досчитываются
+                if self._executor is not None and self._executor_workers != self.max_workers:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                    self._executor_workers = self.max_workers
+                futures = [self._executor.submit(self._call, func, item) for item in items]
+        if futures is None:
+            return [self._call(func, item) for item in items]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _call(func, item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,219 @@
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource  # Ограничение процессорного времени доступно только в Unix
+except ImportError:
+    resource = None
+
+# Время ожидания результата по умолчанию, секунд
+DEFAULT_TIMEOUT = 5.0
+# Ограничение резидентной памяти процесса вычислений, МБ
+DEFAULT_MEMORY_MB = 1024
+# Время на запуск процесса (импорт numpy и sympy), секунд
+STARTUP_TIMEOUT = 60.0
+# Период проверки результата и потребления памяти, секунд
+POLL_INTERVAL = 0.02
+
+
+class SandboxError(Exception):
+    """Вычисление в изолированном процессе не удалось"""
+
+
+class SandboxTimeout(SandboxError):
+    """Превышено время вычисления"""
+
+
+class SandboxMemoryError(SandboxError):
+    """Превышен лимит памяти"""
+
+
+def _worker_main(conn, cpu_seconds):
+    """Цикл процесса вычислений: получает (func, args), отправляет (ok, value)"""
+    conn.send((True, None))  # Процесс запущен и готов к работе
+    while True:
+        try:
+            func, args = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        # Лимит процессорного времени отсчитывается от начала задания;
+        # при превышении ядро завершает процесс сигналом SIGXCPU
+        if resource is not None and cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            spent = usage.ru_utime + usage.ru_stime
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            soft = int(math.ceil(spent + cpu_seconds))
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Результат или исключение не сериализуются
+            conn.send((False, SandboxError(f"{type(e).__name__}: {e}")))
+
+
+class Sandbox:
+    """Изолированный процесс для недоверенных вычислений.
+
+    Задания выполняются по очереди в отдельном постоянно работающем
+    процессе. Родительский процесс ждёт результат не дольше timeout
+    секунд и следит за резидентной памятью процесса; процесс, превысивший
+    время, процессорный лимит или память, принудительно завершается и
+    перезапускается при следующем задании. Функция и аргументы должны
+    сериализоваться pickle (функции модулей, методы объектов).
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB, cpu_seconds=None):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds or int(math.ceil(timeout))
+        self.killed = 0  # Число принудительно завершённых заданий
+        self._context = multiprocessing.get_context('spawn')  # fork небезопасен при потоках Qt
+        self._process = None
+        self._conn = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запускает процесс, если он ещё не запущен (не ждёт готовности)"""
+        if self._process is not None and self._process.is_alive():
+            return
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main, args=(child_conn, self.cpu_seconds), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._ready = False
+
+    def run(self, func, *args, timeout=None):
+        """Выполняет func(*args) в процессе и возвращает результат.
+
+        Исключение функции передаётся вызывающему; при превышении лимитов
+        выбрасывается SandboxTimeout или SandboxMemoryError.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.start()
+            if not self._ready:
+                self._wait(STARTUP_TIMEOUT)
+                self._ready = True
+            self._conn.send((func, args))
+            ok, value = self._wait(timeout)
+        if ok:
+            return value
+        raise value
+
+    def _wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self._conn.poll(max(0.0, min(POLL_INTERVAL, deadline - time.monotonic()))):
+                    return self._conn.recv()
+            except (EOFError, OSError):
+                # Процесс завершился, не ответив: лимит процессора или сбой
+                exitcode = self._kill()
+                if resource is not None and exitcode == -signal.SIGXCPU:
+                    raise SandboxTimeout(
+                        f"Превышен лимит процессорного времени ({self.cpu_seconds} с)")
+                raise SandboxError(f"Процесс вычислений аварийно завершился (код {exitcode})")
+
+            if time.monotonic() >= deadline:
+                self._kill()
+                raise SandboxTimeout(f"Превышено время вычисления ({timeout:g} с)")
+            if self._rss_mb() > self.memory_mb:
+                self._kill()
+                raise SandboxMemoryError(f"Превышен лимит памяти ({self.memory_mb} МБ)")
+
+    def _rss_mb(self):
+        """Резидентная память процесса в МБ (0, если узнать нельзя)"""
+        try:
+            with open(f"/proc/{self._process.pid}/statm") as statm:
+                pages = int(statm.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return 0
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+    def _kill(self):
+        """Завершает процесс; следующее задание запустит новый"""
+        self.killed += 1
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+        exitcode = self._process.exitcode
+        self._process = None
+        self._conn = None
+        return exitcode
+
+    def shutdown(self):
+        with self._lock:
+            if self._process is not None:
+                self._conn.close()
+                self._process.join(timeout=1.0)
+                if self._process.is_alive():
+                    self._process.kill()
+                self._process = None
+                self._conn = None
+
+
+class SandboxPool:
+    """Несколько изолированных процессов для параллельных заданий.
+
+    submit() возвращает Future; задание выполняется в первом свободном
+    процессе, и его ограничение времени отсчитывается от начала
+    выполнения, а не от постановки в очередь. Прерванное по лимиту
+    задание не задерживает остальные. Процессы запускаются при первом
+    задании или заранее методом start().
+    """
+
+    def __init__(self, size=None, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+        self.size = size or max(2, min(4, os.cpu_count() or 1))
+        self.timeout = timeout
+        self._sandboxes = [Sandbox(timeout, memory_mb) for _ in range(self.size)]
+        self._idle = queue.SimpleQueue()
+        for sandbox in self._sandboxes:
+            self._idle.put(sandbox)
+        self._executor = None
+
+    @property
+    def killed(self):
+        return sum(sandbox.killed for sandbox in self._sandboxes)
+
+    def start(self):
+        """Запускает процессы заранее, чтобы первое задание не ждало импорта"""
+        for sandbox in self._sandboxes:
+            sandbox.start()
+
+    def submit(self, func, *args, timeout=None):
+        """Ставит func(*args) в очередь и возвращает Future"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size)
+        return self._executor.submit(self._run, func, args, timeout)
+
+    def _run(self, func, args, timeout):
+        sandbox = self._idle.get()
+        try:
+            return sandbox.run(func, *args, timeout=timeout)
+        finally:
+            self._idle.put(sandbox)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for sandbox in self._sandboxes:
+            sandbox.shutdown()
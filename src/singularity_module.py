@@ -0,0 +1,187 @@
+import math
+
+import numpy as np
+import sympy as sp
+
+from src.expression_module import X, compile_expression
+
+# Виды особых точек
+POLE = 'pole'  # Функция неограниченна: знаменатель, tan, cot
+BOUNDARY = 'boundary'  # Граница области определения: логарифм, корень, arcsin
+# Наибольшее число точек периодической серии на отрезке
+MAX_FAMILY_POINTS = 10_000
+# Функции, определённые и конечные на всей действительной оси
+_FINITE_FUNCTIONS = (sp.sin, sp.cos, sp.atan, sp.sinh, sp.cosh, sp.tanh, sp.exp,
+                     sp.Abs, sp.sign, sp.floor, sp.ceiling)
+
+
+class SingularityIndex:
+    """Особые точки функции одной переменной.
+
+    points - отдельные точки (значение sympy -> (float, вид)), families -
+    периодические серии offset + period*k (полюса tan(x), 1/sin(x)...),
+    хранятся и числами sympy, и float. complete = False, если какое-то
+    уравнение решить не удалось или выражение не разобрано до конца: тогда
+    список может быть неполным.
+    """
+
+    def __init__(self):
+        self.points = {}
+        self.families = []  # (offset, period, вид, offset float, period float)
+        self.complete = True
+
+    def add_point(self, value, kind):
+        # Полюс важнее границы: в такой точке линия разрывается в любом случае
+        current = self.points.get(value)
+        if current is None or kind == POLE:
+            self.points[value] = (float(value), kind)
+
+    def add_family(self, offset, period, kind):
+        period = abs(period)
+        offset = sp.Mod(offset, period)
+        for i, (other, other_period, other_kind, _, _) in enumerate(self.families):
+            if other_kind != kind or other_period != period:
+                continue
+            if other == offset:
+                return
+            if sp.simplify(abs(other - offset) - period / 2) == 0:
+                # Две серии через полпериода - одна серия с вдвое меньшим периодом
+                del self.families[i]
+                self.add_family(min(offset, other), period / 2, kind)
+                return
+        self.families.append((offset, period, kind, float(offset), float(period)))
+
+    def values(self, kind=None):
+        """Отдельные точки вида kind (все, если None) в порядке возрастания"""
+        points = [(number, value) for value, (number, point_kind) in self.points.items()
+                  if kind is None or point_kind == kind]
+        return [value for _, value in sorted(points, key=lambda item: item[0])]
+
+    def poles(self):
+        return self.values(POLE)
+
+    def boundaries(self):
+        return self.values(BOUNDARY)
+
+    def points_in(self, a, b, kind=None, limit=MAX_FAMILY_POINTS):
+        """Все особые точки вида kind на [a, b] (float, по возрастанию).
+
+        Возвращает None, если точек периодических серий больше limit
+        (полюса плотнее пикселей - точное разбиение бессмысленно).
+        """
+        numbers = [number for number, point_kind in self.points.values()
+                   if (kind is None or point_kind == kind) and a <= number <= b]
+        for _, _, family_kind, offset, period in self.families:
+            if kind is not None and family_kind != kind:
+                continue
+            first = math.ceil((a - offset) / period)
+            last = math.floor((b - offset) / period)
+            if last - first + 1 > limit:
+                return None
+            numbers.extend(offset + period * np.arange(first, last + 1))
+        return np.unique(np.array(numbers, dtype=float))
+
+
+def family_text(offset, period):
+    """Запись серии точек: 'pi/2 + pi*k, k ∈ Z'"""
+    if offset == 0:
+        return f"{period}*k, k ∈ Z"
+    return f"{offset} + {period}*k, k ∈ Z"
+
+
+def build_index(expr, x=X):
+    """Индекс особых точек выражения sympy за один обход дерева.
+
+    Полюса - нули оснований отрицательных степеней (знаменателей) и
+    аргументов cos/sin у tan/cot; границы области определения - нули
+    аргументов логарифмов, оснований корней чётной степени и дробных
+    десятичных степеней (x**0.5) и точки arcsin/arccos(u) при u = ±1. Каждое уравнение решается solveset на
+    действительной оси один раз; периодические решения записываются сериями.
+    Другие функции делают индекс неполным.
+    """
+    index = SingularityIndex()
+    solved = set()
+
+    def zeros(base, kind):
+        if not base.has(x) or (base, kind) in solved:
+            return
+        solved.add((base, kind))
+        try:
+            solution = sp.solveset(base, x, domain=sp.S.Reals)
+        except Exception:
+            index.complete = False
+            return
+        _add_solution(index, solution, kind)
+
+    for node in sp.preorder_traversal(expr):
+        if node.is_Pow:
+            base, exponent = node.as_base_exp()
+            if exponent.has(x):
+                # x**x и подобные: область определения не разбирается
+                if base.has(x):
+                    index.complete = False
+                continue
+            if exponent.is_negative:
+                zeros(base, POLE)
+            if exponent.is_Rational and not exponent.is_integer and exponent.q % 2 == 0:
+                zeros(base, BOUNDARY)
+            elif exponent.is_Float and not float(exponent).is_integer():
+                # Дробная десятичная степень (x**0.5) не определена при base < 0
+                zeros(base, BOUNDARY)
+        elif isinstance(node, sp.log):
+            zeros(node.args[0], BOUNDARY)
+        elif isinstance(node, sp.tan):
+            zeros(sp.cos(node.args[0]), POLE)
+        elif isinstance(node, sp.cot):
+            zeros(sp.sin(node.args[0]), POLE)
+        elif isinstance(node, (sp.asin, sp.acos)):
+            zeros(node.args[0] - 1, BOUNDARY)
+            zeros(node.args[0] + 1, BOUNDARY)
+        elif isinstance(node, sp.Function) and not isinstance(node, _FINITE_FUNCTIONS):
+            # Особые точки прочих функций не известны
+            index.complete = False
+    return index
+
+
+def _add_solution(index, solution, kind):
+    """Переносит множество решений solveset в индекс"""
+    if solution is sp.S.EmptySet:
+        return
+    if isinstance(solution, sp.FiniteSet):
+        for value in solution:
+            if value.is_real and value.is_number:
+                index.add_point(value, kind)
+            else:
+                index.complete = False
+    elif isinstance(solution, sp.Union):
+        for part in solution.args:
+            _add_solution(index, part, kind)
+    elif isinstance(solution, sp.ImageSet) and solution.base_set == sp.S.Integers:
+        # Серия offset + period*n: линейная функция целого n
+        n, = solution.lamda.variables
+        value = sp.expand(solution.lamda.expr)
+        period = value.coeff(n)
+        offset = value - period * n
+        if period.is_number and period != 0 and offset.is_number and not offset.has(n):
+            index.add_family(offset, period, kind)
+        else:
+            index.complete = False
+    else:
+        # ConditionSet, отрезки нулей и прочее: решение не разобрано
+        index.complete = False
+
+
+def index_for_text(text):
+    """Индекс особых точек функции от x по строке; None для неравенств и уравнений"""
+    try:
+        compiled = compile_expression(text)
+    except ValueError:
+        return None
+    if 'y' in compiled.variables:
+        return None
+    try:
+        expr = compiled.sympy_expr
+    except Exception:
+        # Нет записи sympy (np.where, np.clip...): особые точки неизвестны
+        return None
+    return build_index(expr)
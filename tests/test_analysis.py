@@ -1,9 +1,13 @@
 import sys
 import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import pickle
+import sqlite3
 import pytest
-from analysis_module import AnalysisModule
+from analysis_module import AnalysisModule, SymbolicMemo
+from database_module import DatabaseModule
 
 def test_basic_function():
     """Тест базовой квадратичной функции"""
@@ -46,6 +50,163 @@ def test_function_with_log():
     assert "log" in result
     assert "Аргумент логарифма" in result or "не определена" in result
 
+def test_singularity_sections():
+    """Тест области определения и пределов по индексу особых точек"""
+    analyzer = AnalysisModule()
+    result = analyzer.analyze_function("tan(x)", keys=['domain', 'discontinuity_limits'])
+    assert "не определена в точках: pi/2 + pi*k, k ∈ Z" in result
+    assert "lim(x→pi/2-) = oo, lim(x→pi/2+) = -oo" in result
+
+    # На границе области определения предел берётся только изнутри
+    result = analyzer.analyze_function("log(x)", keys=['domain', 'discontinuity_limits'])
+    assert "Границы области определения: 0" in result
+    assert "lim(x→0+) = -oo" in result and "x→0-" not in result
+    assert analyzer.analyze("1/(x**2 - 4)").discontinuities == ['-2', '2']
+
+def test_sections_match_full_report():
+    """Тест: разделы, вычисленные по отдельности, составляют полный отчёт"""
+    analyzer = AnalysisModule()
+    sections = [analyzer.analyze_section("x**3 - 3*x", key) for key, _, _ in analyzer.SECTIONS]
+    assert "\n".join(sections) == analyzer.analyze_function("x**3 - 3*x")
+    assert sections[-1].startswith("ЭКСТРЕМУМЫ")
+
+def test_lazy_sections():
+    """Тест: дорогие разделы не входят в отчёт, построенный без запроса"""
+    analyzer = AnalysisModule()
+    eager = analyzer.eager_sections()
+    assert 'integral' not in eager and 'discontinuity_limits' not in eager
+    assert eager[0] == 'function' and 'derivative' in eager
+    report = analyzer.analyze_function("sin(x)/x", keys=eager)
+    assert "f'(x) = cos(x)/x - sin(x)/x**2" in report
+    assert "∫f(x)dx = " not in report and "Si(x)" not in report
+
+def test_numeric_roots_fallback():
+    """Тест: корни трансцендентного уравнения находятся численно"""
+    analyzer = AnalysisModule()
+    result = analyzer.analyze_section("cos(x) - x", "intercepts", (-5.0, 5.0))
+    assert "численно на [-5, 5]" in result
+    assert "0.7390851332" in result
+
+def test_numeric_extremums():
+    """Тест: экстремумы ищутся численно на выбранном отрезке"""
+    analyzer = AnalysisModule()
+    result = analyzer.analyze_section("cos(x) + x**2/10", "extremums", (-5.0, 5.0))
+    assert "Отрезок [-5, 5]" in result
+    assert "минимум: (2.59574, -0.180898)" in result
+    assert "максимум на границе: (5, 2.78366)" in result
+
+def test_numeric_definite_integral():
+    """Тест: определённый интеграл считается численно на выбранном отрезке"""
+    analyzer = AnalysisModule()
+    result = analyzer.analyze_section("exp(-x**2) + cos(x)**3", "definite_integral", (0.0, 2.0))
+    assert "∫f(x)dx от 0 до 2 ≈ 1.540769836" in result
+    result = analyzer.analyze_section("1/x", "definite_integral", (0.0, 1.0))
+    assert "расходится" in result
+    result = analyzer.analyze_section("tan(x)", "definite_integral", (-5.0, 5.0))
+    assert "расходится" in result
+    result = analyzer.analyze_section("x**-0.9", "definite_integral", (0.0, 1.0))
+    assert "∫f(x)dx от 0 до 1 ≈ 9.999999999" in result
+    # Структурный анализ разбивает отрезок в особых точках из индекса
+    result = analyzer.analyze("tan(x)", (-5.0, 5.0))
+    assert not result.integral_converged
+
+def test_structured_result():
+    """Тест структурного результата анализа"""
+    analyzer = AnalysisModule()
+    result = analyzer.analyze("x**3 - 3*x", (-3.0, 3.0))
+    assert result.parity == 'odd' and result.derivative == '3*x**2 - 3'
+    assert set(result.roots) == {'0', '-sqrt(3)', 'sqrt(3)'}
+    assert abs(result.definite_integral) < 1e-9 and result.integral_converged
+    assert [(e.kind, e.boundary) for e in result.extremums] == \
+        [('min', True), ('max', False), ('min', False), ('max', True)]
+    # Нерешённые символьные части записываются в errors, остальное вычисляется
+    result = analyzer.analyze("cos(x) - x").to_dict()
+    assert result['roots'] == [] and 'roots' in result['errors']
+    assert abs(result['numeric_roots'][0] - 0.7390851332) < 1e-9
+
+def test_parity_fast_path(monkeypatch):
+    """Тест: sp.simplify не вызывается, если численная проверка исключила симметрию"""
+    import sympy as sp
+    calls = []
+    simplify = sp.simplify
+    monkeypatch.setattr(sp, 'simplify', lambda expr: calls.append(expr) or simplify(expr))
+    analyzer = AnalysisModule()
+    assert "общего вида" in analyzer.analyze_section("sin(x)**5*cos(x)**3 + exp(x)", "symmetry")
+    assert calls == []
+    assert "нечетная" in analyzer.analyze_section("(x**3 - 2*x)/(x**4 + 1)", "symmetry")
+    assert len(calls) == 1
+
+def test_symbolic_memo():
+    """Тест запоминания: одинаковые выражения считаются один раз"""
+    memo = SymbolicMemo(maxsize=2)
+    calls = []
+    x = AnalysisModule().x
+    compute = lambda: calls.append(1) or len(calls)
+    assert memo.get('diff', x**2, (1,), compute) == 1
+    assert memo.get('diff', x * x, (1,), compute) == 1  # та же каноническая запись
+    assert memo.get('diff', x**2, (2,), compute) == 2
+    assert memo.hits == 1 and memo.misses == 2
+
+def test_persistent_analysis_cache(tmp_path):
+    """Тест постоянного кэша разделов: повторный анализ берётся из базы"""
+    database = DatabaseModule(str(tmp_path / "test.db"), analysis_cache_size=15)
+    analyzer = AnalysisModule(cache=database)
+    first = analyzer.analyze_function("x**2")
+    assert database.load_analysis("Pow(Symbol('x'), Integer(2))", "derivative") == \
+        "ПРОИЗВОДНАЯ:\nf'(x) = 2*x\n"
+    
+    # Другой экземпляр (другой процесс) получает готовый текст из базы
+    database.save_analysis("Pow(Symbol('x'), Integer(2))", "derivative", "из кэша\n")
+    assert "из кэша" in AnalysisModule(cache=database).analyze_function("x*x")
+    assert first != AnalysisModule(cache=database).analyze_function("x*x")
+    
+    # Размер ограничен: старые записи вытесняются
+    analyzer.analyze_function("x**3")
+    conn = sqlite3.connect(database.db_name)
+    assert conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0] == 15
+    conn.close()
+    assert database.load_analysis("Pow(Symbol('x'), Integer(3))", "integral") is not None
+
+def test_persistent_cache_scope(tmp_path, monkeypatch):
+    """Тест постоянного кэша: сбои, разделы по отрезку и разделы по ядру numpy"""
+    database = DatabaseModule(str(tmp_path / "test.db"))
+    analyzer = AnalysisModule(cache=database)
+    
+    # Неудачный раздел не сохраняется: следующий запрос вычисляет его заново
+    def fail(expr, order=1):
+        raise RuntimeError("сбой")
+    monkeypatch.setattr(analyzer, 'derivative', fail)
+    assert "Не удалось" in analyzer.analyze_function("x**4", keys=['derivative'])
+    monkeypatch.undo()
+    assert "4*x**3" in analyzer.analyze_function("x**4", keys=['derivative'])
+    
+    # Разделы, зависящие от отрезка, не занимают место в хранилище
+    analyzer.analyze_function("x**4", (-1.0, 1.0), keys=['intercepts'])
+    conn = sqlite3.connect(database.db_name)
+    sections = [row[0] for row in conn.execute("SELECT section FROM analysis_cache")]
+    conn.close()
+    assert sections == ['derivative']
+    
+    # sqrt(x)**2 и x в sympy совпадают, но ядро numpy у них разное
+    assert "нечетная" in analyzer.analyze_function("x", keys=['symmetry'])
+    assert "общего вида" in analyzer.analyze_function("sqrt(x)**2", keys=['symmetry'])
+
+def test_history_batch(tmp_path):
+    """Тест истории: пакетная запись одной транзакцией и передача базы в другой процесс"""
+    database = DatabaseModule(str(tmp_path / "test.db"))
+    database.save_query("x**2")
+    database.save_queries(["sin(x)", "cos(x)"])
+    assert [row[1] for row in database.get_history()] == ["cos(x)", "sin(x)", "x**2"]
+    
+    # Копия (как в процессе Sandbox) пользуется тем же соединением процесса
+    copy = pickle.loads(pickle.dumps(database))
+    assert copy._connection()[0] is database._connection()[0]
+    copy.save_query("tan(x)")
+    assert database.get_history(limit=1)[0][1] == "tan(x)"
+    database.close()
+    assert copy.get_history(limit=1)[0][1] == "tan(x)"  # Соединение открывается снова
+    copy.close()
+
 if __name__ == "__main__":
     # Простой запуск без pytest
     test_basic_function()
@@ -57,4 +218,28 @@ if __name__ == "__main__":
     test_rational_function()
     print("test_rational_function пройден")
     
+    test_singularity_sections()
+    print("test_singularity_sections пройден")
+    
+    test_sections_match_full_report()
+    print("test_sections_match_full_report пройден")
+    
+    test_lazy_sections()
+    print("test_lazy_sections пройден")
+    
+    test_numeric_roots_fallback()
+    print("test_numeric_roots_fallback пройден")
+    
+    test_numeric_extremums()
+    print("test_numeric_extremums пройден")
+    
+    test_numeric_definite_integral()
+    print("test_numeric_definite_integral пройден")
+    
+    test_structured_result()
+    print("test_structured_result пройден")
+    
+    test_symbolic_memo()
+    print("test_symbolic_memo пройден")
+    
     print("Все тесты пройдены успешно!")
\ No newline at end of file
@@ -0,0 +1,62 @@
+import sys
+import os
+import io
+import csv
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.batch_module import CsvWriter, JsonLinesWriter, main, read_expressions, run_batch
+
+def test_read_expressions():
+    """Тест чтения файла функций: пустые строки и комментарии пропускаются"""
+    lines = ["# Список функций\n", "x**2\n", "\n", "  sin(x)  \n"]
+    assert list(read_expressions(lines)) == [(2, "x**2"), (4, "sin(x)")]
+    print("test_read_expressions пройден")
+
+def test_run_batch_records():
+    """Тест пакетного анализа: результаты, ошибки и превышение времени"""
+    expressions = [(1, "x**2 - 1"), (2, "abc("), (3, "2**(10**10**5)")]
+    records = {record['line']: record
+               for record in run_batch(expressions, (-3.0, 3.0), jobs=2, timeout=3.0)}
+    assert records[1]['status'] == 'ok'
+    assert records[1]['roots'] == ['-1', '1'] and records[1]['parity'] == 'even'
+    assert abs(records[1]['definite_integral'] - 12.0) < 1e-9
+    assert records[2]['status'] == 'error'
+    assert records[3]['status'] == 'timeout'
+    print("test_run_batch_records пройден")
+
+def test_writers():
+    """Тест вывода записей в JSON Lines и CSV"""
+    record = {'line': 1, 'input': "x", 'status': 'ok', 'roots': ['0'],
+              'extremums': [{'x': -1.0, 'y': -1.0, 'kind': 'min', 'boundary': True}]}
+    stream = io.StringIO()
+    JsonLinesWriter(stream).write(record)
+    assert json.loads(stream.getvalue()) == record
+
+    stream = io.StringIO()
+    CsvWriter(stream).write(record)
+    row = next(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert row['roots'] == '0' and row['extremums'] == 'min(-1, -1) на границе'
+    print("test_writers пройден")
+
+def test_cli(tmp_path):
+    """Тест командной строки: файл функций -> файл CSV"""
+    source = tmp_path / "functions.txt"
+    source.write_text("# функции\nx**3\n", encoding='utf-8')
+    output = tmp_path / "results.csv"
+    assert main([str(source), '-o', str(output), '--interval', '0', '2', '-j', '1']) == 0
+    with open(output, encoding='utf-8', newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 1 and rows[0]['status'] == 'ok'
+    assert rows[0]['derivative'] == '3*x**2' and abs(float(rows[0]['definite_integral']) - 4.0) < 1e-9
+    print("test_cli пройден")
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_read_expressions()
+    test_run_batch_records()
+    test_writers()
+    with tempfile.TemporaryDirectory() as directory:
+        test_cli(pathlib.Path(directory))
+    print("Все тесты пакетного анализа пройдены!")
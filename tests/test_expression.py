@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from expression_module import compile_expression, ExpressionCache, fuse_expressions
+
+def test_vectorized_basic():
+    """Тест вычисления сразу для всего массива"""
+    kernel = compile_expression("x**2 + 1")
+    x = np.array([-2.0, 0.0, 3.0])
+    assert np.allclose(kernel(x), [5, 1, 10])
+    print("test_vectorized_basic пройден")
+
+def test_constant_broadcast():
+    """Тест константы: значение растягивается на всю сетку"""
+    kernel = compile_expression("5")
+    y = kernel(np.linspace(0, 1, 4))
+    assert y.shape == (4,)
+    assert np.all(y == 5)
+    print("test_constant_broadcast пройден")
+
+def test_invalid_points_are_nan():
+    """Тест точек вне области определения: nan/inf вместо исключения"""
+    kernel = compile_expression("sqrt(x) + 1/x")
+    y = kernel(np.array([-1.0, 0.0, 4.0]))
+    assert np.isnan(y[0])
+    assert np.isinf(y[1])
+    assert np.isclose(y[2], 2.25)
+    print("test_invalid_points_are_nan пройден")
+
+def test_no_builtins():
+    """Тест изоляции: встроенные функции Python отклоняются при разборе"""
+    for text in ["__import__('os')", "open(x)", "np.load(x)", "x.real", "[x]"]:
+        try:
+            compile_expression(text)
+            assert False, "Ожидалась ошибка"
+        except ValueError:
+            pass
+    print("test_no_builtins пройден")
+
+def test_cache_hits_and_normalization():
+    """Тест кэша: повторный запрос не разбирает выражение заново"""
+    cache = ExpressionCache(maxsize=4)
+    first = cache.get("x ** 2")
+    second = cache.get("  x  **   2 ")
+    assert first is second
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    print("test_cache_hits_and_normalization пройден")
+
+def test_cache_eviction():
+    """Тест вытеснения самой старой записи при переполнении"""
+    cache = ExpressionCache(maxsize=2)
+    cache.get("x")
+    cache.get("x + 1")
+    cache.get("x")  # x становится самой свежей записью
+    cache.get("x + 2")
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+    cache.get("x")
+    assert cache.stats()['hits'] == 2
+    print("test_cache_eviction пройден")
+
+def test_cache_sympy_expression():
+    """Тест символьного выражения, хранящегося в записи кэша"""
+    cache = ExpressionCache()
+    entry = cache.get("sin(x)**2")
+    assert str(entry.sympy_expr) == "sin(x)**2"
+    assert entry.sympy_expr is cache.get("sin(x)**2").sympy_expr
+    print("test_cache_sympy_expression пройден")
+
+def test_fused_shared_subexpression():
+    """Тест объединённого ядра: sin(x) вычисляется один раз для всех функций"""
+    texts = ["sin(x)", "sin(x)**2", "sin(x) + cos(x)", "exp(sin(x))"]
+    kernel = fuse_expressions(texts)
+    stats = kernel.stats()
+    assert stats['fused'] == 4 and stats['shared'] == 1
+    assert stats['ops_after'] < stats['ops_before']
+    x = np.linspace(-10, 10, 1001)
+    for text, values in zip(texts, kernel(x)):
+        assert np.allclose(values, compile_expression(text)(x))
+    print("test_fused_shared_subexpression пройден")
+
+def test_fused_keeps_numpy_semantics():
+    """Тест: функции, которые sympy упрощает иначе, считаются отдельно"""
+    texts = ["sqrt(x)**2", "sqrt(x) + 1", "log10(x) + sqrt(x)", "5"]
+    kernel = fuse_expressions(texts)
+    x = np.linspace(-4, 4, 101)
+    for text, values in zip(texts, kernel(x)):
+        assert np.allclose(values, compile_expression(text)(x), equal_nan=True)
+    assert 0 not in kernel.members
+    print("test_fused_keeps_numpy_semantics пройден")
+
+def test_whitelist_accepts_valid():
+    """Тест проверки: константы, имена SAFE_DICT и функции numpy допустимы"""
+    assert compile_expression("5").variables == frozenset()
+    assert compile_expression("floor(x) + 1").variables == {'x'}
+    assert compile_expression("np.sin(x) + e").variables == {'x'}
+    assert compile_expression("y > x**2").variables == {'x', 'y'}
+    print("test_whitelist_accepts_valid пройден")
+
+def test_sympy_names():
+    """Тест перевода имён SAFE_DICT в символьные функции sympy"""
+    assert str(compile_expression("e**x").sympy_expr) == "exp(x)"
+    assert str(compile_expression("arcsin(x)").sympy_expr) == "asin(x)"
+    print("test_sympy_names пройден")
+
+if __name__ == "__main__":
+    test_vectorized_basic()
+    test_constant_broadcast()
+    test_invalid_points_are_nan()
+    test_no_builtins()
+    test_cache_hits_and_normalization()
+    test_cache_eviction()
+    test_cache_sympy_expression()
+    test_fused_shared_subexpression()
+    test_fused_keeps_numpy_semantics()
+    test_whitelist_accepts_valid()
+    test_sympy_names()
+    print("Все тесты вычислительного ядра пройдены!")
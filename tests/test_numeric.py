@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from expression_module import compile_expression
+from numeric_module import (INTEGRAL_TOLERANCE, adaptive_integral, brent, find_extremums,
+                            find_roots, minimize_bounded, parity_candidates)
+
+def test_brent_transcendental():
+    """Тест метода Брента: корень cos(x) = x с заданной точностью"""
+    calls = []
+    def func(t):
+        calls.append(t)
+        return np.cos(t) - t
+    root = brent(func, 0.0, 1.0, xtol=1e-12)
+    assert abs(root - 0.7390851332151607) < 1e-11
+    assert len(calls) < 20
+    print("test_brent_transcendental пройден")
+
+def test_brent_requires_sign_change():
+    """Тест: без смены знака на концах отрезка - ошибка"""
+    try:
+        brent(lambda t: t * t + 1, -1.0, 1.0)
+        assert False, "Ожидалась ошибка"
+    except ValueError:
+        pass
+    print("test_brent_requires_sign_change пройден")
+
+def test_find_roots_on_interval():
+    """Тест поиска всех корней на отрезке"""
+    roots = find_roots(compile_expression("sin(x) + x/5"), -10, 10)
+    assert len(roots) == 5
+    assert np.allclose(roots[2], 0.0) and np.allclose(roots[3], 4.104619851, atol=1e-8)
+    assert np.allclose(find_roots(compile_expression("x**3 - 2"), 0, 5), [2 ** (1 / 3)])
+    print("test_find_roots_on_interval пройден")
+
+def test_find_roots_skips_poles():
+    """Тест: смена знака через полюс корнем не считается"""
+    assert find_roots(compile_expression("1/x"), -1, 1) == []
+    roots = find_roots(compile_expression("tan(x)"), -2, 2)
+    assert np.allclose(roots, [0.0])
+    print("test_find_roots_skips_poles пройден")
+
+def test_minimize_bounded():
+    """Тест ограниченной минимизации Брента"""
+    x, fx = minimize_bounded(lambda t: (t - 1.3) ** 2 + 2, 0.0, 3.0, xtol=1e-10)
+    assert abs(x - 1.3) < 1e-6 and abs(fx - 2) < 1e-12
+    # Минимум на границе отрезка
+    x, _ = minimize_bounded(lambda t: t, 0.0, 1.0)
+    assert x < 1e-6
+    print("test_minimize_bounded пройден")
+
+def test_find_extremums_on_interval():
+    """Тест поиска локальных экстремумов и экстремумов на концах отрезка"""
+    extremums = find_extremums(compile_expression("x**3 - 3*x"), -3, 3)
+    assert [(is_max, on_boundary) for _, _, is_max, on_boundary in extremums] == \
+        [(False, True), (True, False), (False, False), (True, True)]
+    assert np.allclose([x for x, _, _, _ in extremums], [-3, -1, 1, 3], atol=1e-6)
+    assert np.allclose([y for _, y, _, _ in extremums], [-18, 2, -2, 18])
+    # Критические точки без решения в радикалах: sin(x) = x/5
+    extremums = find_extremums(compile_expression("cos(x) + x**2/10"), -5, 5)
+    inner = [x for x, _, _, on_boundary in extremums if not on_boundary]
+    assert np.allclose(inner, [-2.5957390, 0.0, 2.5957390], atol=1e-6)
+    print("test_find_extremums_on_interval пройден")
+
+def test_find_extremums_skips_poles():
+    """Тест: скачок через полюс и ступенька экстремумами не считаются"""
+    assert find_extremums(compile_expression("tan(x)"), -3, 3)[1:-1] == []
+    assert [on_boundary for _, _, _, on_boundary in find_extremums(compile_expression("1/x"), -1, 1)] == [True, True]
+    assert find_extremums(compile_expression("floor(x)"), -2.5, 2.5) == []
+    print("test_find_extremums_skips_poles пройден")
+
+def test_adaptive_integral():
+    """Тест квадратуры Гаусса-Кронрода: значение и оценка погрешности"""
+    value, error = adaptive_integral(compile_expression("x**2"), -5, 5)
+    assert abs(value - 250 / 3) < 1e-10 and error < 1e-9
+    value, error = adaptive_integral(compile_expression("exp(-x**2)"), -10, 10)
+    assert abs(value - np.sqrt(np.pi)) < 1e-12
+    # Обратный порядок пределов меняет знак
+    assert np.isclose(adaptive_integral(compile_expression("x**2"), 5, -5)[0], -250 / 3)
+    print("test_adaptive_integral пройден")
+
+def test_adaptive_integral_singularities():
+    """Тест: интегрируемые особенности на концах, расходимость и неопределённость"""
+    value, error = adaptive_integral(compile_expression("1/sqrt(x)"), 0, 1)
+    assert abs(value - 2) < 1e-10 and error < 1e-9
+    value, _ = adaptive_integral(compile_expression("1/sqrt(1 - x**2)"), -1, 1)
+    assert abs(value - np.pi) < 1e-10
+    assert abs(adaptive_integral(compile_expression("log(x)"), 0, 1)[0] + 1) < 1e-10
+    # Расходящийся интеграл: требуемая точность не достигается
+    value, error = adaptive_integral(compile_expression("1/x"), 0, 1)
+    assert error > INTEGRAL_TOLERANCE * abs(value)
+    try:
+        adaptive_integral(compile_expression("log(x)"), -1, 1)
+        assert False, "Ожидалась ошибка"
+    except ValueError:
+        pass
+    print("test_adaptive_integral_singularities пройден")
+
+def test_adaptive_integral_hard_cases():
+    """Тест: полюса внутри отрезка, узкий пик, сильная особенность на конце, устранимая точка"""
+    def converged(value, error):
+        return error <= INTEGRAL_TOLERANCE * max(1.0, abs(value))
+
+    # Полюса tan внутри отрезка: интеграл расходится и с разбиением, и без него
+    kernel = compile_expression("tan(x)")
+    assert not converged(*adaptive_integral(kernel, -5, 5))
+    poles = np.pi / 2 * np.array([-3, -1, 1, 3])
+    assert not converged(*adaptive_integral(kernel, -5, 5, points=poles))
+    # Пик шириной в тысячную долю отрезка не теряется при делении
+    value, error = adaptive_integral(compile_expression("exp(-x**2)"), -1000, 1000)
+    assert abs(value - np.sqrt(np.pi)) < 1e-9 and converged(value, error)
+    value, error = adaptive_integral(compile_expression("x**-0.9"), 0, 1)
+    assert abs(value - 10) < 1e-8 and converged(value, error)
+    # Центральный узел попадает ровно в x = 0
+    value, error = adaptive_integral(compile_expression("sin(x)/x"), -10, 10)
+    assert abs(value - 3.3166951884377) < 1e-10 and converged(value, error)
+    # Излом в известной точке
+    value, error = adaptive_integral(compile_expression("sqrt(abs(x))"), -1, 1, points=[0.0])
+    assert abs(value - 4 / 3) < 1e-12 and converged(value, error)
+    print("test_adaptive_integral_hard_cases пройден")
+
+def test_parity_candidates():
+    """Тест численной проверки чётности"""
+    assert parity_candidates(compile_expression("x**2 + cos(x)")) == {'even'}
+    assert parity_candidates(compile_expression("x - sin(x)")) == {'odd'}
+    assert parity_candidates(compile_expression("x**2 + 1e-9*x")) == set()
+    # Несимметричная область определения
+    assert parity_candidates(compile_expression("log(x)")) == set()
+    assert parity_candidates(compile_expression("0")) == {'even', 'odd'}
+    print("test_parity_candidates пройден")
+
+if __name__ == "__main__":
+    test_brent_transcendental()
+    test_brent_requires_sign_change()
+    test_find_roots_on_interval()
+    test_find_roots_skips_poles()
+    test_minimize_bounded()
+    test_find_extremums_on_interval()
+    test_find_extremums_skips_poles()
+    test_adaptive_integral()
+    test_adaptive_integral_singularities()
+    test_adaptive_integral_hard_cases()
+    test_parity_candidates()
+    print("Все тесты численных методов пройдены!")
@@ -0,0 +1,91 @@
+import sys
+import io
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from plot_layer import PlotLayer
+
+def _make_layer():
+    figure = Figure()
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    return PlotLayer(ax, canvas), ax
+
+def test_line_reused_between_updates():
+    """Тест: при новой выборке линия обновляется, а не создаётся заново"""
+    layer, ax = _make_layer()
+    info = {'expression': 'x', 'color': 'blue', 'style': 'Сплошная', 'alpha': 1.0}
+    x = np.linspace(0, 1, 5)
+    layer.set_data(info, x, x, 'view1', 'blue', '-', 1.0)
+    line = ax.lines[0]
+    assert not layer.needs_data(info, 'view1')
+    assert layer.needs_data(info, 'view2')
+
+    layer.set_data(info, x, 2 * x, 'view2', 'blue', '-', 1.0)
+    assert len(ax.lines) == 1
+    assert ax.lines[0] is line
+    assert np.allclose(line.get_ydata(), 2 * x)
+    print("test_line_reused_between_updates пройден")
+
+def test_restyle_and_legend():
+    """Тест: смена стиля меняет свойства линии и пересоздаёт легенду"""
+    layer, ax = _make_layer()
+    info = {'expression': 'x**2'}
+    x = np.linspace(0, 1, 5)
+    layer.set_data(info, x, x ** 2, 'view', 'blue', '-', 1.0)
+    layer.update_legend([info])
+    legend = ax.get_legend()
+    assert len(legend.get_texts()) == 1
+
+    layer.restyle(info, 'red', '--', 0.5)
+    layer.update_legend([info])
+    assert ax.lines[0].get_color() == 'red'
+    assert ax.lines[0].get_alpha() == 0.5
+    assert ax.get_legend() is not legend
+    print("test_restyle_and_legend пройден")
+
+def test_keep_only_and_draw():
+    """Тест: линии удалённых функций убираются, отрисовка работает с блиттингом"""
+    layer, ax = _make_layer()
+    first, second = {'expression': 'x'}, {'expression': '-x'}
+    x = np.linspace(0, 1, 5)
+    layer.set_data(first, x, x, 'view', 'blue', '-', 1.0)
+    layer.set_data(second, x, -x, 'view', 'red', '-', 1.0)
+    assert layer.set_limits(0, 1, -1, 1)
+    assert not layer.set_limits(0, 1, -1, 1)
+    layer.draw(full=True)
+
+    layer.keep_only([second])
+    layer.update_legend([second])
+    layer.draw()
+    assert len(ax.lines) == 1
+    assert ax.lines[0].get_label() == '-x'
+    print("test_keep_only_and_draw пройден")
+
+def test_savefig_draws_once():
+    """Тест: при экспорте кривые и легенда рисуются один раз, фон экрана не меняется"""
+    layer, ax = _make_layer()
+    info = {'expression': 'x'}
+    x = np.linspace(0, 1, 5)
+    layer.set_data(info, x, x, 'view', 'blue', '-', 1.0)
+    layer.update_legend([info])
+    layer.draw(full=True)
+    background = layer._background
+
+    drawn = []
+    draw_artist = ax.draw_artist
+    ax.draw_artist = lambda artist: (drawn.append(type(artist).__name__), draw_artist(artist))
+    ax.figure.savefig(io.BytesIO(), format='png', dpi=200)
+    assert drawn == []
+    assert layer._background is background
+    print("test_savefig_draws_once пройден")
+
+if __name__ == "__main__":
+    test_line_reused_between_updates()
+    test_restyle_and_legend()
+    test_keep_only_and_draw()
+    test_savefig_draws_once()
+    print("Все тесты слоя графиков пройдены!")
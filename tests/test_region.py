@@ -0,0 +1,157 @@
+import sys
+import os
+import warnings
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from src.region_module import (parse_inequality, inequality_cells, rects_to_polygons,
+                               parse_implicit, implicit_segments, ContourCache,
+                               validate_plot_input, probe_plot_input, probe_plot_inputs,
+                               area_polygons)
+
+def _length(segments):
+    return np.sum(np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1))
+
+def test_parse_inequality():
+    """Тест разбора неравенств и обычных функций"""
+    inequality = parse_inequality("y > x**2")
+    assert inequality is not None
+    assert inequality.sense == 1 and inequality.strict
+    assert parse_inequality("sin(x) <= 0.5").sense == -1
+    assert parse_inequality("x**2") is None
+    assert parse_inequality("0 < y < 1") is None
+    print("test_parse_inequality пройден")
+
+def test_region_area():
+    """Тест площади области решений: парабола и круг"""
+    rects = inequality_cells(parse_inequality("y > x**2"), -10, 10, -10, 10, 800, 600)
+    area = np.sum(rects[:, 2] * rects[:, 3])
+    assert abs(area - 40 * np.sqrt(10) / 3) < 0.5
+
+    rects = inequality_cells(parse_inequality("x**2 + y**2 <= 25"), -10, 10, -10, 10, 800, 600)
+    area = np.sum(rects[:, 2] * rects[:, 3])
+    assert abs(area - 25 * np.pi) < 0.5
+    print("test_region_area пройден")
+
+def test_refinement_only_on_boundary():
+    """Тест квадродерева: клеток гораздо меньше, чем пикселей"""
+    rects = inequality_cells(parse_inequality("y > x"), -10, 10, -10, 10, 800, 600)
+    assert len(rects) < 800 * 600 / 50
+    print("test_refinement_only_on_boundary пройден")
+
+def test_thin_regions():
+    """Тест: узкие и периодические полосы уже клетки начальной сетки не теряются"""
+    rects = inequality_cells(parse_inequality("sin(10*x) > 0.9"), -10, 10, -10, 10, 800, 600)
+    area = np.sum(rects[:, 2] * rects[:, 3])
+    assert abs(area - 57.7) < 1.0
+
+    rects = inequality_cells(parse_inequality("abs(y - x**2) < 0.05"), -10, 10, -10, 10, 800, 600)
+    area = np.sum(rects[:, 2] * rects[:, 3])
+    assert abs(area - 0.632) < 0.02
+    print("test_thin_regions пройден")
+
+def test_polygons_shape():
+    """Тест перевода прямоугольников в вершины"""
+    polygons = rects_to_polygons(np.array([[0.0, 0.0, 1.0, 2.0]]))
+    assert polygons.shape == (1, 4, 2)
+    assert np.allclose(polygons[0, 2], [1.0, 2.0])
+    print("test_polygons_shape пройден")
+
+def test_area_polygons():
+    """Тест заливки под графиком: разрыв там, где функция не определена"""
+    x = np.linspace(-1.0, 1.0, 5)
+    polygons = area_polygons(x, np.array([1.0, 2.0, np.nan, 3.0, 4.0]))
+    assert len(polygons) == 2
+    assert np.allclose(polygons[1], [[0.5, 0.0], [0.5, 3.0], [1.0, 4.0], [1.0, 0.0]])
+    assert area_polygons(x, np.full(5, np.nan)) == []
+    print("test_area_polygons пройден")
+
+def test_parse_implicit():
+    """Тест разбора уравнений от x и y"""
+    assert parse_implicit("x**2 + y**2 = 25") is not None
+    assert parse_implicit("y == sin(x)") is not None
+    assert parse_implicit("y >= x") is None
+    assert parse_implicit("x**2") is None
+    print("test_parse_implicit пройден")
+
+def test_implicit_circle():
+    """Тест длины окружности x**2 + y**2 = 25"""
+    segments = implicit_segments(parse_implicit("x**2 + y**2 = 25"), -10, 10, -10, 10, 800, 600)
+    assert abs(_length(segments) - 2 * np.pi * 5) < 0.1
+    radius = np.linalg.norm(segments.mean(axis=1), axis=1)
+    assert np.max(np.abs(radius - 5)) < 0.05
+    print("test_implicit_circle пройден")
+
+def test_implicit_pole_filtered():
+    """Тест: у y = 1/x нет ложного отрезка через полюс x = 0"""
+    segments = implicit_segments(parse_implicit("y = 1/x"), -10, 10, -10, 10, 800, 600)
+    x_mid = segments.mean(axis=1)[:, 0]
+    assert len(segments) > 0
+    assert np.all(np.abs(x_mid) > 0.05)
+    print("test_implicit_pole_filtered пройден")
+
+def test_implicit_no_warnings():
+    """Тест: рёбра без смены знака не дают предупреждений numpy"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        segments = implicit_segments(parse_implicit("sin(10*x) = 0.95"), -10, 10, -10, 10, 800, 600)
+    assert len(segments) > 0
+    print("test_implicit_no_warnings пройден")
+
+def test_contour_cache_on_pan():
+    """Тест: при сдвиге вида уже обработанные клетки берутся из кэша"""
+    curve = parse_implicit("x**2 + y**2 = 25")
+    cache = ContourCache()
+    first = implicit_segments(curve, -10, 10, -10, 10, 800, 600, cache=cache)
+    misses = cache.stats()['misses']
+    again = implicit_segments(curve, -10, 10, -10, 10, 800, 600, cache=cache)
+    assert cache.stats()['misses'] == misses
+    assert len(again) == len(first)
+    implicit_segments(curve, -9.5, 10.5, -10, 10, 800, 600, cache=cache)
+    assert cache.stats()['misses'] - misses < misses / 4
+    print("test_contour_cache_on_pan пройден")
+
+def test_validate_plot_input():
+    """Тест проверки строк графика: функции, неравенства и уравнения"""
+    for text in ["5", "sin(x) + e", "y > x**2", "x**2 + y**2 = 25"]:
+        validate_plot_input(text)
+    for text in ["x + y", "sin(x", "y > file(x)", "x = __import__('os')"]:
+        try:
+            validate_plot_input(text)
+            assert False, f"Ожидалась ошибка для {text}"
+        except ValueError:
+            pass
+    print("test_validate_plot_input пройден")
+
+def test_probe_evaluation_errors():
+    """Тест пробного вычисления: ошибки вычисления выбрасываются как ValueError"""
+    # sqrt(-1 - x**2) не определена нигде: графика бы не было
+    for text in ["abs()", "x + 10**400", "sqrt(-1 - x**2)"]:
+        validate_plot_input(text)  # Разбор по белому списку проходит
+        try:
+            probe_plot_input(text, -10, 10, -10, 10)
+            assert False, f"Ожидалась ошибка для {text}"
+        except ValueError:
+            pass
+    probe_plot_input("sin(x)/x", -10, 10, -10, 10)
+    probe_plot_input("y > sqrt(x)", -10, 10, -10, 10)
+
+    errors = probe_plot_inputs(["x**2", "sqrt(-1 - x**2)", "abs()"], -10, 10, -10, 10)
+    assert errors[0] is None and "не определено" in errors[1] and errors[2] is not None
+    print("test_probe_evaluation_errors пройден")
+
+if __name__ == "__main__":
+    test_parse_inequality()
+    test_region_area()
+    test_refinement_only_on_boundary()
+    test_thin_regions()
+    test_polygons_shape()
+    test_area_polygons()
+    test_parse_implicit()
+    test_implicit_circle()
+    test_implicit_pole_filtered()
+    test_implicit_no_warnings()
+    test_contour_cache_on_pan()
+    test_validate_plot_input()
+    test_probe_evaluation_errors()
+    print("Все тесты областей и неявных кривых пройдены!")
@@ -0,0 +1,186 @@
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from expression_module import compile_expression, fuse_expressions
+from sampling_module import TileCache, ParallelEvaluator, adaptive_sample, stream_sample, \
+    stream_sample_many
+
+def test_budget_respected():
+    """Тест бюджета: число вычислений не превышает max_points"""
+    calls = []
+
+    def func(x):
+        calls.append(len(x))
+        return np.sin(50 * x)
+
+    adaptive_sample(func, -10, 10, -10, 10, max_points=500)
+    assert sum(calls) <= 500
+    print("test_budget_respected пройден")
+
+def test_straight_line_is_cheap():
+    """Тест прямой: уточнение не требуется, остаётся начальная сетка"""
+    x, y = adaptive_sample(compile_expression("2*x + 1"), -10, 10, -10, 10, max_points=1000)
+    assert len(x) < 1000
+    assert np.allclose(y, 2 * x + 1)
+    print("test_straight_line_is_cheap пройден")
+
+def test_dense_near_pole():
+    """Тест асимптоты: точки сгущаются у полюса, линия разрывается"""
+    x, y = adaptive_sample(compile_expression("1/(x-2)"), -10, 10, -10, 10, max_points=1000)
+    assert np.min(np.abs(x - 2)) < 1e-3
+    gap = np.flatnonzero(np.isnan(y))
+    assert len(gap) == 1
+    assert abs(x[gap[0]] - 2) < 1e-3
+    print("test_dense_near_pole пройден")
+
+def test_sorted_output():
+    """Тест порядка: x возрастает после всех вставок"""
+    x, _ = adaptive_sample(compile_expression("tan(x)"), -10, 10, -10, 10, max_points=1000)
+    assert np.all(np.diff(x) > 0)
+    print("test_sorted_output пройден")
+
+def test_tile_cache_pan():
+    """Тест кэша тайлов: при сдвиге вычисляются только новые тайлы"""
+    cache = TileCache()
+    evaluated = []
+
+    def func(x):
+        evaluated.append(len(x))
+        return x ** 2
+
+    x, y = cache.sample("x**2", func, -10, 10, 1000)
+    assert x[0] == -10 and x[-1] == 10
+    assert np.allclose(y, x ** 2)
+    first_misses = cache.stats()['misses']
+
+    evaluated.clear()
+    cache.sample("x**2", func, -9, 11, 1000)
+    assert cache.stats()['misses'] - first_misses <= 1
+    assert cache.stats()['hits'] > 0
+    print("test_tile_cache_pan пройден")
+
+def test_tile_cache_nearest_level():
+    """Тест масштабирования: переиспользуется только не более грубый уровень"""
+    cache = TileCache()
+    cache.sample("sin(x)", np.sin, -10, 10, 1000)
+    misses = cache.stats()['misses']
+
+    # Более редкая сетка: берутся уже вычисленные более мелкие тайлы
+    x, _ = cache.sample("sin(x)", np.sin, -9, 9, 500)
+    assert cache.stats()['misses'] == misses
+    assert len(x) >= 500
+
+    # Приближение: грубые тайлы не подходят, плотность не ниже запрошенной
+    x, y = cache.sample("sin(x)", np.sin, -5, 5, 1000)
+    assert cache.stats()['misses'] > misses
+    assert len(x) >= 1000
+    assert np.max(np.diff(x)) <= 10 / 999
+    assert np.allclose(y, np.sin(x))
+    print("test_tile_cache_nearest_level пройден")
+
+def test_tile_cache_eviction():
+    """Тест ограничения памяти: старые тайлы вытесняются"""
+    cache = TileCache(max_samples=2048)
+    for shift in range(0, 200, 20):
+        cache.sample("x", lambda x: x, shift, shift + 10, 1000)
+    assert cache.stats()['samples'] <= 2048
+    assert cache.stats()['evictions'] > 0
+    print("test_tile_cache_eviction пройден")
+
+def test_parallel_order_and_errors():
+    """Тест пула: порядок результатов сохраняется, ошибки не прерывают остальные"""
+    evaluator = ParallelEvaluator(max_workers=4)
+    x = np.linspace(-1, 1, 10000)
+    expressions = ["sin(x)", "undefined_name(x)", "x**2", "exp(x)"]
+    results = evaluator.map(lambda expr: compile_expression(expr)(x), expressions)
+    evaluator.shutdown()
+
+    assert np.allclose(results[0][0], np.sin(x))
+    assert isinstance(results[1][1], ValueError)
+    assert np.allclose(results[2][0], x ** 2)
+    assert np.allclose(results[3][0], np.exp(x))
+    print("test_parallel_order_and_errors пройден")
+
+def test_set_workers_during_map():
+    """Тест смены числа потоков из другого потока во время вычислений"""
+    evaluator = ParallelEvaluator(max_workers=2)
+    stop = threading.Event()
+
+    def resize():
+        count = 1
+        while not stop.is_set():
+            evaluator.set_workers(count % 4 + 1)
+            count += 1
+
+    thread = threading.Thread(target=resize)
+    thread.start()
+    try:
+        for _ in range(200):
+            results = evaluator.map(lambda value: value * 2, range(64))
+            assert [result for result, _ in results] == [value * 2 for value in range(64)]
+            assert all(error is None for _, error in results)
+    finally:
+        stop.set()
+        thread.join()
+        evaluator.shutdown()
+    print("test_set_workers_during_map пройден")
+
+def test_stream_envelope_matches_full_grid():
+    """Тест потоковой выборки: минимум и максимум по столбцам как у полной сетки"""
+    kernel = compile_expression("sin(40*x) * x")
+    x = np.linspace(-10, 10, 200000)
+    y = kernel(x)
+    xs, ys = stream_sample(kernel, -10, 10, 200000, columns=100, chunk_size=4096)
+
+    assert len(xs) <= 5 * 100
+    columns = np.minimum(((x + 10) / 20 * 100).astype(int), 99)
+    out_columns = np.minimum(((xs + 10) / 20 * 100).astype(int), 99)
+    for column in range(100):
+        assert np.nanmin(ys[out_columns == column]) == y[columns == column].min()
+        assert np.nanmax(ys[out_columns == column]) == y[columns == column].max()
+    print("test_stream_envelope_matches_full_grid пройден")
+
+def test_stream_keeps_gaps():
+    """Тест потоковой выборки: неопределённые точки разрывают линию"""
+    xs, ys = stream_sample(compile_expression("log(x)"), -1, 1, 100001, columns=10)
+    assert np.isnan(ys).any()
+    assert np.all(np.isnan(ys[xs < -0.2]))
+    print("test_stream_keeps_gaps пройден")
+
+def test_shared_grid_matches_single():
+    """Тест общей сетки нескольких функций: совпадает с отдельным вычислением"""
+    texts = ["sin(x)", "sin(x)**2 + 1/x"]
+    kernel = fuse_expressions(texts)
+
+    cache = TileCache()
+    shared = cache.sample_many(texts, kernel, -3.0, 7.0, 500)
+    for text, (x, y) in zip(texts, shared):
+        x_single, y_single = TileCache().sample(text, compile_expression(text), -3.0, 7.0, 500)
+        assert np.array_equal(x, x_single)
+        assert np.allclose(y, y_single, equal_nan=True)
+
+    streamed = stream_sample_many(kernel, 2, -3.0, 7.0, 200_000, columns=100, chunk_size=4096)
+    for text, (x, y) in zip(texts, streamed):
+        x_single, y_single = stream_sample(compile_expression(text), -3.0, 7.0, 200_000,
+                                           columns=100, chunk_size=4096)
+        assert np.array_equal(x, x_single)
+        assert np.allclose(y, y_single, equal_nan=True)
+    print("test_shared_grid_matches_single пройден")
+
+if __name__ == "__main__":
+    test_budget_respected()
+    test_straight_line_is_cheap()
+    test_dense_near_pole()
+    test_sorted_output()
+    test_tile_cache_pan()
+    test_tile_cache_nearest_level()
+    test_tile_cache_eviction()
+    test_parallel_order_and_errors()
+    test_set_workers_during_map()
+    test_stream_envelope_matches_full_grid()
+    test_stream_keeps_gaps()
+    test_shared_grid_matches_single()
+    print("Все тесты адаптивной выборки пройдены!")
@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from src.sandbox_module import Sandbox, SandboxPool, SandboxTimeout, SandboxMemoryError
+from src.region_module import probe_plot_input
+
+def _hog_memory(chunk_mb, chunks):
+    """Постепенно занимает память (для проверки лимита)"""
+    blocks = []
+    for _ in range(chunks):
+        blocks.append(np.ones(chunk_mb * 2 ** 20 // 8))
+        time.sleep(0.01)
+    return len(blocks)
+
+def test_sandbox_result_and_errors():
+    """Тест: результат и исключения функции передаются из процесса"""
+    sandbox = Sandbox(timeout=5.0)
+    try:
+        assert sandbox.run(pow, 2, 10) == 1024
+        try:
+            sandbox.run(int, "не число")
+            assert False, "Ожидалась ошибка"
+        except ValueError:
+            pass
+        probe_result = sandbox.run(probe_plot_input, "sin(x)", -10, 10, -10, 10)
+        assert probe_result is None
+        assert sandbox.killed == 0
+    finally:
+        sandbox.shutdown()
+    print("test_sandbox_result_and_errors пройден")
+
+def test_sandbox_timeout_kills_and_restarts():
+    """Тест: зависшее вычисление прерывается, процесс перезапускается"""
+    sandbox = Sandbox(timeout=1.0)
+    try:
+        start = time.monotonic()
+        try:
+            sandbox.run(probe_plot_input, "10**10**10", -10, 10, -10, 10)
+            assert False, "Ожидалось превышение времени"
+        except SandboxTimeout:
+            pass
+        assert time.monotonic() - start < 5.0
+        assert sandbox.killed == 1
+        assert sandbox.run(pow, 3, 2) == 9
+    finally:
+        sandbox.shutdown()
+    print("test_sandbox_timeout_kills_and_restarts пройден")
+
+def test_sandbox_memory_limit():
+    """Тест: процесс, превысивший лимит памяти, завершается"""
+    sandbox = Sandbox(timeout=10.0, memory_mb=300)
+    try:
+        try:
+            sandbox.run(_hog_memory, 20, 100)
+            assert False, "Ожидалось превышение памяти"
+        except SandboxMemoryError:
+            pass
+        assert sandbox.killed == 1
+    finally:
+        sandbox.shutdown()
+    print("test_sandbox_memory_limit пройден")
+
+def test_pool_timeout_does_not_block_others():
+    """Тест пула: зависшее задание прерывается, остальные выполняются"""
+    pool = SandboxPool(size=2, timeout=1.0)
+    try:
+        slow = pool.submit(probe_plot_input, "10**10**10", -10, 10, -10, 10)
+        fast = [pool.submit(pow, 2, n) for n in range(5)]
+        assert [future.result(timeout=30) for future in fast] == [1, 2, 4, 8, 16]
+        try:
+            slow.result(timeout=30)
+            assert False, "Ожидалось превышение времени"
+        except SandboxTimeout:
+            pass
+        assert pool.killed == 1
+    finally:
+        pool.shutdown()
+    print("test_pool_timeout_does_not_block_others пройден")
+
+if __name__ == "__main__":
+    test_sandbox_result_and_errors()
+    test_sandbox_timeout_kills_and_restarts()
+    test_sandbox_memory_limit()
+    test_pool_timeout_does_not_block_others()
+    print("Все тесты изолированных вычислений пройдены!")
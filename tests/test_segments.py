@@ -3,78 +3,77 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 import numpy as np
+from expression_module import compile_expression
+from sampling_module import _break_jumps, adaptive_sample, insert_singularities
 
-# Имитируем метод из mpl_widget.py
-def _split_into_segments(x_vals, y_vals):
-    """Разбивает данные на непрерывные сегменты, разделяя в точках разрыва"""
-    segments = []
-    current_segment_x = []
-    current_segment_y = []
-    
-    for i in range(len(x_vals)):
-        if not np.isnan(y_vals[i]):
-            current_segment_x.append(x_vals[i])
-            current_segment_y.append(y_vals[i])
-        else:
-            if current_segment_x:
-                segments.append((current_segment_x, current_segment_y))
-                current_segment_x = []
-                current_segment_y = []
-    
-    if current_segment_x:
-        segments.append((current_segment_x, current_segment_y))
-        
-    return segments
+def _segments(x_vals, y_vals):
+    """Непрерывные участки линии: так matplotlib рисует линию с NaN"""
+    valid = np.concatenate(([False], ~np.isnan(y_vals), [False]))
+    edges = np.flatnonzero(np.diff(valid.astype(np.int8)))
+    return [(x_vals[start:stop], y_vals[start:stop]) for start, stop in zip(edges[::2], edges[1::2])]
 
 def test_split_continuous():
-    """Тест для непрерывной функции"""
-    x = [0, 1, 2, 3, 4]
-    y = [0, 1, 4, 9, 16]  # x**2
-    
-    segments = _split_into_segments(x, y)
-    
+    """Тест для непрерывной функции: линия без разрывов"""
+    x, y = adaptive_sample(compile_expression("x**2"), -3, 3, 0, 9, max_points=500)
+
+    segments = _segments(x, y)
+
     assert len(segments) == 1
-    assert segments[0][0] == x
-    assert segments[0][1] == y
+    assert segments[0][0][0] == -3 and segments[0][0][-1] == 3
     print("test_split_continuous пройден")
 
-def test_split_with_gap():
-    """Тест для функции с разрывом"""
-    x = [0, 1, 2, 3, 4]
-    y = [0, 1, np.nan, 9, 16]  # Разрыв в x=2
-    
-    segments = _split_into_segments(x, y)
-    
+def test_split_at_pole():
+    """Тест для функции с полюсом: разрыв ровно между ветвями"""
+    x, y = adaptive_sample(compile_expression("1/x"), -1, 1, -10, 10, max_points=1000)
+
+    segments = _segments(x, y)
+
     assert len(segments) == 2
-    assert segments[0][0] == [0, 1]  # Первый сегмент
-    assert segments[0][1] == [0, 1]
-    assert segments[1][0] == [3, 4]  # Второй сегмент
-    assert segments[1][1] == [9, 16]
-    print("test_split_with_gap пройден")
+    (left_x, left_y), (right_x, right_y) = segments
+    assert np.all(left_x < 0) and np.all(left_y < 0)
+    assert np.all(right_x > 0) and np.all(right_y > 0)
+    print("test_split_at_pole пройден")
+
+def test_break_jumps():
+    """Тест разрыва только на неразрешённых скачках через весь экран"""
+    x = np.array([0.0, 1.0, 2.0, 3.0])
+    y = np.array([0.0, 1.0, 100.0, 101.0])
+
+    # Интервал не уже 2*min_dx: скачок разрешён выборкой, линия не рвётся
+    x_new, y_new = _break_jumps(x, y, 0.0, 1.0, 10.0, min_dx=0.1)
+    assert np.array_equal(x_new, x) and not np.isnan(y_new).any()
+
+    # Скачок на предельно узком интервале - разрыв посередине
+    x_new, y_new = _break_jumps(x, y, 0.0, 1.0, 10.0, min_dx=0.5)
+    assert np.array_equal(x_new, [0.0, 1.0, 1.5, 2.0, 3.0])
+    assert [len(part) for part, _ in _segments(x_new, y_new)] == [2, 2]
+    print("test_break_jumps пройден")
 
 def test_split_multiple_gaps():
-    """Тест для функции с несколькими разрывами"""
-    x = [0, 1, 2, 3, 4, 5, 6]
-    y = [0, 1, np.nan, 3, np.nan, 5, 6]  # Разрывы в x=2 и x=4
-    
-    segments = _split_into_segments(x, y)
-    
+    """Тест для функции с несколькими полюсами, вставленными из индекса"""
+    kernel = compile_expression("tan(x)")
+    x = np.linspace(-4, 4, 400)
+    x, y = insert_singularities(kernel, x, kernel(x), poles=[-np.pi / 2, np.pi / 2])
+
+    segments = _segments(x, y)
+
     assert len(segments) == 3
+    assert segments[0][0][-1] < -np.pi / 2 < segments[1][0][0]
+    assert segments[1][0][-1] < np.pi / 2 < segments[2][0][0]
     print("test_split_multiple_gaps пройден")
 
 def test_split_all_nan():
-    """Тест для функции, которая везде NaN"""
-    x = [0, 1, 2, 3]
-    y = [np.nan, np.nan, np.nan, np.nan]
-    
-    segments = _split_into_segments(x, y)
-    
-    assert len(segments) == 0
+    """Тест для функции, которая нигде не определена на отрезке"""
+    x, y = adaptive_sample(compile_expression("log(x)"), -3, -1, -10, 10, max_points=200)
+
+    assert np.isnan(y).all()
+    assert len(_segments(x, y)) == 0
     print("test_split_all_nan пройден")
 
 if __name__ == "__main__":
     test_split_continuous()
-    test_split_with_gap()
+    test_split_at_pole()
+    test_break_jumps()
     test_split_multiple_gaps()
     test_split_all_nan()
-    print("Все тесты сегментации пройдены!")
\ No newline at end of file
+    print("Все тесты сегментации пройдены!")
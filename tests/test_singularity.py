@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import sympy as sp
+from src.expression_module import compile_expression
+from src.sampling_module import insert_singularities
+from src.singularity_module import BOUNDARY, POLE, index_for_text
+
+def test_poles_and_boundaries():
+    """Тест полюсов и границ области определения"""
+    index = index_for_text("1/(x**2 - 1)")
+    assert index.poles() == [-1, 1] and index.boundaries() == []
+
+    index = index_for_text("log(x) + sqrt(x + 2)")
+    assert index.boundaries() == [-2, 0]
+    assert index.points[sp.Integer(0)] == (0.0, BOUNDARY)
+
+    # Полюс важнее границы в той же точке
+    assert index_for_text("log(x)/x").points[sp.Integer(0)][1] == POLE
+
+    # Десятичная дробная степень - граница, целая - нет
+    index = index_for_text("x**0.5 + (x - 1)**-1.5")
+    assert index.boundaries() == [0] and index.poles() == [1] and index.complete
+    assert not index_for_text("x**2.0").points
+
+    index = index_for_text("arcsin(x/2)")
+    assert index.boundaries() == [-2, 2] and index.complete
+    assert not index_for_text("x**2").points
+    print("test_poles_and_boundaries пройден")
+
+def test_periodic_families():
+    """Тест периодических серий полюсов tan и 1/sin"""
+    index = index_for_text("tan(x)")
+    assert [family[:3] for family in index.families] == [(sp.pi / 2, sp.pi, POLE)]
+    assert np.allclose(index.points_in(-4, 4), [-np.pi / 2, np.pi / 2])
+
+    index = index_for_text("1/sin(2*x)")
+    assert np.allclose(index.points_in(0, 3), [0, np.pi / 2])
+    # Слишком частые полюса не разворачиваются в точки
+    assert index.points_in(-1e6, 1e6, limit=1000) is None
+    print("test_periodic_families пройден")
+
+def test_incomplete_index():
+    """Тест неполного индекса и выражений, для которых он не строится"""
+    assert not index_for_text("x**x").complete
+    assert index_for_text("np.clip(x, 0, 1)") is None
+    assert index_for_text("y > x") is None
+    print("test_incomplete_index пройден")
+
+def test_insert_singularities():
+    """Тест вставки особых точек в выборку: разрыв ровно в полюсе"""
+    kernel = compile_expression("sqrt(x + 2)/(x - 1)")
+    x = np.linspace(-3, 3, 8)
+    y = kernel(x)
+    x_new, y_new = insert_singularities(kernel, x, y, poles=[1.0, 5.0], boundaries=[-2.0])
+    assert len(x_new) == len(x) + 2 and np.all(np.diff(x_new) > 0)
+    assert np.isnan(y_new[x_new == 1.0]).all()
+    assert y_new[x_new == -2.0] == 0.0
+
+    # Особая точка в узле сетки заменяет значение узла
+    x_new, y_new = insert_singularities(kernel, x_new, y_new, poles=[1.0])
+    assert len(x_new) == len(x) + 2
+    print("test_insert_singularities пройден")
+
+if __name__ == "__main__":
+    test_poles_and_boundaries()
+    test_periodic_families()
+    test_incomplete_index()
+    test_insert_singularities()
+    print("Все тесты особых точек пройдены!")
@@ -0,0 +1,150 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from PyQt6.QtCore import QCoreApplication
+from src.analysis_module import AnalysisModule
+from src.analysis_worker import AnalysisWorker
+from src.plot_worker import PlotWorker
+from src.redraw_scheduler import RedrawScheduler
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+def _wait_for(condition, timeout=60.0):
+    """Обрабатывает события Qt, пока не выполнится условие"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Сигнал не получен"
+        app.processEvents()
+        time.sleep(0.01)
+
+def test_redraw_coalescing():
+    """Тест объединения серии запросов перерисовки в одну"""
+    calls = []
+    # Большой интервал: кадр выводится только явным flush, таймер не успевает
+    scheduler = RedrawScheduler(lambda: calls.append(1), interval_ms=60_000)
+    for _ in range(5):
+        scheduler.request(1.0)
+    app.processEvents()
+    assert calls == []
+    scheduler.flush()
+    assert calls == [1]
+    assert scheduler.stats() == {'requested': 5, 'rendered': 1, 'dropped': 4}
+    # Счётчики серии выдаются один раз, повторно не сообщаются
+    assert scheduler.take_burst() == {'requested': 5, 'dropped': 4}
+    assert scheduler.take_burst() == {'requested': 0, 'dropped': 0}
+
+    # Без отложенного запроса flush ничего не делает, таймер остановлен
+    scheduler.flush()
+    assert calls == [1] and not scheduler.timer.isActive()
+
+    # Срабатывание таймера выводит кадр так же, как flush
+    scheduler.timer.setInterval(0)
+    scheduler.request()
+    scheduler.request()
+    _wait_for(lambda: len(calls) == 2, timeout=5.0)
+    assert scheduler.stats() == {'requested': 7, 'rendered': 2, 'dropped': 5}
+    # Следующая серия считается отдельно от предыдущей
+    assert scheduler.take_burst() == {'requested': 2, 'dropped': 1}
+
+    # Одиночный запрос без пропусков не даёт отчёта о пропущенных кадрах
+    scheduler.request()
+    _wait_for(lambda: len(calls) == 3, timeout=5.0)
+    assert scheduler.take_burst() == {'requested': 1, 'dropped': 0}
+    print("test_redraw_coalescing пройден")
+
+def test_plot_worker_generations():
+    """Тест отбрасывания устаревших заданий фонового построения"""
+    worker = PlotWorker()
+    finished = []
+    worker.finished.connect(lambda generation, result: finished.append((generation, result)))
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def slow(report, cancelled):
+        started.set()
+        release.wait(5.0)
+        return 'slow'
+
+    def job(name):
+        def run(report, cancelled):
+            ran.append(name)
+            return name
+        return run
+
+    try:
+        first = worker.submit(slow)
+        assert started.wait(5.0)
+        # Пока идёт первое задание, второе становится устаревшим до начала
+        worker.submit(job('skipped'))
+        last = worker.submit(job('last'))
+        release.set()
+        assert worker.wait(5.0) == (last, 'last')
+        _wait_for(lambda: len(finished) == 2, timeout=5.0)
+
+        assert ran == ['last']
+        assert dict(finished) == {first: 'slow', last: 'last'}
+        # Получатель отбрасывает результат прерванного поколения
+        assert not worker.is_current(first) and worker.is_current(last)
+        assert worker.discarded == 1
+    finally:
+        release.set()
+        worker.shutdown()
+    print("test_plot_worker_generations пройден")
+
+def test_section_delivery():
+    """Тест доставки разделов анализа: текущее поколение, повтор из кэша"""
+    worker = AnalysisWorker(AnalysisModule())
+    received = []
+    worker.section_ready.connect(lambda *args: received.append(args))
+    try:
+        first = worker.submit("x**2 - 1", (-2.0, 2.0), keys=['domain', 'intercepts'])
+        # Перезапуск раздела: актуален только новый запуск
+        second = worker.submit("x**2 - 1", (-3.0, 3.0), keys=['intercepts'])
+        _wait_for(lambda: any(g == second for g, *_ in received)
+                  and any(key == 'domain' for _, key, _, _ in received))
+
+        sections = {key: (generation, text, ok) for generation, key, text, ok in received
+                    if worker.is_current(generation, key)}
+        assert set(sections) == {'domain', 'intercepts'}
+        assert sections['domain'][0] == first and sections['intercepts'][0] == second
+        assert all(ok for _, _, ok in sections.values())
+        assert "-1" in sections['intercepts'][1] and "1" in sections['intercepts'][1]
+
+        # Готовый раздел выдаётся сразу, без ожидания пула
+        count = len(received)
+        third = worker.submit("x**2 - 1", (-5.0, 5.0), keys=['domain'])
+        assert len(received) == count + 1 and received[-1][:2] == (third, 'domain')
+        assert received[-1][2] == sections['domain'][1]
+    finally:
+        worker.shutdown()
+    print("test_section_delivery пройден")
+
+def test_singularities_delivery():
+    """Тест индекса особых точек в пуле: сигнал с индексом, повтор из кэша сразу"""
+    worker = AnalysisWorker(AnalysisModule())
+    received = []
+    worker.singularities_ready.connect(lambda text, index: received.append((text, index)))
+    try:
+        worker.submit_singularities("1/(x - 2)")
+        worker.submit_singularities("np.clip(x, 0, 1)")
+        _wait_for(lambda: len(received) == 2)
+        indexes = dict(received)
+        assert indexes["1/(x - 2)"].poles() == [2]
+        assert indexes["np.clip(x, 0, 1)"] is None
+
+        # Повторный запрос не обращается к пулу
+        worker.submit_singularities("1/(x - 2)")
+        assert len(received) == 3 and received[-1][1].poles() == [2]
+    finally:
+        worker.shutdown()
+    print("test_singularities_delivery пройден")
+
+if __name__ == "__main__":
+    test_redraw_coalescing()
+    test_plot_worker_generations()
+    test_section_delivery()
+    test_singularities_delivery()
+    print("Все тесты фоновых вычислений пройдены!")